@@ -0,0 +1,126 @@
+from fastapi import Depends, HTTPException, Query
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Optional
+import jwt
+from app.database.session import get_db, SessionLocal
+from app.models import User, UserRole
+
+# Configuration JWT
+SECRET_KEY = "your-secret-key"  # À remplacer par une clé secrète sécurisée
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+# Usage des jetons courts transmis en paramètre d'URL
+STATS_STREAM_SCOPE = "stats:stream"
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+
+# Fonctions d'authentification
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    to_encode = data.copy()
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(minutes=15)
+    to_encode.update({"exp": expire})
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return encoded_jwt
+
+def create_scoped_token(email: str, scope: str, expires_delta: timedelta) -> str:
+    """Jeton de courte durée limité à un usage (flux, média), transmissible dans une URL.
+
+    Il n'est pas accepté comme jeton d'accès : une fuite (journaux,
+    historique) n'expose que cet usage, pour quelques instants.
+    """
+    return create_access_token({"sub": email, "scope": scope}, expires_delta)
+
+def decode_access_token(token: str, scope: Optional[str] = None) -> str:
+    """Retourne l'email contenu dans le jeton, ou lève une erreur 401.
+
+    Sans ``scope``, seuls les jetons d'accès sont acceptés ; avec, seuls
+    les jetons limités à cet usage.
+    """
+    credentials_exception = HTTPException(
+        status_code=401,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        email: str = payload.get("sub")
+        if email is None or payload.get("scope") != scope:
+            raise credentials_exception
+    except jwt.PyJWTError:
+        raise credentials_exception
+    return email
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    return decode_access_token(token)
+
+def get_current_active_user(
+    email: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """Récupère l'utilisateur authentifié depuis la base de données."""
+    user = db.query(User).filter(User.email == email).first()
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    return user
+
+def get_current_admin(user: User = Depends(get_current_active_user)) -> User:
+    """Vérifie que l'utilisateur authentifié est administrateur."""
+    if user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Permissions insuffisantes")
+    return user
+
+def get_current_admin_id(email: str = Depends(get_current_user)) -> int:
+    """Variante de get_current_admin pour les requêtes longues (flux, uploads).
+
+    La session est fermée aussitôt la vérification faite, pour ne pas garder
+    une connexion du pool pendant toute la durée de la requête.
+    """
+    return _load_user_id(email, admin=True)
+
+def get_stream_admin(token: str = Query(...)) -> int:
+    """Authentifie un flux d'événements administrateur.
+
+    EventSource ne permet pas d'envoyer d'en-tête Authorization : un jeton
+    de flux (POST /api/admin/stats/stream-token), jamais le jeton d'accès,
+    est passé en paramètre.
+    """
+    return _load_user_id(decode_access_token(token, scope=STATS_STREAM_SCOPE), admin=True)
+
+def media_scope(module_id: int) -> str:
+    return f"media:{module_id}"
+
+def get_media_user_id(
+    module_id: int,
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    token: Optional[str] = Query(None)
+) -> int:
+    """Authentifie la lecture d'un média, par en-tête ou URL signée (balises <video>).
+
+    L'URL signée (GET /api/modules/{id}/content-url) porte un jeton qui
+    expire et ne vaut que pour ce module, jamais le jeton d'accès.
+    """
+    if header_token:
+        return _load_user_id(decode_access_token(header_token))
+    if not token:
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return _load_user_id(decode_access_token(token, scope=media_scope(module_id)))
+
+def _load_user_id(email: str, admin: bool = False) -> int:
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.email == email).first()
+        if user is None or not user.is_active:
+            raise HTTPException(status_code=401, detail="Could not validate credentials")
+        if admin and user.role != UserRole.ADMIN:
+            raise HTTPException(status_code=403, detail="Permissions insuffisantes")
+        return user.id
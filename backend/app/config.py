@@ -21,6 +21,17 @@ class Settings(BaseSettings):
     DB_MAX_OVERFLOW: int = 10
     DB_POOL_TIMEOUT: int = 30
 
+    # Réplique en lecture pour les rapports (statistiques, exports) ; primaire si absente
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_STALENESS_SECONDS: float = 30.0
+    REPLICA_CHECK_INTERVAL_SECONDS: float = 10.0
+
+    # Partitionnement mensuel (PostgreSQL) et rétention des tables volumineuses
+    PARTITION_PREMAKE_MONTHS: int = 3
+    LOGIN_LOG_RETENTION_MONTHS: int = 13      # 0 : conservation illimitée
+    QUIZ_ATTEMPT_RETENTION_MONTHS: int = 24   # 0 : conservation illimitée
+    RETENTION_JOB_INTERVAL_SECONDS: int = 6 * 3600
+
     # CORS
     CORS_ORIGINS: list = [
         "http://localhost:3000",
@@ -41,6 +52,22 @@ class Settings(BaseSettings):
     LDAP_USE_SSL: bool = False
     LDAP_BASE_DN: Optional[str] = None
     LDAP_USER_DN_TEMPLATE: Optional[str] = None
+    LDAP_BIND_DN: Optional[str] = None
+    LDAP_BIND_PASSWORD: Optional[str] = None
+    LDAP_USER_FILTER: str = "(&(objectClass=person)(mail=*))"
+    LDAP_PAGE_SIZE: int = 500
+    LDAP_ATTR_EMAIL: str = "mail"
+    LDAP_ATTR_FIRST_NAME: str = "givenName"
+    LDAP_ATTR_LAST_NAME: str = "sn"
+    LDAP_ATTR_FULL_NAME: str = "cn"
+    LDAP_ATTR_DEPARTMENT: str = "department"
+    LDAP_AUTH_ENABLED: bool = False
+    LDAP_POOL_SIZE: int = 5
+    LDAP_POOL_TIMEOUT: float = 5.0
+    LDAP_NETWORK_TIMEOUT: float = 5.0
+    LDAP_HEALTHCHECK_INTERVAL: int = 60
+    LDAP_DN_CACHE_TTL: int = 300
+    LDAP_DN_NEGATIVE_CACHE_TTL: int = 30
 
     # Email
     SMTP_TLS: bool = True
@@ -53,11 +80,76 @@ class Settings(BaseSettings):
 
     # Stockage des fichiers
     UPLOAD_DIR: str = "uploads"
-    MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_UPLOAD_SIZE: int = 1024 * 1024 * 1024  # 1GB (vidéos de formation)
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
     ALLOWED_UPLOAD_EXTENSIONS: list = [".pdf", ".mp4", ".jpg", ".png"]
 
+    # Diffusion des contenus (vidéos, PDF)
+    MEDIA_CHUNK_SIZE: int = 256 * 1024
+    MEDIA_ACCEL_REDIRECT: bool = False  # Délègue l'envoi à nginx (sendfile)
+    MEDIA_ACCEL_PREFIX: str = "/uploads/"
+    MEDIA_URL_TTL_SECONDS: int = 4 * 3600  # Validité des URL signées de média
+    MEDIA_PUBLIC_URL: str = ""  # Origine des URL de média (vide : même origine que l'application, via nginx)
+
     # Certificats
     CERTIFICATE_TEMPLATE_PATH: str = "templates/certificate.html"
+    CERTIFICATES_DIR: str = "certificates"
+    API_URL: str = "http://localhost:8000/api"  # Liens de téléchargement
+    FRONTEND_URL: str = "http://localhost:3000"  # Lien de vérification du QR code
+
+    # Cache
+    QUIZ_CACHE_TTL_SECONDS: int = 300  # Âge maximal d'une entrée ; la version est vérifiée à chaque lecture
+    QUIZ_CACHE_MAX_ENTRIES: int = 1024
+
+    # Quiz
+    QUIZ_BATCH_MAX_ATTEMPTS: int = 5000
+
+    # Pagination
+    USER_LIST_DEFAULT_LIMIT: int = 50
+    USER_LIST_MAX_LIMIT: int = 500
+
+    # Exports
+    EXPORT_FETCH_SIZE: int = 2000
+
+    # Synchronisation des utilisateurs
+    USER_SYNC_BATCH_SIZE: int = 1000
+
+    # Progression des modules
+    PROGRESS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    PROGRESS_FLUSH_BATCH_SIZE: int = 500
+
+    # Compression et requêtes conditionnelles
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Flux temps réel des statistiques d'administration
+    STATS_STREAM_WINDOW_SECONDS: float = 2.0
+    STATS_STREAM_REFRESH_SECONDS: float = 60.0
+    STATS_STREAM_PROBE_SECONDS: float = 5.0  # Empreinte des tables, voit les écritures des autres workers ; 0 désactive
+    STATS_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    STATS_STREAM_TOKEN_TTL_SECONDS: int = 60  # Jeton d'ouverture du flux, pas de la session
+
+    # Scores des jeux de sensibilisation
+    GAME_SCORE_MAX: int = 1000
+    GAME_SCORE_QUEUE_MAX: int = 100000
+    GAME_SCORE_FLUSH_INTERVAL_SECONDS: float = 1.0
+    GAME_SCORE_FLUSH_BATCH_SIZE: int = 1000
+    GAME_LEADERBOARD_SIZE: int = 10
+    GAME_LEADERBOARD_REFRESH_SECONDS: int = 30  # Relecture depuis game_scores (scores des autres workers)
+    GAME_PLAYER_CACHE_TTL: int = 300
+    GAME_PLAYER_CACHE_NEGATIVE_TTL: int = 10  # Compte inconnu ou inactif : revérifié rapidement
+
+    # Métriques Prometheus (/metrics)
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None  # Si défini : en-tête "Authorization: Bearer <jeton>" exigé
+    # Sans jeton : connexions directes (sans X-Forwarded-For) depuis ces réseaux uniquement
+    METRICS_ALLOWED_NETWORKS: list = ["127.0.0.1/32", "::1/128"]
+
+    # Garde-fou SQL par requête (debug / tests) : comptage, N+1, budgets
+    QUERY_GUARD_ENABLED: bool = False
+    QUERY_GUARD_NPLUSONE_THRESHOLD: int = 5
+    QUERY_GUARD_DEFAULT_BUDGET: Optional[int] = None
 
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -72,6 +164,8 @@ class Settings(BaseSettings):
 def get_settings() -> Settings:
     return Settings()
 
+settings = get_settings()
+
 # Configuration des messages d'erreur
 ERROR_MESSAGES = {
     "AUTHENTICATION_REQUIRED": "Authentification requise",
@@ -2,6 +2,8 @@ from datetime import datetime, timedelta
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.models import Base, User, Module, Quiz, Question, Answer, UserRole, ModuleStatus
+from app.database.partitioning import partitioned_table_names, setup_partitioning
+from app.services.summary_service import SummaryService
 from passlib.context import CryptContext
 import os
 
@@ -15,13 +17,25 @@ def init_db():
     # Création du moteur SQLAlchemy
     engine = create_engine(DATABASE_URL)
     
-    # Création des tables
-    Base.metadata.create_all(bind=engine)
+    # Création des tables ; sur PostgreSQL, login_logs et quiz_attempts sont partitionnées par mois
+    partitioned = partitioned_table_names(engine)
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[table for table in Base.metadata.sorted_tables if table.name not in partitioned]
+    )
+    setup_partitioning(engine)
     
     # Création d'une session
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     db = SessionLocal()
 
+    # Base existante : résumés de progression des comptes créés avant leur introduction
+    try:
+        SummaryService(db).rebuild_missing()
+    except Exception as e:
+        print(f"Erreur lors de la construction des résumés de progression: {e}")
+        db.rollback()
+
     try:
         # Création des utilisateurs de test
         admin_user = User(
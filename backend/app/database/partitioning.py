@@ -0,0 +1,241 @@
+"""Partitionnement mensuel (RANGE) des tables volumineuses sur PostgreSQL.
+
+login_logs et quiz_attempts sont découpées en une partition par mois
+(login_logs_y2025m01, ...). Les requêtes filtrées sur la colonne de
+partition ne lisent que les mois concernés, et l'expiration d'un mois
+se fait par DROP TABLE de sa partition plutôt que par un DELETE massif.
+
+Les partitions des mois à venir sont créées d'avance par la tâche de
+rétention (app.services.retention_service). Une partition DEFAULT
+({table}_default) reçoit les lignes hors des mois créés (tentatives hors
+ligne antidatées, horloge client en avance) ; elles rejoignent leur
+partition mensuelle quand celle-ci est créée. Les autres moteurs (SQLite en
+développement) gardent des tables classiques : tout ici est sans effet.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import List, Optional, Set, Tuple
+import logging
+import re
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    name: str
+    key: str                                # Colonne de partition, incluse dans la clé primaire
+    columns: Tuple[Tuple[str, str], ...]    # (colonne, définition SQL) hors id
+    indexes: Tuple[Tuple[str, str], ...]    # (nom, colonne)
+
+# Définitions alignées sur app.models ; la clé primaire devient (id, clé)
+LOGIN_LOGS = PartitionedTable(
+    name="login_logs",
+    key="login_timestamp",
+    columns=(
+        ("user_id", "INTEGER REFERENCES users (id)"),
+        ("login_timestamp", "TIMESTAMP WITHOUT TIME ZONE NOT NULL"),
+        ("ip_address", "VARCHAR(45)"),
+        ("user_agent", "VARCHAR(255)"),
+        ("success", "BOOLEAN"),
+    ),
+    indexes=(("ix_login_logs_id", "id"),)
+)
+
+QUIZ_ATTEMPTS = PartitionedTable(
+    name="quiz_attempts",
+    key="completed_at",
+    columns=(
+        ("user_id", "INTEGER REFERENCES users (id)"),
+        ("quiz_id", "INTEGER REFERENCES quizzes (id)"),
+        ("score", "FLOAT"),
+        ("completed_at", "TIMESTAMP WITHOUT TIME ZONE NOT NULL"),
+        ("passed", "BOOLEAN"),
+    ),
+    indexes=(("ix_quiz_attempts_id", "id"), ("ix_quiz_attempts_user_id", "user_id"))
+)
+
+PARTITIONED_TABLES = (LOGIN_LOGS, QUIZ_ATTEMPTS)
+
+# Mois créés d'avance au-delà du mois courant
+DEFAULT_PREMAKE_MONTHS = 3
+
+_PARTITION_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+def month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(table: PartitionedTable, month: date) -> str:
+    return f"{table.name}_y{month.year}m{month.month:02d}"
+
+def default_partition_name(table: PartitionedTable) -> str:
+    return f"{table.name}_default"
+
+def is_postgres(bind) -> bool:
+    return bind.dialect.name == "postgresql"
+
+def table_exists(conn: Connection, name: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+def is_partitioned(conn: Connection, table: PartitionedTable) -> bool:
+    return conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name))"),
+        {"name": table.name}
+    ).scalar()
+
+def create_partitioned_table(conn: Connection, table: PartitionedTable):
+    """Crée la table partitionnée, sa séquence d'id et ses index (idempotent)."""
+    sequence = f"{table.name}_id_seq"
+    columns = ",\n    ".join(f"{name} {definition}" for name, definition in table.columns)
+    conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {sequence}"))
+    conn.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {table.name} (
+            id INTEGER NOT NULL DEFAULT nextval('{sequence}'),
+            {columns},
+            PRIMARY KEY (id, {table.key})
+        ) PARTITION BY RANGE ({table.key})
+    """))
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table.name}.id"))
+    for index_name, column in table.indexes:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table.name} ({column})"))
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} PARTITION OF {table.name} DEFAULT"
+    ))
+
+def ensure_partitions(conn: Connection, table: PartitionedTable, first: date, last: date) -> List[str]:
+    """Crée les partitions mensuelles manquantes de ``first`` à ``last`` inclus.
+
+    Les lignes du mois déjà rangées dans la partition DEFAULT y sont
+    déplacées : sans cela, PostgreSQL refuserait de créer la partition.
+    """
+    existing = {name for name, _ in monthly_partitions(conn, table)}
+    default = default_partition_name(table)
+    has_default = table_exists(conn, default)
+    created = []
+    month = first
+    while month <= last:
+        name = partition_name(table, month)
+        if name not in existing:
+            bounds = f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            in_month = f"{table.key} >= '{month.isoformat()}' AND {table.key} < '{add_months(month, 1).isoformat()}'"
+            if has_default and conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_month})")).scalar():
+                conn.execute(text(f"CREATE TABLE {name} (LIKE {table.name} INCLUDING DEFAULTS)"))
+                moved = conn.execute(text(
+                    f"WITH moved AS (DELETE FROM {default} WHERE {in_month} RETURNING *) "
+                    f"INSERT INTO {name} SELECT * FROM moved"
+                )).rowcount
+                conn.execute(text(f"ALTER TABLE {table.name} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+                logger.info(f"{moved} lignes de {default} déplacées vers {name}")
+            else:
+                conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table.name} FOR VALUES {bounds}"))
+            created.append(name)
+        month = add_months(month, 1)
+    if created:
+        logger.info(f"Partitions créées pour {table.name}: {', '.join(created)}")
+    return created
+
+def monthly_partitions(conn: Connection, table: PartitionedTable) -> List[Tuple[str, date]]:
+    """Partitions mensuelles existantes (nom, premier jour du mois), par mois croissant."""
+    rows = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:name)"
+    ), {"name": table.name}).scalars()
+    partitions = []
+    for name in rows:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def default_partition_rows(conn: Connection, table: PartitionedTable) -> int:
+    """Nombre de lignes rangées dans la partition DEFAULT (0 si absente)."""
+    default = default_partition_name(table)
+    if not table_exists(conn, default):
+        return 0
+    return conn.execute(text(f"SELECT count(*) FROM {default}")).scalar()
+
+def drop_partitions_before(conn: Connection, table: PartitionedTable, cutoff: date) -> List[str]:
+    """Supprime les partitions dont tout le mois précède ``cutoff``.
+
+    Les lignes antérieures restées dans la partition DEFAULT sont à
+    supprimer séparément (DELETE sur la table parente).
+    """
+    dropped = []
+    for name, month in monthly_partitions(conn, table):
+        if add_months(month, 1) <= cutoff:
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    if dropped:
+        logger.info(f"Partitions supprimées de {table.name}: {', '.join(dropped)}")
+    return dropped
+
+def convert_to_partitioned(conn: Connection, table: PartitionedTable, premake_months: int,
+                           now: Optional[datetime] = None) -> int:
+    """Convertit une table classique existante en table partitionnée, dans la transaction courante.
+
+    La table est verrouillée pendant la copie : à lancer en fenêtre de
+    maintenance. La séquence d'id est conservée. Les lignes sans date
+    reçoivent la plus ancienne date connue de la table.
+    """
+    legacy = f"{table.name}_unpartitioned"
+    conn.execute(text(f"LOCK TABLE {table.name} IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {legacy}"))
+    conn.execute(text(f"ALTER SEQUENCE {table.name}_id_seq OWNED BY NONE"))
+    # Libère les noms de contrainte et d'index pour la nouvelle table
+    conn.execute(text(f"ALTER TABLE {legacy} DROP CONSTRAINT IF EXISTS {table.name}_pkey"))
+    for index_name, _ in table.indexes:
+        conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+
+    create_partitioned_table(conn, table)
+    oldest, newest = conn.execute(text(f"SELECT min({table.key}), max({table.key}) FROM {legacy}")).one()
+    now = now or datetime.utcnow()
+    ensure_partitions(
+        conn, table,
+        month_start(oldest or now),
+        add_months(month_start(max(newest or now, now)), premake_months)
+    )
+
+    columns = ["id"] + [name for name, _ in table.columns]
+    selected = [
+        f"COALESCE({name}, (SELECT min({name}) FROM {legacy}), now() AT TIME ZONE 'utc')"
+        if name == table.key else name
+        for name in columns
+    ]
+    copied = conn.execute(text(
+        f"INSERT INTO {table.name} ({', '.join(columns)}) SELECT {', '.join(selected)} FROM {legacy}"
+    )).rowcount
+    conn.execute(text(f"DROP TABLE {legacy}"))
+    logger.info(f"{table.name} convertie en table partitionnée ({copied} lignes)")
+    return copied
+
+def partitioned_table_names(engine: Engine) -> Set[str]:
+    """Tables à exclure de Base.metadata.create_all : setup_partitioning les crée."""
+    return {table.name for table in PARTITIONED_TABLES} if is_postgres(engine) else set()
+
+def setup_partitioning(engine: Engine, premake_months: int = DEFAULT_PREMAKE_MONTHS,
+                       now: Optional[datetime] = None):
+    """Crée les tables partitionnées d'une base neuve et leurs prochaines partitions.
+
+    À appeler après la création des autres tables (users, quizzes), que
+    les clés étrangères référencent. Une table classique déjà présente est
+    laissée telle quelle : la conversion se lance explicitement
+    (python -m app.utils.partition_tables --convert).
+    """
+    if not is_postgres(engine):
+        return
+    current = month_start(now or datetime.utcnow())
+    with engine.begin() as conn:
+        for table in PARTITIONED_TABLES:
+            if table_exists(conn, table.name) and not is_partitioned(conn, table):
+                logger.warning(
+                    f"{table.name} n'est pas partitionnée : "
+                    f"lancez python -m app.utils.partition_tables --convert"
+                )
+                continue
+            create_partitioned_table(conn, table)
+            ensure_partitions(conn, table, current, add_months(current, premake_months))
@@ -0,0 +1,139 @@
+from threading import Lock
+from typing import Any, Dict, Optional
+import logging
+import time
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _create_engine(url: str) -> Engine:
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True
+    )
+
+# Moteur SQLAlchemy partagé par l'application
+engine = _create_engine(settings.DATABASE_URL)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Réplique en lecture seule pour les rapports (statistiques, exports), optionnelle
+replica_engine: Optional[Engine] = (
+    _create_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
+)
+
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine) if replica_engine else None
+)
+
+# Retard de réplication d'un serveur PostgreSQL en standby, 0 s'il est à jour ou primaire
+POSTGRES_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+class ReplicaMonitor:
+    """Décide si la réplique peut servir les rapports : joignable et assez à jour.
+
+    Le retard est mesuré au plus une fois par intervalle de vérification ;
+    entre deux mesures, la dernière décision est réutilisée.
+    """
+
+    def __init__(self, engine: Engine, max_staleness: float, check_interval: float):
+        self.engine = engine
+        self.max_staleness = max_staleness
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+        self._usable = False
+        self._checked_at: Optional[float] = None
+        self._lock = Lock()
+
+    def usable(self) -> bool:
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return self._usable
+        with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval:
+                self.check()
+        return self._usable
+
+    def check(self) -> bool:
+        """Mesure le retard de la réplique et met à jour la décision de routage."""
+        was_usable = self._usable
+        try:
+            self.lag = self.measure_lag()
+            self.error = None
+        except Exception as e:
+            self.lag = None
+            self.error = str(e)
+
+        self._usable = self.lag is not None and self.lag <= self.max_staleness
+        self._checked_at = time.monotonic()
+        if was_usable and not self._usable:
+            reason = self.error or f"retard de {self.lag:.1f}s > {self.max_staleness}s"
+            logger.warning(f"Réplique écartée, rapports servis par le primaire: {reason}")
+        elif self._usable and not was_usable:
+            logger.info(f"Réplique utilisée pour les rapports (retard {self.lag:.1f}s)")
+        return self._usable
+
+    def measure_lag(self) -> float:
+        with self.engine.connect() as conn:
+            if self.engine.dialect.name == "postgresql":
+                return float(conn.execute(POSTGRES_LAG_QUERY).scalar() or 0)
+            # Pas de notion de retard (SQLite, tests) : seule la disponibilité compte
+            conn.execute(text("SELECT 1"))
+            return 0.0
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "usable": self._usable,
+            "lag_seconds": self.lag,
+            "max_staleness_seconds": self.max_staleness,
+            "error": self.error
+        }
+
+replica_monitor: Optional[ReplicaMonitor] = (
+    ReplicaMonitor(replica_engine, settings.REPLICA_MAX_STALENESS_SECONDS,
+                   settings.REPLICA_CHECK_INTERVAL_SECONDS)
+    if replica_engine else None
+)
+
+def reporting_session() -> Session:
+    """Session en lecture seule pour les rapports : réplique si utilisable, sinon primaire."""
+    if replica_monitor is not None and replica_monitor.usable():
+        db = ReplicaSessionLocal()
+    else:
+        db = SessionLocal()
+    db.info["read_only"] = True
+    return db
+
+@event.listens_for(Session, "before_flush")
+def _reject_reporting_writes(session, flush_context, instances):
+    # Une session de rapport peut retomber sur le primaire : aucune écriture ne doit passer
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("Écriture refusée dans une session de rapport en lecture seule")
+
+def get_db():
+    """Fournit une session de base de données par requête."""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_reporting_db():
+    """Fournit une session de rapport (réplique ou primaire) par requête."""
+    db = reporting_session()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,17 +1,30 @@
-from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi import FastAPI, Depends, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import OAuth2PasswordBearer
 from starlette.middleware.sessions import SessionMiddleware
 from starlette_rate_limit import RateLimitMiddleware, BaseBackend
 from datetime import datetime, timedelta
-from typing import Optional
-import jwt
 from pydantic import BaseModel
+import asyncio
+import hmac
+import ipaddress
+from app.auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.config import settings, ERROR_MESSAGES
+from app.database.session import engine, replica_engine
+from app.metrics import MetricsMiddleware, render_metrics, setup_metrics
+from app.query_guard import QueryGuardMiddleware, install_query_guard
+from app.middleware import CompressionMiddleware
+from app.responses import DefaultJSONResponse
+from app.routers import quiz, modules, employee, admin, stats, games
+from app.services.progress_service import run_progress_flusher
+from app.services.game_service import run_score_flusher
+from app.services.retention_service import run_retention_job
+from app.services.ldap_auth_service import get_ldap_authenticator, LdapUnavailableError
 
 app = FastAPI(
     title="Plateforme de Formation Cybersécurité",
     description="API sécurisée pour la plateforme de formation en cybersécurité",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultJSONResponse
 )
 
 # Configuration CORS
@@ -23,6 +36,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression gzip/brotli et GET conditionnels (ETag, 304)
+app.add_middleware(CompressionMiddleware)
+
+# Métriques Prometheus : latence par route, requêtes en cours, temps SQL
+if settings.METRICS_ENABLED:
+    setup_metrics(engine, replica_engine)
+    app.add_middleware(MetricsMiddleware)
+
+# Comptage des requêtes SQL et détection des N+1 (debug / tests)
+if settings.QUERY_GUARD_ENABLED:
+    install_query_guard(engine)
+    if replica_engine is not None:
+        install_query_guard(replica_engine)
+    app.add_middleware(QueryGuardMiddleware)
+
 # Configuration Rate Limiting
 app.add_middleware(RateLimitMiddleware)
 
@@ -45,39 +73,29 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
-# Configuration JWT
-SECRET_KEY = "your-secret-key"  # À remplacer par une clé secrète sécurisée
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-
-# Fonctions d'authentification
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
-
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=401,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except jwt.PyJWTError:
-        raise credentials_exception
-    # Ici, ajoutez la logique pour récupérer l'utilisateur depuis la base de données
-    return email
+# Routers
+app.include_router(quiz.router)
+app.include_router(modules.router)
+app.include_router(employee.router)
+app.include_router(admin.router)
+app.include_router(stats.router)
+app.include_router(games.router)
+
+# Tâches de fond
+background_tasks = []
+
+@app.on_event("startup")
+async def start_background_tasks():
+    background_tasks.append(asyncio.create_task(run_progress_flusher()))
+    background_tasks.append(asyncio.create_task(run_score_flusher()))
+    background_tasks.append(asyncio.create_task(run_retention_job()))
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
 
 # Routes
 @app.get("/")
@@ -86,6 +104,14 @@ async def root():
 
 @app.post("/token")
 async def login_for_access_token(user: UserCreate):
+    if settings.LDAP_AUTH_ENABLED:
+        try:
+            authenticated = await get_ldap_authenticator().authenticate(user.email, user.password)
+        except LdapUnavailableError:
+            raise HTTPException(status_code=503, detail=ERROR_MESSAGES["LDAP_ERROR"])
+        if not authenticated:
+            raise HTTPException(status_code=401, detail=ERROR_MESSAGES["INVALID_CREDENTIALS"])
+
     # Ici, ajoutez la logique de vérification des identifiants
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -93,6 +119,32 @@ async def login_for_access_token(user: UserCreate):
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
+def _metrics_access_allowed(request: Request) -> bool:
+    """Jeton Bearer si METRICS_TOKEN est défini, sinon adresse directe autorisée.
+
+    uvicorn fait confiance à X-Forwarded-For quel que soit l'émetteur
+    (--forwarded-allow-ips "*") : une requête qui en porte un n'est
+    jamais autorisée sur la seule foi de son adresse.
+    """
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+    if "x-forwarded-for" in request.headers or request.client is None:
+        return False
+    try:
+        address = ipaddress.ip_address(request.client.host)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network) for network in settings.METRICS_ALLOWED_NETWORKS)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404)
+    if not _metrics_access_allowed(request):
+        raise HTTPException(status_code=403, detail="Accès aux métriques refusé")
+    return Response(render_metrics(engine, replica_engine), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/users/me")
 async def read_users_me(current_user: str = Depends(get_current_user)):
     return {"email": current_user}
@@ -105,11 +157,12 @@ async def log_requests(request: Request, call_next):
     end_time = datetime.utcnow()
     
     # Log de la requête
-    print(f"[{start_time}] {request.method} {request.url} - Status: {response.status_code} - Duration: {end_time - start_time}")
+    # Chemin seul : la chaîne de requête peut contenir un jeton (flux SSE, médias)
+    print(f"[{start_time}] {request.method} {request.url.path} - Status: {response.status_code} - Duration: {end_time - start_time}")
     
     return response
 
 # Gestion des erreurs globale
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
-    return {"detail": exc.detail}, exc.status_code
\ No newline at end of file
+    return DefaultJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
\ No newline at end of file
@@ -0,0 +1,210 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable, Optional
+import inspect
+import os
+import time
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Opération (Service.méthode) à l'origine des requêtes SQL en cours
+current_operation: ContextVar[str] = ContextVar("current_operation", default="other")
+
+@dataclass
+class RequestQueries:
+    """Requêtes SQL émises pendant le traitement d'une requête HTTP."""
+    count: int = 0
+    seconds: float = 0.0
+
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Durée de traitement des requêtes HTTP",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requêtes HTTP en cours de traitement",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Nombre de requêtes SQL par requête HTTP",
+    ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250)
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Temps passé en base de données par requête HTTP",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Durée des requêtes SQL par opération émettrice",
+    ["operation"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5)
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Requêtes SQL en erreur par opération émettrice",
+    ["operation"]
+)
+
+def traced(cls):
+    """Décorateur de classe : étiquette les requêtes SQL des méthodes publiques.
+
+    Chaque requête émise pendant l'appel est attribuée à ``Classe.méthode``
+    dans db_query_duration_seconds ; un appel imbriqué garde l'étiquette
+    de la méthode la plus externe.
+    """
+    for name, method in list(vars(cls).items()):
+        # Les générateurs s'exécutent après le retour de l'appel : non étiquetés
+        if name.startswith("_") or not inspect.isfunction(method) or inspect.isgeneratorfunction(method):
+            continue
+        setattr(cls, name, _traced_method(f"{cls.__name__}.{name}", method))
+    return cls
+
+def _traced_method(operation: str, method: Callable) -> Callable:
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        if current_operation.get() != "other":
+            return method(*args, **kwargs)
+        token = current_operation.set(operation)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            current_operation.reset(token)
+    return wrapper
+
+def setup_metrics(engine, replica_engine=None):
+    """Instrumente les moteurs et enregistre les métriques de leurs pools."""
+    instrument_engine(engine)
+    if replica_engine is not None:
+        instrument_engine(replica_engine)
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        REGISTRY.register(PoolCollector(engine, replica_engine))
+
+def instrument_engine(engine):
+    """Mesure chaque requête SQL émise par le moteur."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_query(conn, cursor, statement, parameters, context, executemany):
+        _record_query(conn, failed=False)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed_query(exception_context):
+        if exception_context.connection is not None:
+            _record_query(exception_context.connection, failed=True)
+
+class PoolCollector:
+    """Expose l'état du pool de connexions SQLAlchemy au moment de la collecte."""
+
+    def __init__(self, engine, replica_engine=None):
+        self.engines = {"primary": engine}
+        if replica_engine is not None:
+            self.engines["replica"] = replica_engine
+
+    def collect(self):
+        for name, documentation, reader in (
+            ("db_pool_size", "Taille configurée du pool", "size"),
+            ("db_pool_checked_out", "Connexions prêtées", "checkedout"),
+            ("db_pool_checked_in", "Connexions disponibles dans le pool", "checkedin"),
+            ("db_pool_overflow", "Connexions ouvertes au-delà de la taille du pool", "overflow"),
+        ):
+            metric = GaugeMetricFamily(name, documentation, labels=["pid", "engine"])
+            for label, engine in self.engines.items():
+                if hasattr(engine.pool, reader):
+                    metric.add_metric([str(os.getpid()), label], getattr(engine.pool, reader)())
+            if metric.samples:
+                yield metric
+
+class MetricsMiddleware:
+    """Latence, requêtes en cours et requêtes SQL par route (gabarit, pas chemin réel)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        status = 500
+        queries = RequestQueries()
+        queries_token = current_queries.set(queries)
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_LATENCY.labels(method, route, str(status)).observe(time.perf_counter() - start)
+            in_progress.dec()
+            REQUEST_QUERIES.labels(route).observe(queries.count)
+            REQUEST_DB_SECONDS.labels(route).observe(queries.seconds)
+            current_queries.reset(queries_token)
+
+def route_template(scope: Scope) -> str:
+    """Gabarit de la route (/api/quiz/{quiz_id}), pour borner la cardinalité des labels."""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+def metrics_registry() -> CollectorRegistry:
+    """Registre à exposer ; agrège les workers en mode multiprocessus."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+def render_metrics(engine, replica_engine=None) -> bytes:
+    registry = metrics_registry()
+    output = generate_latest(registry)
+    if registry is not REGISTRY:
+        # Le pool est propre au worker qui répond
+        pool_registry = CollectorRegistry()
+        pool_registry.register(PoolCollector(engine, replica_engine))
+        output += generate_latest(pool_registry)
+    return output
+
+def _record_query(conn, failed: bool):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    operation = current_operation.get()
+    DB_QUERY_SECONDS.labels(operation).observe(elapsed)
+    if failed:
+        DB_QUERY_ERRORS.labels(operation).inc()
+
+    queries = current_queries.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += elapsed
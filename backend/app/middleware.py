@@ -0,0 +1,196 @@
+from typing import Dict, Optional
+import gzip
+import hashlib
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.responses import etag_matches
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : seul gzip est alors proposé
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/javascript", "application/xml",
+    "image/svg+xml", "text/"
+)
+# Flux qui doivent parvenir au client sans mise en tampon
+UNBUFFERED_TYPES = ("text/event-stream",)
+
+class CompressionMiddleware:
+    """Compression gzip/brotli et GET conditionnels (ETag faible, 304).
+
+    Les réponses complètes aux GET reçoivent un ETag faible calculé sur le
+    corps non compressé ; un If-None-Match correspondant est servi en 304
+    sans corps. Les réponses en flux (exports) sont compressées au fil de
+    l'eau, sans ETag.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None,
+                 gzip_level: Optional[int] = None, brotli_quality: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else settings.COMPRESSION_MIN_SIZE
+        self.gzip_level = gzip_level if gzip_level is not None else settings.COMPRESSION_GZIP_LEVEL
+        self.brotli_quality = brotli_quality if brotli_quality is not None else settings.COMPRESSION_BROTLI_QUALITY
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self, scope, send)
+        await self.app(scope, receive, responder.send)
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, send: Send):
+        self.middleware = middleware
+        self.request_headers = Headers(scope=scope)
+        self.method = scope["method"]
+        self.encoding = select_encoding(self.request_headers.get("accept-encoding", ""))
+        self.downstream = send
+        self.start: Optional[Message] = None
+        self.compressor: Optional["_StreamCompressor"] = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.downstream(message)
+            return
+        if self.compressor is not None:
+            await self._send_compressed_chunk(message)
+            return
+
+        body = message.get("body", b"")
+        if message.get("more_body", False):
+            await self._start_stream(message)
+        else:
+            await self._send_complete(body)
+
+    async def _send_complete(self, body: bytes):
+        headers = MutableHeaders(scope=self.start)
+        status = self.start["status"]
+
+        if self._cacheable(status, headers):
+            if "etag" not in headers:
+                headers["ETag"] = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            if "cache-control" not in headers:
+                # Le navigateur conserve la réponse mais la revalide à chaque appel
+                headers["Cache-Control"] = "private, no-cache"
+            if etag_matches(self.request_headers.get("if-none-match"), headers["etag"]):
+                await self._send_not_modified(headers)
+                return
+
+        if self._compressible(headers):
+            headers.add_vary_header("Accept-Encoding")
+            if self.encoding and len(body) >= self.middleware.minimum_size:
+                body = self._compress(body)
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(body))
+                if "etag" in headers and not headers["etag"].startswith("W/"):
+                    # Le corps transmis diffère octet par octet : l'ETag devient faible
+                    headers["ETag"] = f"W/{headers['etag']}"
+
+        await self.downstream(self.start)
+        await self.downstream({"type": "http.response.body", "body": body})
+
+    async def _start_stream(self, message: Message):
+        headers = MutableHeaders(scope=self.start)
+        if not self._compressible(headers):
+            self.passthrough = True
+            await self.downstream(self.start)
+            await self.downstream(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        if not self.encoding:
+            self.passthrough = True
+            await self.downstream(self.start)
+            await self.downstream(message)
+            return
+
+        self.compressor = _StreamCompressor(self.encoding, self.middleware)
+        headers["Content-Encoding"] = self.encoding
+        if "content-length" in headers:
+            del headers["content-length"]
+        await self.downstream(self.start)
+        await self._send_compressed_chunk(message)
+
+    async def _send_compressed_chunk(self, message: Message):
+        more_body = message.get("more_body", False)
+        chunk = self.compressor.compress(message.get("body", b""), final=not more_body)
+        await self.downstream({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _send_not_modified(self, headers: MutableHeaders):
+        for name in ("content-length", "content-type", "content-encoding"):
+            if name in headers:
+                del headers[name]
+        headers.add_vary_header("Accept-Encoding")
+        self.start["status"] = 304
+        await self.downstream(self.start)
+        await self.downstream({"type": "http.response.body", "body": b""})
+
+    def _cacheable(self, status: int, headers: MutableHeaders) -> bool:
+        return (
+            self.method == "GET"
+            and status == 200
+            and "set-cookie" not in headers
+            and "no-store" not in headers.get("cache-control", "")
+        )
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        content_type = headers.get("content-type", "")
+        return (
+            "content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+            and not content_type.startswith(UNBUFFERED_TYPES)
+        )
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.encoding == "br":
+            return brotli.compress(body, quality=self.middleware.brotli_quality)
+        return gzip.compress(body, compresslevel=self.middleware.gzip_level)
+
+class _StreamCompressor:
+    """Compresse un flux morceau par morceau, chaque morceau étant décodable dès réception."""
+
+    def __init__(self, encoding: str, middleware: CompressionMiddleware):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=middleware.brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(middleware.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            data = self._brotli.process(chunk)
+            return data + (self._brotli.finish() if final else self._brotli.flush())
+        data = self._zlib.compress(chunk)
+        return data + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+def select_encoding(accept_encoding: str) -> Optional[str]:
+    """Choisit brotli ou gzip selon l'en-tête Accept-Encoding et ses poids q."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip()] = weight
+
+    available = ["br", "gzip"] if brotli is not None else ["gzip"]
+    candidates = [
+        (weights.get(name, weights.get("*", 0.0)), -index, name)
+        for index, name in enumerate(available)
+    ]
+    weight, _, name = max(candidates)
+    return name if weight > 0 else None
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, Enum, Text, Boolean, UniqueConstraint, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 import enum
@@ -22,7 +22,11 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     full_name = Column(String(255))
+    first_name = Column(String(100))
+    last_name = Column(String(100))
     role = Column(Enum(UserRole), default=UserRole.EMPLOYEE)
+    department = Column(String(100), index=True)
+    auth_source = Column(String(20), default="local")  # local, ldap, csv
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime)
@@ -31,6 +35,7 @@ class User(Base):
     progress = relationship("UserProgress", back_populates="user")
     certificates = relationship("Certificate", back_populates="user")
     quiz_attempts = relationship("QuizAttempt", back_populates="user")
+    progress_summary = relationship("UserProgressSummary", back_populates="user", uselist=False)
 
 class Module(Base):
     __tablename__ = "modules"
@@ -40,14 +45,28 @@ class Module(Base):
     description = Column(Text)
     content_type = Column(String(50))  # video, text, pdf
     content_url = Column(String(255))
+    content_file_id = Column(Integer, ForeignKey("content_files.id"))
     order = Column(Integer)
     duration_minutes = Column(Integer)
+    is_critical = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relations
     quizzes = relationship("Quiz", back_populates="module")
     progress = relationship("UserProgress", back_populates="module")
+    content_file = relationship("ContentFile")
+
+class ContentFile(Base):
+    __tablename__ = "content_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    path = Column(String(255), nullable=False)  # Relatif à UPLOAD_DIR
+    mime_type = Column(String(100), nullable=False)
+    size = Column(Integer, nullable=False)
+    original_name = Column(String(255))
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 class Quiz(Base):
     __tablename__ = "quizzes"
@@ -58,6 +77,7 @@ class Quiz(Base):
     description = Column(Text)
     passing_score = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relations
     module = relationship("Module", back_populates="quizzes")
@@ -90,12 +110,17 @@ class Answer(Base):
 
 class UserProgress(Base):
     __tablename__ = "user_progress"
+    __table_args__ = (
+        UniqueConstraint("user_id", "module_id", name="uq_user_progress_user_module"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     module_id = Column(Integer, ForeignKey("modules.id"))
     status = Column(Enum(ModuleStatus), default=ModuleStatus.NOT_STARTED)
     progress_percentage = Column(Float, default=0)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
     last_accessed = Column(DateTime)
 
     # Relations
@@ -103,13 +128,15 @@ class UserProgress(Base):
     module = relationship("Module", back_populates="progress")
 
 class QuizAttempt(Base):
+    # Partitionnée par mois sur PostgreSQL (app.database.partitioning) : la clé
+    # primaire y est (id, completed_at), l'id restant unique grâce à la séquence
     __tablename__ = "quiz_attempts"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     quiz_id = Column(Integer, ForeignKey("quizzes.id"))
     score = Column(Float)
-    completed_at = Column(DateTime)
+    completed_at = Column(DateTime, default=datetime.utcnow)
     passed = Column(Boolean)
 
     # Relations
@@ -120,7 +147,8 @@ class Certificate(Base):
     __tablename__ = "certificates"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    module_id = Column(Integer, ForeignKey("modules.id"))
     title = Column(String(255), nullable=False)
     description = Column(Text)
     issued_date = Column(DateTime, default=datetime.utcnow)
@@ -130,7 +158,31 @@ class Certificate(Base):
     # Relations
     user = relationship("User", back_populates="certificates")
 
+class UserProgressSummary(Base):
+    __tablename__ = "user_progress_summaries"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    completed_count = Column(Integer, default=0)
+    started_count = Column(Integer, default=0)  # Modules commencés ou terminés
+    modules = Column(JSON, default=dict)  # {module_id: {status, progress, bestScore}}
+    certificates = Column(JSON, default=list)  # [{id, title, dateObtained}]
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relations
+    user = relationship("User", back_populates="progress_summary")
+
+class GameScore(Base):
+    __tablename__ = "game_scores"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    game = Column(String(50), nullable=False, index=True)  # phishing
+    score = Column(Integer, nullable=False)
+    department = Column(String(100))  # Département au moment de la partie
+    played_at = Column(DateTime, default=datetime.utcnow)
+
 class LoginLog(Base):
+    # Partitionnée par mois sur PostgreSQL, clé primaire (id, login_timestamp)
     __tablename__ = "login_logs"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -138,4 +190,29 @@ class LoginLog(Base):
     login_timestamp = Column(DateTime, default=datetime.utcnow)
     ip_address = Column(String(45))
     user_agent = Column(String(255))
-    success = Column(Boolean, default=True)
\ No newline at end of file
+    success = Column(Boolean, default=True)
+
+class LoginDailyStat(Base):
+    """Connexions agrégées par jour, une fois les journaux bruts expirés."""
+    __tablename__ = "login_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    login_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+
+class QuizAttemptMonthlyStat(Base):
+    """Tentatives de quiz agrégées par mois, utilisateur et quiz, une fois les lignes brutes expirées."""
+    __tablename__ = "quiz_attempt_monthly_stats"
+    __table_args__ = (
+        UniqueConstraint("month", "user_id", "quiz_id", name="uq_quiz_attempt_monthly_stats"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(Date, nullable=False)  # Premier jour du mois
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id"))
+    attempt_count = Column(Integer, nullable=False, default=0)  # Tentatives notées
+    score_sum = Column(Float, nullable=False, default=0.0)
+    min_score = Column(Float)
+    max_score = Column(Float)
+    passed_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,173 @@
+"""Garde-fou du nombre de requêtes SQL par requête HTTP (mode debug / test).
+
+Activé par QUERY_GUARD_ENABLED, il compte les requêtes émises pendant chaque
+requête HTTP, signale les motifs N+1 (même instruction SQL répétée avec des
+paramètres différents) et vérifie le budget de requêtes de chaque route :
+
+    @router.get("/modules")
+    @query_budget(4)
+    def get_module_stats(...): ...
+
+Les résultats sont journalisés et renvoyés dans les en-têtes X-Query-Count,
+X-Query-NPlusOne et X-Query-Budget, que les tests peuvent vérifier avec
+assert_query_budget(response). Pour un appel de service direct :
+
+    with capture_queries() as log:
+        StatsService(db).get_module_stats()
+    assert log.count <= 4, log.report()
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+import logging
+import re
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Jeux de paramètres distincts conservés par instruction, pour borner la mémoire
+MAX_TRACKED_PARAMETERS = 50
+
+class QueryBudgetExceeded(AssertionError):
+    """Nombre de requêtes SQL supérieur au budget, ou motif N+1 détecté."""
+
+@dataclass
+class QueryLog:
+    """Instructions SQL émises dans un contexte (requête HTTP ou bloc de test)."""
+    count: int = 0
+    statements: Counter = field(default_factory=Counter)
+    parameters: Dict[str, Set[int]] = field(default_factory=dict)
+
+    def record(self, statement: str, parameters):
+        statement = _normalize(statement)
+        self.count += 1
+        self.statements[statement] += 1
+        seen = self.parameters.setdefault(statement, set())
+        if len(seen) < MAX_TRACKED_PARAMETERS:
+            seen.add(hash(repr(parameters)))
+
+    def n_plus_one(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Instructions identiques répétées au moins ``threshold`` fois avec des paramètres différents."""
+        threshold = threshold or settings.QUERY_GUARD_NPLUSONE_THRESHOLD
+        return [
+            (statement, count) for statement, count in self.statements.most_common()
+            if count >= threshold and len(self.parameters.get(statement, ())) > 1
+        ]
+
+    def report(self, limit: int = 10) -> str:
+        lines = [f"{self.count} requêtes SQL"]
+        for statement, count in self.statements.most_common(limit):
+            lines.append(f"  {count:4d} x {statement[:200]}")
+        return "\n".join(lines)
+
+current_query_log: ContextVar[Optional[QueryLog]] = ContextVar("current_query_log", default=None)
+
+_installed_engines: Set[int] = set()
+
+def install_query_guard(engine):
+    """Enregistre l'écouteur SQL sur le moteur (idempotent)."""
+    if id(engine) in _installed_engines:
+        return
+    _installed_engines.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _log_statement(conn, cursor, statement, parameters, context, executemany):
+        log = current_query_log.get()
+        if log is not None:
+            log.record(statement, parameters)
+
+def query_budget(max_queries: int) -> Callable:
+    """Décorateur d'endpoint : nombre maximal de requêtes SQL par appel."""
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+@contextmanager
+def capture_queries(engine=None) -> Iterator[QueryLog]:
+    """Compte les requêtes émises dans le bloc, dans le thread courant."""
+    if engine is None:
+        from app.database.session import engine, replica_engine
+        if replica_engine is not None:
+            install_query_guard(replica_engine)
+    install_query_guard(engine)
+    log = QueryLog()
+    token = current_query_log.set(log)
+    try:
+        yield log
+    finally:
+        current_query_log.reset(token)
+
+def assert_query_budget(response, max_queries: Optional[int] = None, allow_n_plus_one: bool = False):
+    """Vérifie les en-têtes posés par QueryGuardMiddleware sur une réponse de test."""
+    if "x-query-count" not in response.headers:
+        raise AssertionError("QueryGuardMiddleware inactif : activez QUERY_GUARD_ENABLED")
+    count = int(response.headers["x-query-count"])
+    budget = max_queries if max_queries is not None else _header_int(response.headers.get("x-query-budget"))
+    if budget is not None and count > budget:
+        raise QueryBudgetExceeded(f"{count} requêtes SQL pour un budget de {budget}")
+    if not allow_n_plus_one and int(response.headers.get("x-query-nplusone", "0")):
+        raise QueryBudgetExceeded(
+            f"Motif N+1 détecté ({response.headers['x-query-nplusone']} instruction(s) répétée(s))"
+        )
+
+class QueryGuardMiddleware:
+    """Compte les requêtes SQL de chaque requête HTTP et signale les dépassements."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog()
+        token = current_query_log.set(log)
+        route_path, budget = _route_budget(scope)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Query-Count"] = str(log.count)
+                headers["X-Query-NPlusOne"] = str(len(log.n_plus_one()))
+                if budget is not None:
+                    headers["X-Query-Budget"] = str(budget)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_log.reset(token)
+            _report(scope["method"], route_path, log, budget)
+
+def _route_budget(scope: Scope) -> Tuple[str, Optional[int]]:
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            endpoint = getattr(route, "endpoint", None)
+            budget = getattr(endpoint, "__query_budget__", settings.QUERY_GUARD_DEFAULT_BUDGET)
+            return route.path, budget
+    return scope["path"], settings.QUERY_GUARD_DEFAULT_BUDGET
+
+def _report(method: str, route_path: str, log: QueryLog, budget: Optional[int]):
+    for statement, count in log.n_plus_one():
+        logger.warning(f"N+1 sur {method} {route_path}: {count} x {statement[:200]}")
+    if budget is not None and log.count > budget:
+        logger.error(
+            f"Budget de requêtes dépassé sur {method} {route_path}: "
+            f"{log.count} > {budget}\n{log.report()}"
+        )
+
+def _normalize(statement: str) -> str:
+    return re.sub(r"\s+", " ", statement).strip()
+
+def _header_int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value else None
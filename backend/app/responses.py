@@ -0,0 +1,45 @@
+from functools import lru_cache
+from typing import Any, List, Optional, Type
+import json
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : repli sur le module json standard
+    orjson = None
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+else:
+    DefaultJSONResponse = JSONResponse
+
+@lru_cache()
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def dump_json(content: Any) -> bytes:
+    """Sérialise directement en JSON, sans copie intermédiaire en dict pour les modèles."""
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode("utf-8")
+    if isinstance(content, list) and content and isinstance(content[0], BaseModel):
+        return _list_adapter(type(content[0])).dump_json(content)
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+class ModelResponse(Response):
+    """Réponse JSON pour les modèles Pydantic, sérialisés par pydantic-core."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Indique si l'en-tête If-None-Match correspond à l'ETag courant (comparaison faible)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
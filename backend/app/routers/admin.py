@@ -0,0 +1,212 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+import asyncio
+import io
+from app.auth import get_current_admin, get_current_admin_id
+from app.config import settings, ERROR_MESSAGES
+from app.database.session import get_db, SessionLocal, reporting_session, replica_monitor
+from app.models import User, UserRole, Module
+from app.query_guard import query_budget
+from app.services.directory_service import (
+    CsvDirectorySource, UserSyncEngine, run_directory_sync
+)
+from app.services.ldap_auth_service import get_ldap_authenticator
+from app.services.export_service import XLSX_MAX_ROWS, ExportService, xlsx_available
+from app.services.summary_service import SummaryService
+from app.services.upload_service import (
+    UploadService, UploadRejectedError, UploadTooLargeError, store_upload
+)
+from app.services.user_service import UserService, InvalidCursorError, COMPLETION_STATUSES
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+@router.get("/users")
+@query_budget(3)
+def list_users(
+    limit: int = Query(settings.USER_LIST_DEFAULT_LIMIT, ge=1, le=settings.USER_LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    department: Optional[str] = None,
+    completion: Optional[str] = Query(None, pattern="^(" + "|".join(COMPLETION_STATUSES) + ")$"),
+    fields: Optional[str] = Query(None, description="Champs séparés par des virgules"),
+    include_progress: bool = True,
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Liste paginée et filtrable des utilisateurs, progression incluse."""
+    try:
+        return UserService(db).list_users(
+            limit=limit,
+            cursor=cursor,
+            role=role,
+            is_active=is_active,
+            department=department,
+            completion=completion,
+            fields=[field.strip() for field in fields.split(",")] if fields else None,
+            include_progress=include_progress
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
+
+@router.post("/users/import")
+def import_users(
+    file: UploadFile = File(...),
+    deactivate_missing: bool = False,
+    dry_run: bool = False,
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Importe ou met à jour des utilisateurs en masse depuis un fichier CSV."""
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = UserSyncEngine(db).sync(
+            CsvDirectorySource(stream),
+            deactivate_missing=deactivate_missing,
+            dry_run=dry_run
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Le fichier doit être encodé en UTF-8")
+    finally:
+        stream.detach()
+    return report.to_dict()
+
+@router.post("/directory/sync", status_code=202)
+def sync_directory(
+    background_tasks: BackgroundTasks,
+    deactivate_missing: bool = True,
+    current_admin: User = Depends(get_current_admin)
+):
+    """Lance la synchronisation de l'annuaire LDAP en tâche de fond."""
+    if not settings.LDAP_HOST or not settings.LDAP_BASE_DN:
+        raise HTTPException(status_code=400, detail="Annuaire LDAP non configuré")
+    background_tasks.add_task(run_directory_sync, deactivate_missing)
+    return {"status": "scheduled"}
+
+@router.get("/directory/metrics")
+def get_ldap_metrics(current_admin: User = Depends(get_current_admin)):
+    """Métriques du pool de connexions LDAP (attente, saturation, reconnexions)."""
+    if not settings.LDAP_AUTH_ENABLED:
+        raise HTTPException(status_code=404, detail="Authentification LDAP désactivée")
+    return get_ldap_authenticator().metrics()
+
+@router.get("/database/replica")
+def get_replica_status(current_admin: User = Depends(get_current_admin)):
+    """État de la réplique de rapports : disponibilité et retard de réplication."""
+    if replica_monitor is None:
+        raise HTTPException(status_code=404, detail="Aucune réplique configurée")
+    replica_monitor.check()
+    return replica_monitor.status()
+
+@router.get("/users/{user_id}/progress")
+def get_user_progress(
+    user_id: int,
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Progression résumée d'un utilisateur."""
+    progress = UserService(db).get_user_progress(user_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+    return progress
+
+@router.post("/summaries/rebuild")
+def rebuild_progress_summaries(
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Reconstruit les résumés de progression de tous les utilisateurs."""
+    return {"rebuilt": SummaryService(db).rebuild_all()}
+
+@router.get("/reports/compliance")
+def export_compliance_report(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    department: Optional[str] = None,
+    active_only: bool = False,
+    current_admin: User = Depends(get_current_admin)
+):
+    """Exporte la conformité utilisateurs × modules en flux CSV ou XLSX."""
+    if format == "xlsx":
+        if not xlsx_available():
+            raise HTTPException(status_code=501, detail="Export XLSX indisponible")
+        # Le classeur n'est envoyé qu'une fois complet : refuser avant de le construire
+        with reporting_session() as db:
+            rows = ExportService(db).count_compliance_rows(department, active_only)
+        if rows > XLSX_MAX_ROWS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Rapport de {rows} lignes, au-delà de la limite Excel ({XLSX_MAX_ROWS}) : "
+                       f"utilisez le format CSV ou filtrez par département"
+            )
+
+    def generate():
+        # Session de rapport dédiée : elle doit rester ouverte pendant toute la diffusion
+        db = reporting_session()
+        try:
+            service = ExportService(db)
+            if format == "xlsx":
+                yield from service.stream_xlsx(department, active_only)
+            else:
+                yield from service.stream_csv(department, active_only)
+        finally:
+            db.close()
+
+    filename = f"conformite_{datetime.utcnow():%Y%m%d}.{format}"
+    media_type = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        if format == "xlsx" else "text/csv; charset=utf-8"
+    )
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.put("/modules/{module_id}/content")
+async def upload_module_content(
+    module_id: int,
+    request: Request,
+    filename: str = Query(..., max_length=255),
+    admin_id: int = Depends(get_current_admin_id)
+):
+    """Téléverse le contenu d'un module, envoyé brut dans le corps de la requête.
+
+    Le corps est lu en flux et écrit sur disque au fil de l'eau : la mémoire
+    du worker reste constante quelle que soit la taille du fichier.
+    """
+    if not await asyncio.to_thread(_module_exists, module_id):
+        raise HTTPException(status_code=404, detail="Module non trouvé")
+
+    content_length = request.headers.get("content-length")
+    try:
+        upload = await store_upload(
+            request.stream(),
+            filename,
+            declared_size=int(content_length) if content_length and content_length.isdigit() else None
+        )
+    except UploadTooLargeError:
+        raise HTTPException(status_code=413, detail=ERROR_MESSAGES["FILE_TOO_LARGE"])
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=415, detail=f"{ERROR_MESSAGES['INVALID_FILE_TYPE']}: {str(e)}")
+
+    if not await asyncio.to_thread(_attach_content, module_id, upload):
+        raise HTTPException(status_code=404, detail="Module non trouvé")
+    return {
+        "moduleId": module_id,
+        "contentUrl": f"/uploads/{upload.path}",
+        "sha256": upload.sha256,
+        "size": upload.size,
+        "mimeType": upload.mime_type,
+        "deduplicated": upload.deduplicated
+    }
+
+def _module_exists(module_id: int) -> bool:
+    with SessionLocal() as db:
+        return db.query(Module.id).filter(Module.id == module_id).first() is not None
+
+def _attach_content(module_id: int, upload) -> bool:
+    with SessionLocal() as db:
+        return UploadService(db).attach_to_module(module_id, upload) is not None
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.auth import get_current_active_user
+from app.database.session import get_db
+from app.models import User
+from app.services.summary_service import SummaryService
+
+router = APIRouter(prefix="/api/employee", tags=["employee"])
+
+@router.get("/progress")
+def get_employee_progress(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Retourne la progression de l'employé depuis son résumé précalculé."""
+    return SummaryService(db).get_dashboard(current_user.id)
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import Optional
+from app.auth import get_current_user
+from app.config import settings
+from app.services.game_service import Player, player_cache, record_score, leaderboard
+
+router = APIRouter(prefix="/api/games", tags=["games"])
+
+PHISHING_GAME = "phishing"
+
+# Modèles Pydantic
+class ScoreSubmission(BaseModel):
+    score: int = Field(..., ge=0, le=settings.GAME_SCORE_MAX)
+
+def get_current_player(email: str = Depends(get_current_user)) -> Player:
+    """Joueur authentifié, résolu via un cache pour épargner la base pendant les campagnes."""
+    player = player_cache.resolve(email)
+    if player is None:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    return player
+
+@router.post("/phishing/score", status_code=202)
+def submit_phishing_score(
+    submission: ScoreSubmission,
+    player: Player = Depends(get_current_player)
+):
+    """Met le score en file ; l'écriture en base est différée et groupée."""
+    if not record_score(player, PHISHING_GAME, submission.score):
+        raise HTTPException(
+            status_code=503,
+            detail="Trop de scores en attente, réessayez plus tard",
+            headers={"Retry-After": "5"}
+        )
+    return {"status": "accepted"}
+
+@router.get("/phishing/leaderboard")
+def get_phishing_leaderboard(
+    department: Optional[str] = None,
+    limit: int = Query(settings.GAME_LEADERBOARD_SIZE, ge=1, le=settings.GAME_LEADERBOARD_SIZE),
+    player: Player = Depends(get_current_player)
+):
+    """Meilleurs scores, tous départements confondus ou pour un département."""
+    return {
+        "department": department,
+        "entries": leaderboard.top(PHISHING_GAME, department, limit)
+    }
@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, Field
+from datetime import timedelta
+from typing import Optional
+import asyncio
+from app.auth import create_scoped_token, get_current_active_user, get_media_user_id, media_scope
+from app.config import settings
+from app.database.session import get_db, SessionLocal
+from app.models import User, Module
+from app.services.progress_service import ProgressService, progress_buffer
+from app.services.media_service import (
+    MediaFile, MediaService, RangeNotSatisfiableError, iter_file_range, not_modified, requested_range
+)
+
+router = APIRouter(prefix="/api/modules", tags=["modules"])
+
+# En-tête posé par la location nginx du contenu : la délégation X-Accel-Redirect y est possible
+MEDIA_ACCEL_HEADER = "x-accel-available"
+
+# Modèles Pydantic
+class ProgressUpdate(BaseModel):
+    progress: float = Field(..., ge=0, le=100)
+
+@router.post("/{module_id}/progress", status_code=202)
+def report_progress(
+    module_id: int,
+    update: ProgressUpdate,
+    current_user: User = Depends(get_current_active_user)
+):
+    """Enregistre la progression en mémoire ; l'écriture en base est différée et regroupée."""
+    progress_buffer.record(current_user.id, module_id, update.progress)
+    return {"status": "accepted"}
+
+@router.post("/{module_id}/complete")
+def complete_module(
+    module_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Marque un module comme complété, immédiatement."""
+    if db.query(Module.id).filter(Module.id == module_id).first() is None:
+        raise HTTPException(status_code=404, detail="Module non trouvé")
+    ProgressService(db).complete_module(current_user.id, module_id)
+    return {"status": "completed"}
+
+@router.get("/{module_id}/content-url")
+def get_module_content_url(
+    module_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """URL signée du contenu, pour les balises <video>/<iframe> qui n'envoient pas d'en-tête."""
+    if db.query(Module.id).filter(Module.id == module_id).first() is None:
+        raise HTTPException(status_code=404, detail="Module non trouvé")
+    ttl = settings.MEDIA_URL_TTL_SECONDS
+    token = create_scoped_token(current_user.email, media_scope(module_id), timedelta(seconds=ttl))
+    url = f"{settings.MEDIA_PUBLIC_URL}{router.prefix}/{module_id}/content?token={token}"
+    return {"url": url, "expires_in": ttl}
+
+@router.get("/{module_id}/content")
+async def get_module_content(
+    module_id: int,
+    request: Request,
+    user_id: int = Depends(get_media_user_id)
+):
+    """Diffuse le contenu d'un module avec prise en charge des requêtes Range (206)."""
+    media = await asyncio.to_thread(_load_media, module_id)
+    if media is None:
+        raise HTTPException(status_code=404, detail="Contenu non trouvé")
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": media.etag,
+        "Last-Modified": media.last_modified_header,
+        "Cache-Control": "private, no-cache"
+    }
+    if not_modified(media, request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=headers)
+
+    if settings.MEDIA_ACCEL_REDIRECT and request.headers.get(MEDIA_ACCEL_HEADER) == "1":
+        # nginx sert le fichier lui-même (sendfile, Range) depuis sa location interne ;
+        # une requête arrivée sans passer par nginx reçoit le fichier du backend
+        headers["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + media.relative_path
+        return Response(media_type=media.mime_type, headers=headers)
+
+    try:
+        byte_range = requested_range(media, request.headers.get("range"), request.headers.get("if-range"))
+    except RangeNotSatisfiableError:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{media.size}"})
+
+    start, end = byte_range or (0, media.size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{end}/{media.size}"
+
+    return StreamingResponse(
+        iter_file_range(media.path, start, end),
+        status_code=206 if byte_range is not None else 200,
+        media_type=media.mime_type,
+        headers=headers
+    )
+
+def _load_media(module_id: int) -> Optional[MediaFile]:
+    with SessionLocal() as db:
+        return MediaService(db).get_module_media(module_id)
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from app.auth import get_current_user, get_current_active_user, get_current_admin
+from app.config import settings
+from app.database.session import get_db
+from app.query_guard import query_budget
+from app.models import User
+from app.services.grading_service import GradingService
+from app.responses import etag_matches
+from app.services.quiz_service import QuizService
+
+router = APIRouter(prefix="/api/quiz", tags=["quiz"])
+
+# Modèles Pydantic
+class QuizSubmission(BaseModel):
+    moduleId: Optional[int] = None
+    answers: Dict[str, List[int]]
+
+class BatchAttempt(BaseModel):
+    userId: int
+    quizId: int
+    answers: Dict[str, List[int]]
+    completedAt: Optional[datetime] = None
+
+class BatchSubmission(BaseModel):
+    attempts: List[BatchAttempt] = Field(..., max_length=settings.QUIZ_BATCH_MAX_ATTEMPTS)
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Ramène une date reçue avec fuseau ("...Z", "+02:00") en UTC naïf, comme en base."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+@router.get("/{quiz_id}")
+@query_budget(2)
+def get_quiz(
+    quiz_id: int,
+    request: Request,
+    current_user: str = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Retourne un quiz sans les bonnes réponses, avec support de l'ETag."""
+    entry = QuizService(db).get_quiz_payload(quiz_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Quiz non trouvé")
+
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+@router.post("/{quiz_id}/submit")
+def submit_quiz(
+    quiz_id: int,
+    submission: QuizSubmission,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Corrige une tentative et enregistre le résultat."""
+    result = GradingService(db).submit(current_user, quiz_id, submission.answers)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Quiz non trouvé")
+    return result.to_dict()
+
+@router.post("/attempts/batch")
+def submit_attempts_batch(
+    batch: BatchSubmission,
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Corrige un lot de tentatives collectées hors ligne (sessions kiosque)."""
+    results, rejected = GradingService(db).grade_batch([
+        {
+            "user_id": attempt.userId,
+            "quiz_id": attempt.quizId,
+            "answers": attempt.answers,
+            "completed_at": _naive_utc(attempt.completedAt)
+        }
+        for attempt in batch.attempts
+    ])
+    return {
+        "graded": len(results),
+        "rejected": rejected,
+        "results": [result.to_dict() for result in results]
+    }
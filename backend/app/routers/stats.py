@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from datetime import timedelta
+from typing import List
+from app.auth import STATS_STREAM_SCOPE, create_scoped_token, get_current_admin, get_stream_admin
+from app.config import settings
+from app.query_guard import query_budget
+from app.database.session import get_reporting_db
+from app.models import User
+from app.responses import ModelResponse
+from app.schemas import GlobalStats, ModuleStats, UserActivityStats, DepartmentStats, RiskAssessment
+from app.services.stats_service import StatsService
+from app.services.live_stats_service import stats_broadcaster
+
+router = APIRouter(prefix="/api/admin/stats", tags=["stats"], default_response_class=ModelResponse)
+
+@router.get("/global", response_model=GlobalStats)
+def get_global_stats(
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_reporting_db)
+):
+    return ModelResponse(StatsService(db).get_global_stats())
+
+@router.get("/modules", response_model=List[ModuleStats])
+@query_budget(4)
+def get_module_stats(
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_reporting_db)
+):
+    return ModelResponse(StatsService(db).get_module_stats())
+
+@router.get("/activity", response_model=UserActivityStats)
+def get_user_activity_stats(
+    days: int = Query(30, ge=1, le=365),
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_reporting_db)
+):
+    return ModelResponse(StatsService(db).get_user_activity_stats(days))
+
+@router.get("/departments", response_model=List[DepartmentStats])
+@query_budget(5)
+def get_department_stats(
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_reporting_db)
+):
+    return ModelResponse(StatsService(db).get_department_stats())
+
+@router.get("/risk-assessment", response_model=RiskAssessment)
+def get_risk_assessment(
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_reporting_db)
+):
+    return ModelResponse(StatsService(db).get_risk_assessment())
+
+@router.post("/stream-token")
+def create_stream_token(current_admin: User = Depends(get_current_admin)):
+    """Jeton court pour ouvrir le flux SSE, à la place du jeton d'accès dans l'URL."""
+    ttl = settings.STATS_STREAM_TOKEN_TTL_SECONDS
+    token = create_scoped_token(current_admin.email, STATS_STREAM_SCOPE, timedelta(seconds=ttl))
+    return ModelResponse({"token": token, "expires_in": ttl})
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_stats(admin_id: int = Depends(get_stream_admin)):
+    """Flux SSE : instantané à la connexion, puis sections modifiées uniquement."""
+    return StreamingResponse(
+        stats_broadcaster.subscribe(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,39 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+# Modèles de réponse des statistiques d'administration
+class GlobalStats(BaseModel):
+    total_users: int
+    active_users: int
+    total_modules: int
+    completion_rate: float
+    average_score: float
+
+class ModuleStats(BaseModel):
+    module_id: int
+    title: str
+    started_count: int
+    completed_count: int
+    completion_rate: float
+    average_score: float
+    average_completion_time: Optional[str] = None
+
+class DailyCount(BaseModel):
+    date: str
+    count: int
+
+class UserActivityStats(BaseModel):
+    daily_logins: List[DailyCount]
+    daily_completions: List[DailyCount]
+
+class DepartmentStats(BaseModel):
+    department: str
+    user_count: int
+    completion_rate: float
+    average_score: float
+
+class RiskAssessment(BaseModel):
+    users_missing_critical_modules: int
+    users_with_low_scores: int
+    inactive_users: int
+    risk_level: str
@@ -1,16 +1,19 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 import os
-import uuid
-from PIL import Image, ImageDraw, ImageFont
 from sqlalchemy.orm import Session
 from app.models import User, Module, Certificate
 from app.config import settings
-import qrcode
+from app.services.summary_service import SummaryService
+from app.metrics import traced
 import logging
 
+if TYPE_CHECKING:
+    from PIL import Image
+
 logger = logging.getLogger(__name__)
 
+@traced
 class CertificateService:
     def __init__(self, db: Session):
         self.db = db
@@ -23,47 +26,52 @@ class CertificateService:
             os.makedirs(self.certificates_dir)
 
     def generate_certificate(self, user: User, module: Module, score: float) -> str:
-        """Génère un certificat PDF pour un module complété."""
+        """Génère un certificat PNG pour un module complété et l'enregistre."""
+        certificate_path = None
         try:
-            # Création d'un identifiant unique pour le certificat
-            certificate_id = str(uuid.uuid4())
-            
+            issued_date = datetime.utcnow()
+            certificate = Certificate(
+                user_id=user.id,
+                module_id=module.id,
+                title=module.title,
+                description=f"Score obtenu : {score}%",
+                issued_date=issued_date
+            )
+            self.db.add(certificate)
+            self.db.flush()  # Identifiant nécessaire au QR code et au nom du fichier
+
             # Création de l'image du certificat
             certificate_image = self._create_certificate_image(
                 user.first_name,
                 user.last_name,
                 module.title,
                 score,
-                certificate_id
+                certificate.id
             )
-            
+
             # Sauvegarde du certificat
             certificate_path = os.path.join(
                 self.certificates_dir,
-                f"certificate_{certificate_id}.png"
+                f"certificate_{certificate.id}.png"
             )
             certificate_image.save(certificate_path, "PNG")
-            
-            # Création de l'entrée dans la base de données
-            certificate = Certificate(
-                id=certificate_id,
-                user_id=user.id,
-                module_id=module.id,
-                score=score,
-                file_path=certificate_path,
-                issued_at=datetime.utcnow()
+            certificate.certificate_url = self._download_url(certificate.id)
+
+            SummaryService(self.db).add_certificate(
+                user.id, certificate.id, module.title, issued_date
             )
-            
-            self.db.add(certificate)
             self.db.commit()
-            
+
             return certificate_path
 
         except Exception as e:
+            self.db.rollback()
+            if certificate_path and os.path.exists(certificate_path):
+                os.remove(certificate_path)
             logger.error(f"Erreur lors de la génération du certificat: {str(e)}")
             raise
 
-    def verify_certificate(self, certificate_id: str) -> Optional[dict]:
+    def verify_certificate(self, certificate_id: int) -> Optional[dict]:
         """Vérifie l'authenticité d'un certificat."""
         try:
             certificate = (
@@ -76,14 +84,13 @@ class CertificateService:
                 return None
             
             user = self.db.query(User).filter(User.id == certificate.user_id).first()
-            module = self.db.query(Module).filter(Module.id == certificate.module_id).first()
             
             return {
                 "certificate_id": certificate.id,
                 "user_name": f"{user.first_name} {user.last_name}",
-                "module_title": module.title,
-                "score": certificate.score,
-                "issued_at": certificate.issued_at.isoformat(),
+                "module_title": certificate.title,
+                "description": certificate.description,
+                "issued_at": certificate.issued_date.isoformat(),
                 "is_valid": True
             }
 
@@ -93,8 +100,12 @@ class CertificateService:
 
     def _create_certificate_image(self, first_name: str, last_name: str, 
                                 module_title: str, score: float, 
-                                certificate_id: str) -> Image:
+                                certificate_id: int) -> "Image.Image":
         """Crée l'image du certificat avec un design professionnel."""
+        # Imports coûteux chargés à la première génération seulement
+        from PIL import Image, ImageDraw, ImageFont
+        import qrcode
+
         # Création d'une image avec un fond blanc
         width, height = 2000, 1414  # Format A4 paysage à 300 DPI
         image = Image.new('RGB', (width, height), 'white')
@@ -165,7 +176,7 @@ class CertificateService:
 
         return image
 
-    def get_certificate_url(self, certificate_id: str) -> Optional[str]:
+    def get_certificate_url(self, certificate_id: int) -> Optional[str]:
         """Récupère l'URL de téléchargement d'un certificat."""
         try:
             certificate = (
@@ -177,8 +188,11 @@ class CertificateService:
             if not certificate:
                 return None
 
-            return f"{settings.API_URL}/certificates/{certificate_id}/download"
+            return self._download_url(certificate_id)
 
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de l'URL du certificat: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+    def _download_url(self, certificate_id: int) -> str:
+        return f"{settings.API_URL}/certificates/{certificate_id}/download"
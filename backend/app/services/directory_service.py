@@ -0,0 +1,280 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+import csv
+import logging
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from app.models import User, UserRole
+from app.config import settings
+from app.database.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Mot de passe inutilisable : ces comptes s'authentifient via l'annuaire
+UNUSABLE_PASSWORD = "!"
+
+MAX_REPORTED_ERRORS = 100
+
+@dataclass
+class DirectoryEntry:
+    """Utilisateur tel que décrit par une source externe (LDAP, CSV)."""
+    email: str
+    full_name: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    department: Optional[str] = None
+    is_active: bool = True
+
+@dataclass
+class SyncReport:
+    """Bilan d'une synchronisation."""
+    source: str
+    inserted: int = 0
+    updated: int = 0
+    deactivated: int = 0
+    unchanged: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    dry_run: bool = False
+
+    def add_error(self, line: Any, detail: str):
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "detail": detail})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "deactivated": self.deactivated,
+            "unchanged": self.unchanged,
+            "errors": self.errors,
+            "dryRun": self.dry_run
+        }
+
+class CsvDirectorySource:
+    """Lit des utilisateurs depuis un CSV (email, first_name, last_name, full_name, department, is_active)."""
+    name = "csv"
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def entries(self, report: SyncReport) -> Iterator[DirectoryEntry]:
+        reader = csv.DictReader(self.stream)
+        for line_number, row in enumerate(reader, start=2):
+            email = (row.get("email") or "").strip()
+            if "@" not in email:
+                report.add_error(line_number, "Adresse email invalide")
+                continue
+            yield DirectoryEntry(
+                email=email,
+                full_name=_clean(row.get("full_name")),
+                first_name=_clean(row.get("first_name")),
+                last_name=_clean(row.get("last_name")),
+                department=_clean(row.get("department")),
+                is_active=(row.get("is_active") or "true").strip().lower() not in ("0", "false", "non", "no")
+            )
+
+class LdapDirectorySource:
+    """Parcourt l'annuaire LDAP par pages (contrôle RFC 2696).
+
+    Une connexion déjà liée peut être fournie, par exemple un annuaire local de test.
+    """
+    name = "ldap"
+
+    def __init__(self, connection=None, page_size: Optional[int] = None):
+        self.connection = connection
+        self.page_size = page_size or settings.LDAP_PAGE_SIZE
+
+    def entries(self, report: SyncReport) -> Iterator[DirectoryEntry]:
+        import ldap
+        from ldap.controls import SimplePagedResultsControl
+
+        connection = self.connection or self._connect(ldap)
+        attributes = [
+            settings.LDAP_ATTR_EMAIL, settings.LDAP_ATTR_FIRST_NAME,
+            settings.LDAP_ATTR_LAST_NAME, settings.LDAP_ATTR_FULL_NAME,
+            settings.LDAP_ATTR_DEPARTMENT, "userAccountControl"
+        ]
+        control = SimplePagedResultsControl(True, size=self.page_size, cookie="")
+
+        try:
+            while True:
+                message_id = connection.search_ext(
+                    settings.LDAP_BASE_DN,
+                    ldap.SCOPE_SUBTREE,
+                    settings.LDAP_USER_FILTER,
+                    attributes,
+                    serverctrls=[control]
+                )
+                _, results, _, server_controls = connection.result3(message_id)
+
+                for dn, attrs in results:
+                    if not dn:
+                        continue  # Références de recherche
+                    email = _ldap_value(attrs, settings.LDAP_ATTR_EMAIL)
+                    if not email or "@" not in email:
+                        report.add_error(dn, "Adresse email absente ou invalide")
+                        continue
+                    account_control = _ldap_value(attrs, "userAccountControl")
+                    yield DirectoryEntry(
+                        email=email,
+                        full_name=_ldap_value(attrs, settings.LDAP_ATTR_FULL_NAME),
+                        first_name=_ldap_value(attrs, settings.LDAP_ATTR_FIRST_NAME),
+                        last_name=_ldap_value(attrs, settings.LDAP_ATTR_LAST_NAME),
+                        department=_ldap_value(attrs, settings.LDAP_ATTR_DEPARTMENT),
+                        # Active Directory : bit 2 = compte désactivé
+                        is_active=not (account_control and int(account_control) & 2)
+                    )
+
+                page_controls = [
+                    c for c in server_controls
+                    if c.controlType == SimplePagedResultsControl.controlType
+                ]
+                if not page_controls or not page_controls[0].cookie:
+                    break
+                control.cookie = page_controls[0].cookie
+        finally:
+            if self.connection is None:
+                connection.unbind_s()
+
+    def _connect(self, ldap):
+        scheme = "ldaps" if settings.LDAP_USE_SSL else "ldap"
+        connection = ldap.initialize(f"{scheme}://{settings.LDAP_HOST}:{settings.LDAP_PORT}")
+        connection.set_option(ldap.OPT_REFERRALS, 0)
+        connection.simple_bind_s(settings.LDAP_BIND_DN or "", settings.LDAP_BIND_PASSWORD or "")
+        return connection
+
+class UserSyncEngine:
+    """Compare une source d'utilisateurs à la table users et applique les écarts par lots."""
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.USER_SYNC_BATCH_SIZE
+
+    def sync(self, source, deactivate_missing: bool = False, dry_run: bool = False) -> SyncReport:
+        report = SyncReport(source=source.name, dry_run=dry_run)
+        existing = self._load_existing()
+
+        inserts: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+        seen = set()
+
+        for entry in source.entries(report):
+            email = entry.email.strip().lower()
+            if email in seen:
+                report.add_error(email, "Doublon dans la source")
+                continue
+            seen.add(email)
+
+            values = {
+                "full_name": entry.full_name or _join_names(entry.first_name, entry.last_name),
+                "first_name": entry.first_name,
+                "last_name": entry.last_name,
+                "department": entry.department,
+                "is_active": entry.is_active
+            }
+            current = existing.get(email)
+            if current is None:
+                inserts.append({
+                    "email": email,
+                    "hashed_password": UNUSABLE_PASSWORD,
+                    "role": UserRole.EMPLOYEE,
+                    "auth_source": source.name,
+                    **values
+                })
+            else:
+                user_id, current_values, _ = current
+                changed = {
+                    key: value for key, value in values.items()
+                    if value is not None and current_values.get(key) != value
+                }
+                if changed:
+                    updates.append({"id": user_id, **changed})
+                else:
+                    report.unchanged += 1
+
+        deactivations = []
+        if deactivate_missing:
+            deactivations = [
+                user_id for email, (user_id, current_values, auth_source) in existing.items()
+                if email not in seen
+                and auth_source == source.name
+                and current_values.get("is_active")
+            ]
+
+        report.inserted = len(inserts)
+        report.updated = len(updates)
+        report.deactivated = len(deactivations)
+        if dry_run:
+            return report
+
+        try:
+            for batch in _batches(inserts, self.batch_size):
+                self.db.execute(insert(User), batch)
+            for batch in _batches(updates, self.batch_size):
+                # Mise à jour groupée par clé primaire (lignes hétérogènes regroupées par SQLAlchemy)
+                self.db.execute(update(User), batch)
+            for batch in _batches(deactivations, self.batch_size):
+                self.db.execute(
+                    update(User).where(User.id.in_(batch)).values(is_active=False)
+                    .execution_options(synchronize_session=False)
+                )
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Erreur lors de la synchronisation des utilisateurs: {str(e)}")
+            raise
+
+        logger.info(
+            f"Synchronisation {source.name}: {report.inserted} créés, "
+            f"{report.updated} mis à jour, {report.deactivated} désactivés"
+        )
+        return report
+
+    def _load_existing(self) -> Dict[str, Tuple[int, Dict[str, Any], Optional[str]]]:
+        """Charge uniquement les colonnes comparées, pour tenir 100k utilisateurs en mémoire."""
+        rows = self.db.query(
+            User.id, User.email, User.full_name, User.first_name, User.last_name,
+            User.department, User.is_active, User.auth_source
+        ).execution_options(yield_per=self.batch_size)
+
+        return {
+            row.email.lower(): (
+                row.id,
+                {
+                    "full_name": row.full_name,
+                    "first_name": row.first_name,
+                    "last_name": row.last_name,
+                    "department": row.department,
+                    "is_active": row.is_active
+                },
+                row.auth_source
+            )
+            for row in rows
+        }
+
+def run_directory_sync(deactivate_missing: bool = True) -> SyncReport:
+    """Synchronise la table users avec l'annuaire LDAP (tâche planifiée)."""
+    db = SessionLocal()
+    try:
+        return UserSyncEngine(db).sync(LdapDirectorySource(), deactivate_missing=deactivate_missing)
+    finally:
+        db.close()
+
+def _batches(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+def _join_names(first_name: Optional[str], last_name: Optional[str]) -> Optional[str]:
+    return " ".join(part for part in (first_name, last_name) if part) or None
+
+def _ldap_value(attrs: Dict[str, List[bytes]], name: str) -> Optional[str]:
+    values = attrs.get(name)
+    if not values:
+        return None
+    value = values[0]
+    return _clean(value.decode("utf-8") if isinstance(value, bytes) else value)
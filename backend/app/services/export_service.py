@@ -0,0 +1,181 @@
+from datetime import datetime
+from typing import Any, Iterator, Optional, Sequence
+import csv
+import importlib.util
+import io
+import logging
+import tempfile
+from sqlalchemy import and_, func, select, true
+from sqlalchemy.orm import Session
+from app.models import User, Module, Quiz, UserProgress, Certificate, ModuleStatus
+from app.config import settings
+from app.metrics import traced
+from app.services.retention_service import attempt_scores
+
+logger = logging.getLogger(__name__)
+
+COMPLIANCE_COLUMNS = (
+    "user_id", "email", "full_name", "department", "is_active",
+    "module_id", "module_title", "status", "progress_percentage",
+    "best_score", "certificate_id", "certificate_issued_at"
+)
+
+# Lignes de données d'une feuille Excel (1 048 576 lignes, en-tête compris)
+XLSX_MAX_ROWS = 1048576 - 1
+
+# Nombre de lignes CSV accumulées avant l'envoi d'un morceau
+CSV_CHUNK_ROWS = 500
+FILE_CHUNK_SIZE = 64 * 1024
+
+class XlsxUnavailableError(RuntimeError):
+    """openpyxl n'est pas installé."""
+
+def xlsx_available() -> bool:
+    return importlib.util.find_spec("openpyxl") is not None
+
+@traced
+class ExportService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def compliance_statement(self, department: Optional[str] = None, active_only: bool = False):
+        """Requête utilisateurs × modules avec progression, meilleur score et certificat."""
+        attempts = attempt_scores()
+        best_scores = (
+            select(
+                attempts.c.user_id,
+                Quiz.module_id,
+                func.max(attempts.c.max_score).label("best_score")
+            )
+            .join(Quiz, Quiz.id == attempts.c.quiz_id)
+            .group_by(attempts.c.user_id, Quiz.module_id)
+            .subquery()
+        )
+        # Certificat le plus récent par (utilisateur, module) : id et date de la même ligne
+        ranked_certificates = (
+            select(
+                Certificate.user_id,
+                Certificate.module_id,
+                Certificate.id.label("certificate_id"),
+                Certificate.issued_date,
+                func.row_number().over(
+                    partition_by=(Certificate.user_id, Certificate.module_id),
+                    order_by=(Certificate.issued_date.desc().nulls_last(), Certificate.id.desc())
+                ).label("rank")
+            )
+            .subquery()
+        )
+        certificates = (
+            select(ranked_certificates)
+            .where(ranked_certificates.c.rank == 1)
+            .subquery()
+        )
+
+        stmt = (
+            select(
+                User.id, User.email, User.full_name, User.department, User.is_active,
+                Module.id, Module.title,
+                UserProgress.status, UserProgress.progress_percentage,
+                best_scores.c.best_score,
+                certificates.c.certificate_id, certificates.c.issued_date
+            )
+            .select_from(User)
+            .join(Module, true())
+            .outerjoin(UserProgress, and_(
+                UserProgress.user_id == User.id,
+                UserProgress.module_id == Module.id
+            ))
+            .outerjoin(best_scores, and_(
+                best_scores.c.user_id == User.id,
+                best_scores.c.module_id == Module.id
+            ))
+            .outerjoin(certificates, and_(
+                certificates.c.user_id == User.id,
+                certificates.c.module_id == Module.id
+            ))
+            .order_by(User.id, Module.order, Module.id)
+        )
+
+        if department is not None:
+            stmt = stmt.where(User.department == department)
+        if active_only:
+            stmt = stmt.where(User.is_active == True)
+        return stmt
+
+    def count_compliance_rows(self, department: Optional[str] = None, active_only: bool = False) -> int:
+        """Nombre de lignes du rapport (utilisateurs retenus × modules), sans le construire."""
+        users = self.db.query(func.count(User.id))
+        if department is not None:
+            users = users.filter(User.department == department)
+        if active_only:
+            users = users.filter(User.is_active == True)
+        return users.scalar() * self.db.query(func.count(Module.id)).scalar()
+
+    def iter_compliance_rows(self, department: Optional[str] = None,
+                             active_only: bool = False) -> Iterator[Sequence[Any]]:
+        """Parcourt les lignes via un curseur serveur, par paquets de taille fixe."""
+        result = self.db.execute(
+            self.compliance_statement(department, active_only)
+            .execution_options(yield_per=settings.EXPORT_FETCH_SIZE)
+        )
+        try:
+            for row in result:
+                yield self._format_row(row)
+        finally:
+            result.close()
+
+    def stream_csv(self, department: Optional[str] = None,
+                   active_only: bool = False) -> Iterator[bytes]:
+        """Génère le rapport CSV par morceaux, à mémoire constante."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(COMPLIANCE_COLUMNS)
+        pending = 0
+
+        for row in self.iter_compliance_rows(department, active_only):
+            writer.writerow(row)
+            pending += 1
+            if pending >= CSV_CHUNK_ROWS:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+
+        yield buffer.getvalue().encode("utf-8")
+
+    def stream_xlsx(self, department: Optional[str] = None,
+                    active_only: bool = False) -> Iterator[bytes]:
+        """Génère le rapport XLSX en mode écriture seule, via un fichier temporaire."""
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise XlsxUnavailableError("openpyxl est requis pour l'export XLSX")
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Conformité")
+        sheet.append(COMPLIANCE_COLUMNS)
+        for row in self.iter_compliance_rows(department, active_only):
+            sheet.append(row)
+
+        with tempfile.TemporaryFile() as output:
+            workbook.save(output)
+            output.seek(0)
+            while True:
+                chunk = output.read(FILE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+    def _format_row(self, row) -> Sequence[Any]:
+        (user_id, email, full_name, department, is_active,
+         module_id, module_title, status, percentage,
+         best_score, certificate_id, issued_date) = row
+        return (
+            user_id, email, full_name, department, is_active,
+            module_id, module_title,
+            (status or ModuleStatus.NOT_STARTED).value,
+            percentage or 0,
+            best_score,
+            certificate_id,
+            issued_date.isoformat() if isinstance(issued_date, datetime) else issued_date
+        )
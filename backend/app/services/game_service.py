@@ -0,0 +1,272 @@
+from bisect import insort
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from app.models import User, GameScore
+from app.config import settings
+from app.database.session import SessionLocal
+from app.metrics import traced
+
+logger = logging.getLogger(__name__)
+
+# Classement tous départements confondus
+ALL_DEPARTMENTS = "*"
+
+@dataclass(frozen=True)
+class Player:
+    user_id: int
+    name: str
+    department: Optional[str]
+
+@dataclass
+class ScoreEvent:
+    user_id: int
+    game: str
+    score: int
+    department: Optional[str]
+    played_at: datetime
+
+class PlayerCache:
+    """Cache email → joueur, pour ne pas interroger la base à chaque score reçu.
+
+    Les résultats négatifs (compte absent ou inactif) expirent plus vite :
+    un compte créé ou réactivé est pris en compte sans attendre ``ttl``.
+    """
+
+    def __init__(self, ttl: float, negative_ttl: float):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: Dict[str, Tuple[Optional[Player], float]] = {}
+        self._lock = Lock()
+
+    def resolve(self, email: str) -> Optional[Player]:
+        with self._lock:
+            entry = self._entries.get(email)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+
+        with SessionLocal() as db:
+            user = db.query(User.id, User.full_name, User.email, User.department, User.is_active)\
+                .filter(User.email == email).first()
+        player = None
+        if user is not None and user.is_active:
+            player = Player(user_id=user.id, name=user.full_name or user.email, department=user.department)
+
+        ttl = self.ttl if player is not None else self.negative_ttl
+        with self._lock:
+            self._entries[email] = (player, time.monotonic() + ttl)
+        return player
+
+class ScoreQueue:
+    """File bornée des scores en attente d'écriture."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._events: Deque[ScoreEvent] = deque()
+        self._lock = Lock()
+
+    def put(self, event: ScoreEvent) -> bool:
+        with self._lock:
+            if len(self._events) >= self.capacity:
+                return False
+            self._events.append(event)
+            return True
+
+    def drain(self, limit: int) -> List[ScoreEvent]:
+        with self._lock:
+            count = min(limit, len(self._events))
+            return [self._events.popleft() for _ in range(count)]
+
+    def restore(self, events: List[ScoreEvent]):
+        with self._lock:
+            self._events.extendleft(reversed(events))
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+class Leaderboard:
+    """Top-N des meilleurs scores par jeu et par département, maintenu incrémentalement.
+
+    Chaque tableau garde le meilleur score de chaque joueur et une liste triée
+    des N premiers ; un nouveau score ne coûte qu'une insertion dans cette
+    liste, sans jamais relire ni retrier la table. Le chargement initial
+    depuis la base a lieu au premier accès.
+
+    Chaque worker tient son propre classement : il est rechargé depuis
+    game_scores toutes les ``refresh_seconds`` pour y intégrer les scores
+    reçus par les autres workers. Les scores reçus localement depuis le
+    chargement précédent, peut-être pas encore écrits par
+    run_score_flusher, sont réappliqués ensuite (opération idempotente :
+    seul le meilleur score de chaque joueur compte).
+    """
+
+    def __init__(self, size: int, refresh_seconds: float):
+        self.size = size
+        self.refresh_seconds = refresh_seconds
+        self._best: Dict[Tuple[str, str], Dict[int, int]] = {}
+        self._top: Dict[Tuple[str, str], List[Tuple[int, float, int]]] = {}
+        self._names: Dict[int, str] = {}
+        self._recent: List[Tuple[Player, str, int, float]] = []
+        self._lock = Lock()
+        self._load_lock = Lock()
+        self._loaded_at: Optional[float] = None
+
+    def record(self, player: Player, game: str, score: int, played_at: datetime):
+        self._ensure_loaded()
+        with self._lock:
+            self._recent.append((player, game, score, played_at.timestamp()))
+            self._apply(player, game, score, played_at.timestamp())
+
+    def top(self, game: str, department: Optional[str] = None,
+            limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        with self._lock:
+            entries = list(self._top.get((game, department or ALL_DEPARTMENTS), []))
+            names = {user_id: self._names.get(user_id) for _, _, user_id in entries}
+        return [
+            {"rank": rank, "userId": user_id, "name": names[user_id], "score": -negative_score}
+            for rank, (negative_score, _, user_id) in enumerate(entries[:limit or self.size], start=1)
+        ]
+
+    def load(self, db: Session):
+        """Reconstruit les classements à partir des scores enregistrés."""
+        rows = db.query(
+            GameScore.game, GameScore.user_id, GameScore.department,
+            func.max(GameScore.score).label("best_score"),
+            User.full_name, User.email
+        ).join(User, User.id == GameScore.user_id)\
+            .group_by(GameScore.game, GameScore.user_id, GameScore.department, User.full_name, User.email)\
+            .all()
+
+        with self._lock:
+            self._best.clear()
+            self._top.clear()
+            for row in rows:
+                self._names[row.user_id] = row.full_name or row.email
+                for department in _boards(row.department):
+                    self._update((row.game, department), row.user_id, row.best_score, 0.0)
+            # Scores reçus ici depuis le chargement précédent, peut-être pas encore écrits
+            for player, game, score, achieved_at in self._recent:
+                self._apply(player, game, score, achieved_at)
+            self._recent = []
+            self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.refresh_seconds:
+            return
+        # Premier chargement : on attend ; rafraîchissement : un seul thread recharge,
+        # les autres servent le classement courant
+        if not self._load_lock.acquire(blocking=loaded_at is None):
+            return
+        try:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+            with SessionLocal() as db:
+                self.load(db)
+        except Exception as e:
+            if self._loaded_at is None:
+                raise
+            logger.error(f"Erreur lors du rechargement du classement: {str(e)}")
+        finally:
+            self._load_lock.release()
+
+    def _apply(self, player: Player, game: str, score: int, achieved_at: float):
+        self._names[player.user_id] = player.name
+        for department in _boards(player.department):
+            self._update((game, department), player.user_id, score, achieved_at)
+
+    def _update(self, board: Tuple[str, str], user_id: int, score: int, achieved_at: float):
+        best = self._best.setdefault(board, {})
+        previous = best.get(user_id)
+        if previous is not None and previous >= score:
+            return
+        best[user_id] = score
+
+        top = self._top.setdefault(board, [])
+        if len(top) >= self.size and (-score, achieved_at, user_id) >= top[-1]:
+            return
+        if previous is not None:
+            top[:] = [entry for entry in top if entry[2] != user_id]
+        insort(top, (-score, achieved_at, user_id))
+        del top[self.size:]
+
+@traced
+class GameService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def write_scores(self, events: List[ScoreEvent]) -> int:
+        """Insère les scores en une requête multi-lignes."""
+        if not events:
+            return 0
+        self.db.execute(insert(GameScore), [
+            {
+                "user_id": event.user_id,
+                "game": event.game,
+                "score": event.score,
+                "department": event.department,
+                "played_at": event.played_at
+            }
+            for event in events
+        ])
+        self.db.commit()
+        return len(events)
+
+player_cache = PlayerCache(settings.GAME_PLAYER_CACHE_TTL, settings.GAME_PLAYER_CACHE_NEGATIVE_TTL)
+score_queue = ScoreQueue(settings.GAME_SCORE_QUEUE_MAX)
+leaderboard = Leaderboard(settings.GAME_LEADERBOARD_SIZE, settings.GAME_LEADERBOARD_REFRESH_SECONDS)
+
+def record_score(player: Player, game: str, score: int) -> bool:
+    """Met en file un score et met à jour le classement ; False si la file est pleine."""
+    event = ScoreEvent(
+        user_id=player.user_id,
+        game=game,
+        score=score,
+        department=player.department,
+        played_at=datetime.utcnow()
+    )
+    if not score_queue.put(event):
+        return False
+    leaderboard.record(player, game, score, event.played_at)
+    return True
+
+def flush_pending_scores() -> int:
+    """Vide la file des scores vers la base, par lots."""
+    written = 0
+    while True:
+        events = score_queue.drain(settings.GAME_SCORE_FLUSH_BATCH_SIZE)
+        if not events:
+            return written
+
+        db = SessionLocal()
+        try:
+            written += GameService(db).write_scores(events)
+        except Exception as e:
+            db.rollback()
+            score_queue.restore(events)
+            logger.error(f"Erreur lors de l'écriture des scores: {str(e)}")
+            return written
+        finally:
+            db.close()
+
+async def run_score_flusher():
+    """Tâche de fond qui écrit périodiquement les scores en attente."""
+    try:
+        while True:
+            await asyncio.sleep(settings.GAME_SCORE_FLUSH_INTERVAL_SECONDS)
+            await asyncio.to_thread(flush_pending_scores)
+    except asyncio.CancelledError:
+        # Dernière écriture avant l'arrêt du worker
+        await asyncio.to_thread(flush_pending_scores)
+        raise
+
+def _boards(department: Optional[str]) -> Tuple[str, ...]:
+    return (ALL_DEPARTMENTS, department) if department else (ALL_DEPARTMENTS,)
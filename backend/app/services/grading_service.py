@@ -0,0 +1,212 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import logging
+from sqlalchemy import insert, tuple_
+from sqlalchemy.orm import Session
+from app.models import User, UserProgress, QuizAttempt, ModuleStatus
+from app.services.quiz_service import CachedQuiz, QuizService
+from app.services.summary_service import ModuleUpdate, SummaryService
+from app.metrics import traced
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class GradeResult:
+    """Résultat de la correction d'une tentative."""
+    quiz_id: int
+    score: float
+    passed: bool
+    correct_count: int
+    total_questions: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "quizId": self.quiz_id,
+            "score": self.score,
+            "passed": self.passed,
+            "correctAnswers": self.correct_count,
+            "totalQuestions": self.total_questions
+        }
+
+@traced
+class GradingService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.quiz_service = QuizService(db)
+
+    def grade(self, quiz: CachedQuiz, answers: Mapping[Any, Iterable[Any]]) -> GradeResult:
+        """Corrige une tentative à partir de la clé de correction précalculée."""
+        selected_by_question = self._normalize_answers(answers)
+        correct_count = 0
+
+        for question_id, key in quiz.answer_key.items():
+            selected_mask = 0
+            for answer_id in selected_by_question.get(question_id, ()):
+                # Une réponse inconnue rend la question fausse
+                selected_mask |= key.bits.get(answer_id, 1 << len(key.bits))
+            if selected_mask and selected_mask == key.correct_mask:
+                correct_count += 1
+
+        total_questions = len(quiz.answer_key)
+        score = round(correct_count / total_questions * 100, 2) if total_questions else 0.0
+        passing_score = quiz.passing_score if quiz.passing_score is not None else 0.0
+
+        return GradeResult(
+            quiz_id=quiz.quiz_id,
+            score=score,
+            passed=score >= passing_score,
+            correct_count=correct_count,
+            total_questions=total_questions
+        )
+
+    def submit(self, user: User, quiz_id: int,
+               answers: Mapping[Any, Iterable[Any]]) -> Optional[GradeResult]:
+        """Corrige une tentative et enregistre le résultat en une seule transaction."""
+        # get_quiz_payload compare la version en cache à Quiz.updated_at et
+        # reconstruit la clé de correction si le quiz a changé entre-temps
+        quiz = self.quiz_service.get_quiz_payload(quiz_id)
+        if quiz is None:
+            return None
+
+        result = self.grade(quiz, answers)
+        completed_at = datetime.utcnow()
+
+        try:
+            self.db.add(QuizAttempt(
+                user_id=user.id,
+                quiz_id=quiz_id,
+                score=result.score,
+                passed=result.passed,
+                completed_at=completed_at
+            ))
+            if quiz.module_id is not None:
+                self._apply_progress({
+                    (user.id, quiz.module_id): (result.passed, completed_at, result.score)
+                })
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Erreur lors de l'enregistrement de la tentative: {str(e)}")
+            raise
+
+        return result
+
+    def grade_batch(self, submissions: List[Dict[str, Any]]) -> Tuple[List[GradeResult], List[Dict[str, Any]]]:
+        """Corrige un lot de tentatives hors ligne et les enregistre en une transaction.
+
+        Chaque soumission contient ``user_id``, ``quiz_id``, ``answers`` et
+        éventuellement ``completed_at``. Retourne les résultats et les rejets.
+        """
+        user_ids = {submission["user_id"] for submission in submissions}
+        known_users = {
+            user_id for (user_id,) in
+            self.db.query(User.id).filter(User.id.in_(user_ids)).all()
+        } if user_ids else set()
+
+        quizzes: Dict[int, Optional[CachedQuiz]] = {}
+        results: List[GradeResult] = []
+        rejected: List[Dict[str, Any]] = []
+        attempt_rows: List[Dict[str, Any]] = []
+        progress_updates: Dict[Tuple[int, int], Tuple[bool, datetime, float]] = {}
+
+        now = datetime.utcnow()
+        for index, submission in enumerate(submissions):
+            quiz_id = submission["quiz_id"]
+            if quiz_id not in quizzes:
+                # Version vérifiée une fois par quiz et par lot
+                quizzes[quiz_id] = self.quiz_service.get_quiz_payload(quiz_id)
+            quiz = quizzes[quiz_id]
+
+            if quiz is None:
+                rejected.append({"index": index, "detail": "Quiz non trouvé"})
+                continue
+            if submission["user_id"] not in known_users:
+                rejected.append({"index": index, "detail": "Utilisateur non trouvé"})
+                continue
+
+            result = self.grade(quiz, submission["answers"])
+            # Horloge de kiosque en avance : une tentative ne peut pas dater du futur
+            completed_at = min(submission.get("completed_at") or now, now)
+            results.append(result)
+            attempt_rows.append({
+                "user_id": submission["user_id"],
+                "quiz_id": quiz_id,
+                "score": result.score,
+                "passed": result.passed,
+                "completed_at": completed_at
+            })
+
+            if quiz.module_id is not None:
+                key = (submission["user_id"], quiz.module_id)
+                passed, last, best = progress_updates.get(key, (False, completed_at, result.score))
+                progress_updates[key] = (
+                    passed or result.passed,
+                    max(last, completed_at),
+                    max(best, result.score)
+                )
+
+        if not attempt_rows:
+            return results, rejected
+
+        try:
+            self.db.execute(insert(QuizAttempt), attempt_rows)
+            self._apply_progress(progress_updates)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Erreur lors de l'enregistrement du lot de tentatives: {str(e)}")
+            raise
+
+        logger.info(f"{len(attempt_rows)} tentatives corrigées, {len(rejected)} rejetées")
+        return results, rejected
+
+    def _apply_progress(self, updates: Dict[Tuple[int, int], Tuple[bool, datetime, float]]):
+        """Met à jour la progression et les résumés des couples (utilisateur, module) sans valider."""
+        existing = {
+            (progress.user_id, progress.module_id): progress
+            for progress in self.db.query(UserProgress).filter(
+                tuple_(UserProgress.user_id, UserProgress.module_id).in_(list(updates))
+            )
+        }
+
+        summary_updates: Dict[int, List[ModuleUpdate]] = {}
+        for (user_id, module_id), (passed, accessed_at, best_score) in updates.items():
+            progress = existing.get((user_id, module_id))
+            if progress is None:
+                progress = UserProgress(
+                    user_id=user_id,
+                    module_id=module_id,
+                    status=ModuleStatus.NOT_STARTED,
+                    progress_percentage=0,
+                    started_at=accessed_at
+                )
+                self.db.add(progress)
+
+            if passed and progress.status != ModuleStatus.COMPLETED:
+                progress.status = ModuleStatus.COMPLETED
+                progress.progress_percentage = 100
+                progress.completed_at = accessed_at
+            elif progress.status in (None, ModuleStatus.NOT_STARTED):
+                progress.status = ModuleStatus.IN_PROGRESS
+            if progress.last_accessed is None or progress.last_accessed < accessed_at:
+                progress.last_accessed = accessed_at
+
+            summary_updates.setdefault(user_id, []).append(ModuleUpdate(
+                module_id=module_id,
+                status=progress.status,
+                progress=progress.progress_percentage,
+                score=best_score
+            ))
+
+        SummaryService(self.db).apply_updates(summary_updates)
+
+    def _normalize_answers(self, answers: Mapping[Any, Iterable[Any]]) -> Dict[int, List[int]]:
+        """Convertit les identifiants reçus du frontend (souvent des chaînes) en entiers."""
+        normalized = {}
+        for question_id, answer_ids in answers.items():
+            try:
+                normalized[int(question_id)] = [int(answer_id) for answer_id in answer_ids]
+            except (TypeError, ValueError):
+                continue
+        return normalized
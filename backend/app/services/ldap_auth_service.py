@@ -0,0 +1,273 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import logging
+import queue
+import time
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class LdapUnavailableError(Exception):
+    """Annuaire injoignable ou pool de connexions saturé."""
+
+class LdapConnectionPool:
+    """Pool borné de connexions LDAP réutilisables.
+
+    Les connexions inactives depuis plus de ``healthcheck_interval`` secondes
+    sont vérifiées avant d'être prêtées ; toute connexion ayant levé une
+    exception est jetée et recréée à la demande.
+    """
+
+    def __init__(self, name: str, size: int, factory: Callable[[], Any],
+                 timeout: float, healthcheck_interval: float,
+                 healthcheck: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.size = size
+        self.timeout = timeout
+        self.healthcheck_interval = healthcheck_interval
+        self._factory = factory
+        self._healthcheck = healthcheck or (lambda connection: connection.whoami_s())
+        self._idle: "queue.LifoQueue[Tuple[Any, float]]" = queue.LifoQueue()
+        self._lock = Lock()
+        self._created = 0
+
+        # Métriques
+        self._acquired = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._discarded = 0
+        self._healthcheck_failures = 0
+
+    def acquire(self) -> Any:
+        start = time.monotonic()
+        try:
+            connection, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            connection, last_used = self._create_or_wait()
+
+        if time.monotonic() - last_used > self.healthcheck_interval:
+            connection = self._check(connection)
+
+        self._record_wait(time.monotonic() - start)
+        return connection
+
+    def release(self, connection: Any, broken: bool = False):
+        if broken:
+            self._discard(connection)
+            return
+        self._idle.put((connection, time.monotonic()))
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            self.release(connection, broken=True)
+            raise
+        else:
+            self.release(connection)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "open": self._created,
+                "idle": self._idle.qsize(),
+                "acquired": self._acquired,
+                "wait_seconds_total": round(self._wait_total, 6),
+                "wait_seconds_max": round(self._wait_max, 6),
+                "wait_seconds_avg": round(self._wait_total / self._acquired, 6) if self._acquired else 0,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "healthcheck_failures": self._healthcheck_failures
+            }
+
+    def _create_or_wait(self) -> Tuple[Any, float]:
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+
+        if can_create:
+            try:
+                return self._factory(), time.monotonic()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise LdapUnavailableError(f"Pool LDAP '{self.name}' saturé")
+
+    def _check(self, connection: Any) -> Any:
+        try:
+            self._healthcheck(connection)
+            return connection
+        except Exception as e:
+            logger.warning(f"Connexion LDAP '{self.name}' invalide, reconnexion: {str(e)}")
+            with self._lock:
+                self._healthcheck_failures += 1
+            self._discard(connection)
+            with self._lock:
+                self._created += 1
+            try:
+                return self._factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    def _discard(self, connection: Any):
+        with self._lock:
+            self._created -= 1
+            self._discarded += 1
+        try:
+            connection.unbind_s()
+        except Exception:
+            pass
+
+    def _record_wait(self, waited: float):
+        with self._lock:
+            self._acquired += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+class DnCache:
+    """Cache à durée de vie courte des résolutions email → DN, positives et négatives."""
+
+    def __init__(self, ttl: float, negative_ttl: float):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: Dict[str, Tuple[Optional[str], float]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[bool, Optional[str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self.hits += 1
+                return True, entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, dn: Optional[str]):
+        ttl = self.ttl if dn is not None else self.negative_ttl
+        with self._lock:
+            self._entries[key] = (dn, time.monotonic() + ttl)
+
+    def metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+class LdapAuthenticator:
+    """Authentification LDAP : recherche du DN puis bind de l'utilisateur.
+
+    Les appels bloquants de python-ldap s'exécutent dans un pool de threads
+    dédié pour ne jamais bloquer la boucle d'événements.
+    """
+
+    def __init__(self):
+        self._search_pool = LdapConnectionPool(
+            "search", settings.LDAP_POOL_SIZE, self._service_connection,
+            settings.LDAP_POOL_TIMEOUT, settings.LDAP_HEALTHCHECK_INTERVAL
+        )
+        self._bind_pool = LdapConnectionPool(
+            "bind", settings.LDAP_POOL_SIZE, self._raw_connection,
+            settings.LDAP_POOL_TIMEOUT, settings.LDAP_HEALTHCHECK_INTERVAL
+        )
+        self._dn_cache = DnCache(settings.LDAP_DN_CACHE_TTL, settings.LDAP_DN_NEGATIVE_CACHE_TTL)
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.LDAP_POOL_SIZE * 2,
+            thread_name_prefix="ldap-auth"
+        )
+
+    async def authenticate(self, email: str, password: str) -> bool:
+        """Vérifie les identifiants ; lève LdapUnavailableError si l'annuaire est indisponible."""
+        if not email or not password:
+            # Un mot de passe vide réussirait un bind anonyme
+            return False
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._authenticate, email, password)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "pools": {
+                "search": self._search_pool.metrics(),
+                "bind": self._bind_pool.metrics()
+            },
+            "dn_cache": self._dn_cache.metrics()
+        }
+
+    def _authenticate(self, email: str, password: str) -> bool:
+        import ldap
+
+        try:
+            dn = self._lookup_dn(email.strip().lower())
+            if dn is None:
+                return False
+            with self._bind_pool.connection() as connection:
+                try:
+                    connection.simple_bind_s(dn, password)
+                    return True
+                except ldap.INVALID_CREDENTIALS:
+                    return False
+        except ldap.LDAPError as e:
+            logger.error(f"Erreur LDAP lors de l'authentification: {str(e)}")
+            raise LdapUnavailableError(str(e))
+
+    def _lookup_dn(self, email: str) -> Optional[str]:
+        found, dn = self._dn_cache.get(email)
+        if found:
+            return dn
+
+        if settings.LDAP_USER_DN_TEMPLATE:
+            dn = settings.LDAP_USER_DN_TEMPLATE.format(username=email.split("@")[0], email=email)
+        else:
+            import ldap
+            from ldap.filter import escape_filter_chars
+
+            with self._search_pool.connection() as connection:
+                results = connection.search_s(
+                    settings.LDAP_BASE_DN,
+                    ldap.SCOPE_SUBTREE,
+                    f"(&{settings.LDAP_USER_FILTER}({settings.LDAP_ATTR_EMAIL}={escape_filter_chars(email)}))",
+                    ["1.1"]
+                )
+            entries = [entry_dn for entry_dn, _ in results if entry_dn]
+            dn = entries[0] if len(entries) == 1 else None
+
+        self._dn_cache.put(email, dn)
+        return dn
+
+    def _raw_connection(self):
+        import ldap
+
+        scheme = "ldaps" if settings.LDAP_USE_SSL else "ldap"
+        connection = ldap.initialize(f"{scheme}://{settings.LDAP_HOST}:{settings.LDAP_PORT}")
+        connection.set_option(ldap.OPT_REFERRALS, 0)
+        connection.set_option(ldap.OPT_NETWORK_TIMEOUT, settings.LDAP_NETWORK_TIMEOUT)
+        connection.set_option(ldap.OPT_TIMEOUT, settings.LDAP_NETWORK_TIMEOUT)
+        return connection
+
+    def _service_connection(self):
+        connection = self._raw_connection()
+        connection.simple_bind_s(settings.LDAP_BIND_DN or "", settings.LDAP_BIND_PASSWORD or "")
+        return connection
+
+@lru_cache()
+def get_ldap_authenticator() -> LdapAuthenticator:
+    return LdapAuthenticator()
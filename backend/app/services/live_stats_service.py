@@ -0,0 +1,240 @@
+from threading import Lock
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import time
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from app.models import User, Module, Quiz, UserProgress, QuizAttempt
+from app.config import settings
+from app.database.session import reporting_session
+from app.responses import dump_json
+from app.services.stats_service import StatsService
+
+logger = logging.getLogger(__name__)
+
+# Tables dont la modification change les statistiques du tableau de bord
+TRACKED_MODELS = (User, Module, Quiz, UserProgress, QuizAttempt)
+
+# Événements en attente par client avant de lui renvoyer un instantané complet
+MAX_PENDING_EVENTS = 16
+
+_generation = 0
+_generation_lock = Lock()
+
+def mark_stats_changed():
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+def stats_generation() -> int:
+    return _generation
+
+def compute_dashboard_stats() -> Dict[str, Any]:
+    """Calcule les sections du tableau de bord dans une session de rapport dédiée."""
+    db = reporting_session()
+    try:
+        service = StatsService(db)
+        return {
+            "global": service.get_global_stats(),
+            "modules": service.get_module_stats(),
+            "departments": service.get_department_stats(),
+            "risk_assessment": service.get_risk_assessment()
+        }
+    finally:
+        db.close()
+
+def stats_fingerprint() -> Tuple:
+    """Empreinte bon marché des tables suivies, identique pour tous les workers.
+
+    Des compteurs et des maxima indexés, lus en une requête : suffisant pour
+    repérer une tentative, une progression ou un contenu modifié par un
+    autre processus. Ce qui n'y apparaît pas (changement de service d'un
+    utilisateur, par exemple) est rattrapé par le rafraîchissement périodique.
+    """
+    db = reporting_session()
+    try:
+        return tuple(db.execute(select(
+            select(func.count(User.id)).scalar_subquery(),
+            select(func.count(User.id)).where(User.is_active.is_(True)).scalar_subquery(),
+            select(func.count(Module.id)).scalar_subquery(),
+            select(func.max(Module.updated_at)).scalar_subquery(),
+            select(func.count(Quiz.id)).scalar_subquery(),
+            select(func.max(Quiz.updated_at)).scalar_subquery(),
+            select(func.count(UserProgress.id)).scalar_subquery(),
+            select(func.max(UserProgress.last_accessed)).scalar_subquery(),
+            select(func.max(QuizAttempt.id)).scalar_subquery()
+        )).one())
+    finally:
+        db.close()
+
+class StatsBroadcaster:
+    """Calcule les statistiques une fois par fenêtre de changement et les diffuse.
+
+    Chaque client reçoit un événement ``snapshot`` à la connexion, puis des
+    événements ``delta`` ne contenant que les sections modifiées. Le calcul
+    et la sérialisation sont partagés : N administrateurs connectés coûtent
+    un seul calcul par fenêtre. La tâche de calcul ne tourne que tant
+    qu'au moins un client est connecté.
+
+    Les commits du processus courant sont signalés immédiatement par les
+    événements de session ; ceux des autres workers sont repérés par
+    stats_fingerprint, sondée toutes les ``probe_interval`` secondes.
+    """
+
+    def __init__(self, window: Optional[float] = None, refresh_interval: Optional[float] = None,
+                 heartbeat: Optional[float] = None, probe_interval: Optional[float] = None,
+                 compute: Callable[[], Dict[str, Any]] = compute_dashboard_stats,
+                 probe: Callable[[], Tuple] = stats_fingerprint):
+        self.window = window or settings.STATS_STREAM_WINDOW_SECONDS
+        self.refresh_interval = refresh_interval or settings.STATS_STREAM_REFRESH_SECONDS
+        self.heartbeat = heartbeat or settings.STATS_STREAM_HEARTBEAT_SECONDS
+        self.probe_interval = settings.STATS_STREAM_PROBE_SECONDS if probe_interval is None else probe_interval
+        self._compute = compute
+        self._probe = probe
+        self._fingerprint: Optional[Tuple] = None
+        self._probed_at = 0.0
+        self._subscribers: Set["asyncio.Queue[bytes]"] = set()
+        self._sections: Dict[str, bytes] = {}
+        self._snapshot: Optional[bytes] = None
+        self._version = 0
+        self._seen_generation: Optional[int] = None
+        self._refreshed_at = 0.0
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self.computations = 0
+
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        """Flux SSE d'un client ; se désabonne à la déconnexion."""
+        queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=MAX_PENDING_EVENTS)
+        self._subscribers.add(queue)
+        self._ensure_running()
+        try:
+            if self._snapshot is None:
+                await self.refresh()
+            yield self._snapshot
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    # Commentaire SSE : garde la connexion ouverte à travers les proxys
+                    yield b": keep-alive\n\n"
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers and self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    async def refresh(self, force: bool = False):
+        """Recalcule les statistiques et diffuse les sections qui ont changé.
+
+        ``force`` recalcule même si rien n'a changé dans ce processus
+        (modification repérée par la sonde d'empreinte).
+        """
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            generation = stats_generation()
+            if not force and self._snapshot is not None and generation == self._seen_generation \
+                    and time.monotonic() - self._refreshed_at < self.refresh_interval:
+                return  # Déjà recalculé par un appel concurrent
+
+            self._seen_generation = generation
+            self._refreshed_at = time.monotonic()
+            if self.probe_interval:
+                # Empreinte relevée avant le calcul : une écriture concurrente sera vue à la prochaine sonde
+                self._fingerprint = await asyncio.to_thread(self._probe)
+                self._probed_at = time.monotonic()
+            stats = await asyncio.to_thread(self._compute)
+            self.computations += 1
+
+            sections = {name: dump_json(value) for name, value in stats.items()}
+            changed = {
+                name: body for name, body in sections.items()
+                if self._sections.get(name) != body
+            }
+            if not changed and self._snapshot is not None:
+                return
+
+            had_snapshot = self._snapshot is not None
+            self._version += 1
+            self._sections = sections
+            self._snapshot = _encode_event("snapshot", self._version, sections)
+            if had_snapshot:
+                self._publish(_encode_event("delta", self._version, changed))
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "computations": self.computations,
+            "version": self._version
+        }
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.window)
+            stale = time.monotonic() - self._refreshed_at >= self.refresh_interval
+            try:
+                if await self._changed_elsewhere():
+                    await self.refresh(force=True)
+                elif stats_generation() != self._seen_generation or stale:
+                    await self.refresh()
+            except Exception as e:
+                logger.error(f"Erreur lors du calcul des statistiques en direct: {str(e)}")
+
+    async def _changed_elsewhere(self) -> bool:
+        """Sonde l'empreinte des tables si l'intervalle est écoulé ; vrai si elle a changé."""
+        if not self.probe_interval or time.monotonic() - self._probed_at < self.probe_interval:
+            return False
+        self._probed_at = time.monotonic()
+        fingerprint = await asyncio.to_thread(self._probe)
+        previous, self._fingerprint = self._fingerprint, fingerprint
+        return previous is not None and fingerprint != previous
+
+    def _publish(self, message: bytes):
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Client trop lent : on remplace son retard par l'état complet
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._snapshot)
+
+def _encode_event(name: str, version: int, sections: Dict[str, bytes]) -> bytes:
+    """Assemble un événement SSE à partir des sections déjà sérialisées."""
+    body = b",".join(json.dumps(key).encode() + b":" + value for key, value in sections.items())
+    data = b'{"version":' + str(version).encode() + b',"sections":{' + body + b"}}"
+    return b"event: " + name.encode() + b"\nid: " + str(version).encode() + b"\ndata: " + data + b"\n\n"
+
+stats_broadcaster = StatsBroadcaster()
+
+# Détection des changements : marque la session, puis signale après validation
+@event.listens_for(Session, "before_flush")
+def _track_stats_changes(session: Session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, TRACKED_MODELS):
+            session.info["stats_changed"] = True
+            return
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_stats_changes(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, TRACKED_MODELS):
+        orm_execute_state.session.info["stats_changed"] = True
+
+@event.listens_for(Session, "after_commit")
+def _signal_stats_changes(session: Session):
+    if session.info.pop("stats_changed", False):
+        mark_stats_changed()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stats_changes(session: Session):
+    session.info.pop("stats_changed", None)
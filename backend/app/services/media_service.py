@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import AsyncIterator, Optional, Tuple
+import mimetypes
+import os
+import anyio
+from sqlalchemy.orm import Session, joinedload
+from app.models import Module
+from app.config import settings
+from app.metrics import traced
+
+UPLOADS_URL_PREFIX = "/uploads/"
+
+class RangeNotSatisfiableError(ValueError):
+    """Plage demandée hors des limites du fichier."""
+
+@dataclass
+class MediaFile:
+    path: str           # Chemin absolu sur disque
+    relative_path: str  # Relatif à UPLOAD_DIR, pour X-Accel-Redirect
+    mime_type: str
+    size: int
+    etag: str
+    last_modified: datetime
+
+    @property
+    def last_modified_header(self) -> str:
+        return format_datetime(self.last_modified, usegmt=True)
+
+@traced
+class MediaService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_module_media(self, module_id: int) -> Optional[MediaFile]:
+        """Fichier de contenu d'un module, ou None s'il n'existe pas sur disque."""
+        module = self.db.query(Module).options(joinedload(Module.content_file))\
+            .filter(Module.id == module_id).first()
+        if module is None:
+            return None
+
+        content_file = module.content_file
+        if content_file is not None:
+            relative_path = content_file.path
+            mime_type = content_file.mime_type
+            # Le nom du fichier est son SHA-256 : l'ETag fort ne change jamais
+            etag = f'"{content_file.sha256}"'
+        elif module.content_url and module.content_url.startswith(UPLOADS_URL_PREFIX):
+            # Contenus antérieurs aux uploads dédupliqués
+            relative_path = module.content_url[len(UPLOADS_URL_PREFIX):]
+            mime_type = mimetypes.guess_type(relative_path)[0] or "application/octet-stream"
+            etag = None
+        else:
+            return None
+
+        upload_dir = os.path.realpath(settings.UPLOAD_DIR)
+        path = os.path.realpath(os.path.join(upload_dir, relative_path))
+        if not path.startswith(upload_dir + os.sep):
+            return None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        return MediaFile(
+            path=path,
+            relative_path=os.path.relpath(path, upload_dir),
+            mime_type=mime_type,
+            size=stat.st_size,
+            etag=etag or f'"{int(stat.st_mtime)}-{stat.st_size}"',
+            last_modified=datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+        )
+
+def not_modified(media: MediaFile, if_none_match: Optional[str],
+                 if_modified_since: Optional[str]) -> bool:
+    """Évalue If-None-Match, puis If-Modified-Since s'il est seul (RFC 9110)."""
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or media.etag in tags
+    since = _parse_http_date(if_modified_since)
+    return since is not None and media.last_modified <= since
+
+def requested_range(media: MediaFile, range_header: Optional[str],
+                    if_range: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Plage (début, fin incluse) à servir, ou None pour le fichier entier.
+
+    Seules les plages uniques sont servies en 206 ; une demande multiple
+    reçoit le fichier complet, ce que la RFC autorise.
+    """
+    if not range_header:
+        return None
+    if if_range and not _if_range_matches(media, if_range):
+        return None  # Le fichier a changé depuis la première réponse
+
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    if media.size == 0:
+        raise RangeNotSatisfiableError(range_header)  # Aucun octet à servir
+
+    first, _, last = ranges.strip().partition("-")
+    try:
+        if first == "":
+            # Suffixe : les N derniers octets
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiableError(range_header)
+            return max(media.size - length, 0), media.size - 1
+        start = int(first)
+        end = int(last) if last else media.size - 1
+    except ValueError:
+        return None
+
+    if start >= media.size or start > end:
+        raise RangeNotSatisfiableError(range_header)
+    return start, min(end, media.size - 1)
+
+async def iter_file_range(path: str, start: int, end: int,
+                          chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Lit la plage [start, end] par morceaux, sans charger le fichier en mémoire."""
+    chunk_size = chunk_size or settings.MEDIA_CHUNK_SIZE
+    remaining = end - start + 1
+    async with await anyio.open_file(path, "rb") as file:
+        await file.seek(start)
+        while remaining > 0:
+            chunk = await file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def _if_range_matches(media: MediaFile, if_range: str) -> bool:
+    if_range = if_range.strip()
+    if if_range.startswith(('"', "W/")):
+        # Comparaison forte : un ETag faible ne valide jamais une plage
+        return if_range == media.etag
+    since = _parse_http_date(if_range)
+    return since is not None and media.last_modified <= since
+
+def _parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
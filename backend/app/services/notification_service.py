@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 from sqlalchemy.orm import Session
 from app.models import User, Module, UserProgress
 from app.config import settings
@@ -8,19 +8,22 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-# Configuration de FastMail
-mail_config = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_TLS=settings.MAIL_TLS,
-    MAIL_SSL=settings.MAIL_SSL,
-    USE_CREDENTIALS=True
-)
+@lru_cache()
+def get_fastmail():
+    """Construit le client FastMail au premier envoi plutôt qu'à l'import."""
+    from fastapi_mail import FastMail, ConnectionConfig
 
-fastmail = FastMail(mail_config)
+    mail_config = ConnectionConfig(
+        MAIL_USERNAME=settings.MAIL_USERNAME,
+        MAIL_PASSWORD=settings.MAIL_PASSWORD,
+        MAIL_FROM=settings.MAIL_FROM,
+        MAIL_PORT=settings.MAIL_PORT,
+        MAIL_SERVER=settings.MAIL_SERVER,
+        MAIL_TLS=settings.MAIL_TLS,
+        MAIL_SSL=settings.MAIL_SSL,
+        USE_CREDENTIALS=True
+    )
+    return FastMail(mail_config)
 
 class NotificationService:
     def __init__(self, db: Session):
@@ -44,6 +47,8 @@ class NotificationService:
 
     async def send_completion_notification(self, user: User, module: Module):
         """Envoie une notification de félicitations lorsqu'un module est complété."""
+        from fastapi_mail import MessageSchema
+
         try:
             message = MessageSchema(
                 subject="Formation Cybersécurité - Module complété",
@@ -52,7 +57,7 @@ class NotificationService:
                 subtype="html"
             )
             
-            await fastmail.send_message(message)
+            await get_fastmail().send_message(message)
             logger.info(f"Email de félicitations envoyé à {user.email} pour le module {module.title}")
 
         except Exception as e:
@@ -61,6 +66,8 @@ class NotificationService:
 
     async def send_certificate_email(self, user: User, module: Module, certificate_url: str):
         """Envoie le certificat par email après la réussite d'un module."""
+        from fastapi_mail import MessageSchema
+
         try:
             message = MessageSchema(
                 subject="Formation Cybersécurité - Votre certificat",
@@ -73,7 +80,7 @@ class NotificationService:
                 subtype="html"
             )
             
-            await fastmail.send_message(message)
+            await get_fastmail().send_message(message)
             logger.info(f"Email avec certificat envoyé à {user.email}")
 
         except Exception as e:
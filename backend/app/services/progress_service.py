@@ -0,0 +1,194 @@
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+import asyncio
+import logging
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.models import Module, UserProgress, ModuleStatus
+from app.config import settings
+from app.database.session import SessionLocal
+from app.services.summary_service import ModuleUpdate, SummaryService
+from app.metrics import traced
+
+logger = logging.getLogger(__name__)
+
+ProgressKey = Tuple[int, int]
+
+class ProgressBuffer:
+    """Regroupe en mémoire les mises à jour de progression par (utilisateur, module).
+
+    Seule la dernière valeur reçue est conservée entre deux écritures.
+    """
+
+    def __init__(self):
+        self._pending: Dict[ProgressKey, Tuple[float, datetime]] = {}
+        self._lock = Lock()
+
+    def record(self, user_id: int, module_id: int, percentage: float):
+        with self._lock:
+            self._pending[(user_id, module_id)] = (percentage, datetime.utcnow())
+
+    def discard(self, user_id: int, module_id: int):
+        with self._lock:
+            self._pending.pop((user_id, module_id), None)
+
+    def drain(self) -> Dict[ProgressKey, Tuple[float, datetime]]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, entries: Dict[ProgressKey, Tuple[float, datetime]]):
+        """Remet en attente des entrées non écrites, sans écraser des valeurs plus récentes."""
+        with self._lock:
+            for key, value in entries.items():
+                self._pending.setdefault(key, value)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+progress_buffer = ProgressBuffer()
+
+@traced
+class ProgressService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def complete_module(self, user_id: int, module_id: int):
+        """Enregistre immédiatement la complétion d'un module."""
+        progress_buffer.discard(user_id, module_id)
+        now = datetime.utcnow()
+        self._upsert([{
+            "user_id": user_id,
+            "module_id": module_id,
+            "status": ModuleStatus.COMPLETED,
+            "progress_percentage": 100,
+            "started_at": now,
+            "completed_at": now,
+            "last_accessed": now
+        }])
+        SummaryService(self.db).apply_updates({
+            user_id: [ModuleUpdate(module_id=module_id, status=ModuleStatus.COMPLETED)]
+        })
+        self.db.commit()
+
+    def flush(self, pending: Dict[ProgressKey, Tuple[float, datetime]]) -> int:
+        """Écrit un lot de progressions regroupées avec des upserts par paquets."""
+        if not pending:
+            return 0
+
+        # Les modules inconnus feraient échouer tout le lot
+        module_ids = {module_id for _, module_id in pending}
+        known_modules = {
+            module_id for (module_id,) in
+            self.db.query(Module.id).filter(Module.id.in_(module_ids)).all()
+        }
+
+        rows = [
+            {
+                "user_id": user_id,
+                "module_id": module_id,
+                "status": ModuleStatus.IN_PROGRESS,
+                "progress_percentage": min(max(percentage, 0), 100),
+                "started_at": accessed_at,
+                "completed_at": None,
+                "last_accessed": accessed_at
+            }
+            for (user_id, module_id), (percentage, accessed_at) in pending.items()
+            if module_id in known_modules
+        ]
+
+        batch_size = settings.PROGRESS_FLUSH_BATCH_SIZE
+        for start in range(0, len(rows), batch_size):
+            self._upsert(rows[start:start + batch_size])
+
+        summary_updates: Dict[int, List[ModuleUpdate]] = {}
+        for row in rows:
+            summary_updates.setdefault(row["user_id"], []).append(ModuleUpdate(
+                module_id=row["module_id"],
+                status=row["status"],
+                progress=row["progress_percentage"]
+            ))
+        SummaryService(self.db).apply_updates(summary_updates)
+        self.db.commit()
+        return len(rows)
+
+    def _upsert(self, rows: List[Dict[str, Any]]):
+        """Insère ou met à jour des progressions sans jamais revenir sur une complétion."""
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            self._merge(rows)
+            return
+
+        stmt = insert(UserProgress)
+        completed = UserProgress.status == ModuleStatus.COMPLETED
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserProgress.user_id, UserProgress.module_id],
+            set_={
+                "status": case((completed, UserProgress.status), else_=stmt.excluded.status),
+                "progress_percentage": case(
+                    (completed, UserProgress.progress_percentage),
+                    else_=stmt.excluded.progress_percentage
+                ),
+                "started_at": func.coalesce(UserProgress.started_at, stmt.excluded.started_at),
+                "completed_at": case(
+                    (completed, UserProgress.completed_at),
+                    else_=stmt.excluded.completed_at
+                ),
+                "last_accessed": stmt.excluded.last_accessed
+            }
+        )
+        self.db.execute(stmt, rows)
+
+    def _merge(self, rows: List[Dict[str, Any]]):
+        """Repli pour les bases sans ON CONFLICT : lecture groupée puis mise à jour."""
+        user_ids = {row["user_id"] for row in rows}
+        existing = {
+            (progress.user_id, progress.module_id): progress
+            for progress in self.db.query(UserProgress).filter(UserProgress.user_id.in_(user_ids))
+        }
+        for row in rows:
+            progress = existing.get((row["user_id"], row["module_id"]))
+            if progress is None:
+                self.db.add(UserProgress(**row))
+                continue
+            if progress.status != ModuleStatus.COMPLETED:
+                progress.status = row["status"]
+                progress.progress_percentage = row["progress_percentage"]
+                progress.completed_at = row["completed_at"]
+            if progress.started_at is None:
+                progress.started_at = row["started_at"]
+            progress.last_accessed = row["last_accessed"]
+
+def flush_pending_progress() -> int:
+    """Vide le tampon de progression vers la base de données."""
+    pending = progress_buffer.drain()
+    if not pending:
+        return 0
+
+    db = SessionLocal()
+    try:
+        return ProgressService(db).flush(pending)
+    except Exception as e:
+        db.rollback()
+        progress_buffer.restore(pending)
+        logger.error(f"Erreur lors de l'écriture des progressions: {str(e)}")
+        return 0
+    finally:
+        db.close()
+
+async def run_progress_flusher():
+    """Tâche de fond qui écrit périodiquement les progressions regroupées."""
+    try:
+        while True:
+            await asyncio.sleep(settings.PROGRESS_FLUSH_INTERVAL_SECONDS)
+            await asyncio.to_thread(flush_pending_progress)
+    except asyncio.CancelledError:
+        # Dernière écriture avant l'arrêt du worker
+        await asyncio.to_thread(flush_pending_progress)
+        raise
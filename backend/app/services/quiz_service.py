@@ -0,0 +1,203 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, Optional, Set
+import hashlib
+import json
+import logging
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload
+from app.models import Quiz, Question, Answer
+from app.config import settings
+from app.metrics import traced
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class QuestionKey:
+    """Clé de correction d'une question : un bit par réponse proposée."""
+    bits: Dict[int, int]
+    correct_mask: int
+
+@dataclass
+class CachedQuiz:
+    """Payload d'un quiz sérialisé une seule fois, avec son ETag et sa clé de correction."""
+    quiz_id: int
+    module_id: Optional[int]
+    passing_score: Optional[float]
+    version: Optional[datetime]
+    body: bytes
+    etag: str
+    answer_key: Dict[int, QuestionKey]
+    built_at: float
+
+class QuizCache:
+    """Cache LRU en mémoire des quiz sérialisés, indexé par identifiant de quiz.
+
+    Chaque worker a son propre cache : une entrée n'est servie qu'après
+    comparaison de sa version avec Quiz.updated_at, ce qui couvre les
+    modifications faites par les autres workers. L'invalidation après
+    commit ne fait que libérer plus tôt la mémoire du worker local.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, CachedQuiz]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, quiz_id: int) -> Optional[CachedQuiz]:
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry is not None:
+                self._entries.move_to_end(quiz_id)
+            return entry
+
+    def put(self, entry: CachedQuiz):
+        with self._lock:
+            self._entries[entry.quiz_id] = entry
+            self._entries.move_to_end(entry.quiz_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_fresh(self, entry: CachedQuiz) -> bool:
+        """Entrée assez récente pour être conservée (borne d'âge, pas de validité)."""
+        return time.monotonic() - entry.built_at < self.ttl_seconds
+
+    def invalidate(self, quiz_id: int):
+        with self._lock:
+            self._entries.pop(quiz_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+quiz_cache = QuizCache(
+    max_entries=settings.QUIZ_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.QUIZ_CACHE_TTL_SECONDS
+)
+
+@traced
+class QuizService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_quiz_payload(self, quiz_id: int) -> Optional[CachedQuiz]:
+        """Récupère le payload sérialisé d'un quiz, depuis le cache si sa version est à jour."""
+        entry = quiz_cache.get(quiz_id)
+
+        # Vérification de la version courante sans charger les questions : une
+        # modification validée par un autre worker n'est jamais masquée par le cache
+        row = self.db.query(Quiz.updated_at).filter(Quiz.id == quiz_id).first()
+        if row is None:
+            quiz_cache.invalidate(quiz_id)
+            return None
+
+        if entry is not None and entry.version == row.updated_at and quiz_cache.is_fresh(entry):
+            return entry
+
+        return self._build_entry(quiz_id)
+
+    def _build_entry(self, quiz_id: int) -> Optional[CachedQuiz]:
+        """Charge le quiz complet en une requête et le sérialise."""
+        quiz = (
+            self.db.query(Quiz)
+            .options(joinedload(Quiz.questions).joinedload(Question.answers))
+            .filter(Quiz.id == quiz_id)
+            .one_or_none()
+        )
+        if quiz is None:
+            return None
+
+        body = json.dumps(
+            self._serialize_quiz(quiz),
+            ensure_ascii=False,
+            separators=(",", ":")
+        ).encode("utf-8")
+
+        entry = CachedQuiz(
+            quiz_id=quiz.id,
+            module_id=quiz.module_id,
+            passing_score=quiz.passing_score,
+            version=quiz.updated_at,
+            body=body,
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+            answer_key=self._build_answer_key(quiz),
+            built_at=time.monotonic()
+        )
+        quiz_cache.put(entry)
+        logger.debug(f"Quiz {quiz_id} mis en cache (version {quiz.updated_at})")
+        return entry
+
+    def _build_answer_key(self, quiz: Quiz) -> Dict[int, QuestionKey]:
+        """Précalcule, pour chaque question, le masque des bonnes réponses."""
+        answer_key = {}
+        for question in quiz.questions:
+            answers = sorted(question.answers, key=lambda a: a.id)
+            bits = {answer.id: 1 << position for position, answer in enumerate(answers)}
+            correct_mask = 0
+            for answer in answers:
+                if answer.is_correct:
+                    correct_mask |= bits[answer.id]
+            answer_key[question.id] = QuestionKey(bits=bits, correct_mask=correct_mask)
+        return answer_key
+
+    def _serialize_quiz(self, quiz: Quiz) -> Dict[str, Any]:
+        """Construit le payload attendu par le frontend, sans les bonnes réponses."""
+        return {
+            "id": quiz.id,
+            "moduleId": quiz.module_id,
+            "title": quiz.title,
+            "description": quiz.description,
+            "passingScore": quiz.passing_score,
+            "questions": [
+                {
+                    "id": question.id,
+                    "questionText": question.question_text,
+                    "questionType": question.question_type,
+                    "answers": [
+                        {"id": answer.id, "answerText": answer.answer_text}
+                        for answer in sorted(question.answers, key=lambda a: a.id)
+                    ]
+                }
+                for question in sorted(quiz.questions, key=lambda q: q.id)
+            ]
+        }
+
+# Invalidation du cache lors des modifications de quiz, questions ou réponses
+@event.listens_for(Session, "before_flush")
+def _touch_modified_quizzes(session: Session, flush_context, instances):
+    touched: Set[int] = session.info.setdefault("touched_quiz_ids", set())
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        quiz_id = None
+        if isinstance(obj, Quiz):
+            quiz_id = obj.id
+        elif isinstance(obj, Question):
+            quiz_id = obj.quiz_id
+        elif isinstance(obj, Answer):
+            question = obj.question or (
+                session.get(Question, obj.question_id) if obj.question_id else None
+            )
+            quiz_id = question.quiz_id if question is not None else None
+
+        if quiz_id is None or quiz_id in touched:
+            continue
+        touched.add(quiz_id)
+
+        # La version du quiz suit les modifications de son contenu
+        if not isinstance(obj, Quiz):
+            quiz = session.get(Quiz, quiz_id)
+            if quiz is not None:
+                quiz.updated_at = datetime.utcnow()
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_modified_quizzes(session: Session):
+    for quiz_id in session.info.pop("touched_quiz_ids", set()):
+        quiz_cache.invalidate(quiz_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_modified_quizzes(session: Session):
+    session.info.pop("touched_quiz_ids", None)
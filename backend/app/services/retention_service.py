@@ -0,0 +1,260 @@
+from datetime import date, datetime, time
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+from sqlalchemy import case, func, literal, select, text, union_all
+from sqlalchemy.orm import Session
+from app.models import LoginLog, QuizAttempt, LoginDailyStat, QuizAttemptMonthlyStat
+from app.config import settings
+from app.database.session import SessionLocal, engine
+from app.database.partitioning import (
+    LOGIN_LOGS, QUIZ_ATTEMPTS, PartitionedTable, add_months, drop_partitions_before,
+    ensure_partitions, is_partitioned, is_postgres, month_start, table_exists
+)
+from app.metrics import traced
+
+logger = logging.getLogger(__name__)
+
+# Verrou consultatif : une seule instance de la tâche à la fois, tous workers confondus
+RETENTION_LOCK_KEY = 4404
+
+# Attente maximale du verrou d'écriture sur la table compactée ; au-delà, le
+# compactage est reporté au prochain passage plutôt que de bloquer les insertions
+COMPACTION_LOCK_TIMEOUT = "10s"
+
+def attempt_scores():
+    """Scores des tentatives : lignes brutes et agrégats mensuels des mois expirés.
+
+    Chaque ligne expose user_id, quiz_id, attempt_count, score_sum,
+    min_score et max_score ; une ligne brute compte pour une tentative.
+    Moyenne = sum(score_sum) / sum(attempt_count), meilleur score =
+    max(max_score). Le compactage supprime les lignes brutes dans la
+    transaction qui écrit leurs agrégats : les deux sources ne se
+    recouvrent jamais.
+    """
+    raw = select(
+        QuizAttempt.user_id,
+        QuizAttempt.quiz_id,
+        case((QuizAttempt.score.isnot(None), 1), else_=0).label("attempt_count"),
+        func.coalesce(QuizAttempt.score, 0.0).label("score_sum"),
+        QuizAttempt.score.label("min_score"),
+        QuizAttempt.score.label("max_score")
+    )
+    compacted = select(
+        QuizAttemptMonthlyStat.user_id,
+        QuizAttemptMonthlyStat.quiz_id,
+        QuizAttemptMonthlyStat.attempt_count,
+        QuizAttemptMonthlyStat.score_sum,
+        QuizAttemptMonthlyStat.min_score,
+        QuizAttemptMonthlyStat.max_score
+    )
+    return union_all(raw, compacted).subquery("attempt_scores")
+
+def average_score(scores):
+    """Expression de moyenne sur attempt_scores(), NULL sans tentative notée."""
+    return func.sum(scores.c.score_sum) / func.nullif(func.sum(scores.c.attempt_count), literal(0))
+
+@traced
+class RetentionService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """Crée les partitions à venir puis compacte les mois expirés de chaque table."""
+        now = now or datetime.utcnow()
+        result: Dict[str, int] = {}
+        if not self._acquire_lock():
+            logger.info("Rétention déjà en cours dans un autre worker")
+            return result
+        # Transaction séparée : les partitions à venir ne dépendent pas du compactage
+        self.ensure_future_partitions(now)
+        self.db.commit()
+
+        for table, retention_months, compact in (
+            (LOGIN_LOGS, settings.LOGIN_LOG_RETENTION_MONTHS, self.compact_login_logs),
+            (QUIZ_ATTEMPTS, settings.QUIZ_ATTEMPT_RETENTION_MONTHS, self.compact_quiz_attempts),
+        ):
+            if retention_months <= 0 or not self._acquire_lock():
+                continue
+            cutoff = add_months(month_start(now), -retention_months)
+            result[table.name] = compact(cutoff)
+            self.db.commit()
+        return result
+
+    def ensure_future_partitions(self, now: datetime):
+        if not is_postgres(self.db.get_bind()):
+            return
+        conn = self.db.connection()
+        current = month_start(now)
+        for table in (LOGIN_LOGS, QUIZ_ATTEMPTS):
+            if table_exists(conn, table.name) and is_partitioned(conn, table):
+                ensure_partitions(conn, table, current, add_months(current, settings.PARTITION_PREMAKE_MONTHS))
+
+    def compact_login_logs(self, cutoff: date) -> int:
+        """Agrège par jour les connexions antérieures à ``cutoff``, puis les supprime."""
+        compacted = 0
+        months = self._months_before(LoginLog.login_timestamp, cutoff)
+        if not months:
+            return compacted
+        self._lock_writes(LOGIN_LOGS)
+        for month in months:
+            next_month = add_months(month, 1)
+            day = func.date(LoginLog.login_timestamp)
+            rows = self.db.query(
+                day.label("day"),
+                func.count(LoginLog.id).label("login_count"),
+                func.count(case((LoginLog.success == False, 1))).label("failed_count")
+            ).filter(
+                LoginLog.login_timestamp >= _midnight(month),
+                LoginLog.login_timestamp < _midnight(next_month)
+            ).group_by(day).all()
+
+            existing = {
+                stat.day: stat for stat in self.db.query(LoginDailyStat)
+                .filter(LoginDailyStat.day >= month, LoginDailyStat.day < next_month)
+            }
+            for row in rows:
+                row_day = _as_date(row.day)
+                stat = existing.get(row_day)
+                if stat is None:
+                    stat = existing[row_day] = LoginDailyStat(day=row_day, login_count=0, failed_count=0)
+                    self.db.add(stat)
+                stat.login_count += row.login_count
+                stat.failed_count += row.failed_count
+                compacted += row.login_count
+
+        self.db.flush()
+        self._remove_raw_rows(LOGIN_LOGS, LoginLog, LoginLog.login_timestamp, cutoff)
+        if compacted:
+            logger.info(f"{compacted} connexions antérieures au {cutoff} compactées")
+        return compacted
+
+    def compact_quiz_attempts(self, cutoff: date) -> int:
+        """Agrège par mois, utilisateur et quiz les tentatives antérieures à ``cutoff``, puis les supprime."""
+        compacted = 0
+        months = self._months_before(QuizAttempt.completed_at, cutoff)
+        if not months:
+            return compacted
+        self._lock_writes(QUIZ_ATTEMPTS)
+        for month in months:
+            rows = self.db.query(
+                QuizAttempt.user_id,
+                QuizAttempt.quiz_id,
+                func.count(QuizAttempt.id).label("rows"),
+                func.count(QuizAttempt.score).label("attempt_count"),
+                func.coalesce(func.sum(QuizAttempt.score), 0.0).label("score_sum"),
+                func.min(QuizAttempt.score).label("min_score"),
+                func.max(QuizAttempt.score).label("max_score"),
+                func.count(case((QuizAttempt.passed == True, 1))).label("passed_count")
+            ).filter(
+                QuizAttempt.completed_at >= _midnight(month),
+                QuizAttempt.completed_at < _midnight(add_months(month, 1))
+            ).group_by(QuizAttempt.user_id, QuizAttempt.quiz_id).all()
+
+            existing: Dict[Tuple[Optional[int], Optional[int]], QuizAttemptMonthlyStat] = {
+                (stat.user_id, stat.quiz_id): stat
+                for stat in self.db.query(QuizAttemptMonthlyStat).filter(QuizAttemptMonthlyStat.month == month)
+            }
+            for row in rows:
+                stat = existing.get((row.user_id, row.quiz_id))
+                if stat is None:
+                    stat = QuizAttemptMonthlyStat(
+                        month=month, user_id=row.user_id, quiz_id=row.quiz_id,
+                        attempt_count=0, score_sum=0.0, passed_count=0
+                    )
+                    self.db.add(stat)
+                stat.attempt_count += row.attempt_count
+                stat.score_sum += row.score_sum
+                stat.min_score = _merge(min, stat.min_score, row.min_score)
+                stat.max_score = _merge(max, stat.max_score, row.max_score)
+                stat.passed_count += row.passed_count
+                compacted += row.rows
+
+        self.db.flush()
+        self._remove_raw_rows(QUIZ_ATTEMPTS, QuizAttempt, QuizAttempt.completed_at, cutoff)
+        if compacted:
+            logger.info(f"{compacted} tentatives de quiz antérieures au {cutoff} compactées")
+        return compacted
+
+    def _months_before(self, column, cutoff: date) -> List[date]:
+        oldest = self.db.query(func.min(column)).filter(column < _midnight(cutoff)).scalar()
+        months: List[date] = []
+        if oldest is None:
+            return months
+        month = month_start(_as_datetime(oldest))
+        while month < cutoff:
+            months.append(month)
+            month = add_months(month, 1)
+        return months
+
+    def _lock_writes(self, table: PartitionedTable):
+        """Bloque les insertions jusqu'à la fin de la transaction (lectures permises).
+
+        Sans ce verrou, une ligne insérée dans un mois expiré entre
+        l'agrégation et la suppression des lignes brutes serait perdue.
+        """
+        if not is_postgres(self.db.get_bind()):
+            return
+        self.db.execute(text(f"SET LOCAL lock_timeout = '{COMPACTION_LOCK_TIMEOUT}'"))
+        self.db.execute(text(f"LOCK TABLE {table.name} IN SHARE ROW EXCLUSIVE MODE"))
+
+    def _remove_raw_rows(self, table: PartitionedTable, model, column, cutoff: date):
+        conn = self.db.connection()
+        if is_postgres(conn) and is_partitioned(conn, table):
+            # Mois entiers : chaque partition expirée est supprimée d'un bloc
+            drop_partitions_before(conn, table, cutoff)
+        # Reste éventuel (partition DEFAULT, table classique)
+        self.db.query(model).filter(column < _midnight(cutoff)).delete(synchronize_session=False)
+
+    def _acquire_lock(self) -> bool:
+        if not is_postgres(self.db.get_bind()):
+            return True  # Pas de verrou : appelant unique (run_retention_job ne tourne pas hors PostgreSQL)
+        return self.db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": RETENTION_LOCK_KEY}
+        ).scalar()
+
+def run_retention() -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        return RetentionService(db).run()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erreur lors de la rétention des données: {str(e)}")
+        return {}
+    finally:
+        db.close()
+
+async def run_retention_job():
+    """Tâche de fond : partitions à venir et compactage des mois expirés.
+
+    Lancée par chaque worker. Hors PostgreSQL, aucun verrou consultatif ne
+    désigne un worker unique : chacun compacterait les mêmes lignes et les
+    agrégats seraient comptés plusieurs fois. La tâche n'y tourne donc pas ;
+    le compactage reste possible à la main, depuis un seul processus.
+    """
+    if not is_postgres(engine):
+        logger.info(
+            f"Rétention automatique désactivée (moteur {engine.dialect.name}) : "
+            f"python -m app.utils.partition_tables --retention"
+        )
+        return
+    while True:
+        await asyncio.to_thread(run_retention)
+        await asyncio.sleep(settings.RETENTION_JOB_INTERVAL_SECONDS)
+
+def _merge(pick, current: Optional[float], value: Optional[float]) -> Optional[float]:
+    if current is None:
+        return value
+    if value is None:
+        return current
+    return pick(current, value)
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time())
+
+def _as_date(value) -> date:
+    # func.date renvoie une date sur PostgreSQL, une chaîne ISO sur SQLite
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+def _as_datetime(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
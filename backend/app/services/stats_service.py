@@ -1,14 +1,20 @@
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
-from sqlalchemy import func, and_
+from typing import Dict, List
+from sqlalchemy import case, func, and_, distinct
 from sqlalchemy.orm import Session
-from app.models import User, Module, UserProgress, QuizAttempt, LoginLog
-
+from app.models import User, Module, Quiz, UserProgress, LoginLog, LoginDailyStat, ModuleStatus
+from app.schemas import (
+    GlobalStats, ModuleStats, DailyCount, UserActivityStats, DepartmentStats, RiskAssessment
+)
+from app.metrics import traced
+from app.services.retention_service import attempt_scores, average_score
+
+@traced
 class StatsService:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_global_stats(self) -> Dict[str, Any]:
+    def get_global_stats(self) -> GlobalStats:
         """Récupère les statistiques globales de la plateforme."""
         total_users = self.db.query(func.count(User.id)).scalar()
         active_users = self.db.query(func.count(User.id)).filter(User.is_active == True).scalar()
@@ -17,74 +23,85 @@ class StatsService:
         # Calcul du taux de complétion global
         total_required_completions = total_users * total_modules
         total_completions = self.db.query(func.count(UserProgress.id))\
-            .filter(UserProgress.is_completed == True).scalar()
+            .filter(UserProgress.status == ModuleStatus.COMPLETED).scalar()
         completion_rate = (total_completions / total_required_completions * 100) if total_required_completions > 0 else 0
 
-        # Score moyen global
-        avg_score = self.db.query(func.avg(QuizAttempt.score)).scalar() or 0
+        # Score moyen global, mois compactés compris
+        scores = attempt_scores()
+        avg_score = self.db.query(average_score(scores)).scalar() or 0
 
-        return {
-            "total_users": total_users,
-            "active_users": active_users,
-            "total_modules": total_modules,
-            "completion_rate": round(completion_rate, 2),
-            "average_score": round(float(avg_score), 2)
-        }
+        return GlobalStats(
+            total_users=total_users,
+            active_users=active_users,
+            total_modules=total_modules,
+            completion_rate=round(completion_rate, 2),
+            average_score=round(float(avg_score), 2)
+        )
 
-    def get_module_stats(self) -> List[Dict[str, Any]]:
+    def get_module_stats(self) -> List[ModuleStats]:
         """Récupère les statistiques détaillées par module."""
-        modules = self.db.query(Module).all()
-        stats = []
-
-        for module in modules:
-            # Nombre total d'utilisateurs ayant commencé le module
-            started = self.db.query(func.count(UserProgress.id))\
-                .filter(UserProgress.module_id == module.id).scalar()
-
-            # Nombre d'utilisateurs ayant complété le module
-            completed = self.db.query(func.count(UserProgress.id))\
-                .filter(
-                    UserProgress.module_id == module.id,
-                    UserProgress.is_completed == True
-                ).scalar()
-
-            # Score moyen pour ce module
-            avg_score = self.db.query(func.avg(QuizAttempt.score))\
-                .filter(QuizAttempt.module_id == module.id).scalar() or 0
-
-            # Temps moyen de complétion
-            avg_completion_time = self.db.query(
-                func.avg(UserProgress.completed_at - UserProgress.started_at)
-            ).filter(
-                UserProgress.module_id == module.id,
-                UserProgress.is_completed == True
-            ).scalar()
+        completed_filter = UserProgress.status == ModuleStatus.COMPLETED
+
+        # Une requête agrégée par source plutôt que quatre requêtes par module
+        progress = {
+            row.module_id: row
+            for row in self.db.query(
+                UserProgress.module_id,
+                func.count(UserProgress.id).label("started"),
+                func.count(case((completed_filter, UserProgress.id))).label("completed"),
+                func.avg(case((completed_filter, UserProgress.completed_at - UserProgress.started_at)))
+                    .label("avg_completion_time")
+            ).group_by(UserProgress.module_id)
+        }
+        attempts = attempt_scores()
+        scores = dict(
+            self.db.query(Quiz.module_id, average_score(attempts))
+            .join(attempts, attempts.c.quiz_id == Quiz.id)
+            .group_by(Quiz.module_id)
+            .all()
+        )
 
-            stats.append({
-                "module_id": module.id,
-                "title": module.title,
-                "started_count": started,
-                "completed_count": completed,
-                "completion_rate": round((completed / started * 100) if started > 0 else 0, 2),
-                "average_score": round(float(avg_score), 2),
-                "average_completion_time": str(avg_completion_time) if avg_completion_time else None
-            })
+        stats = []
+        for module in self.db.query(Module.id, Module.title).order_by(Module.order, Module.id):
+            row = progress.get(module.id)
+            started = row.started if row else 0
+            completed = row.completed if row else 0
+            avg_completion_time = row.avg_completion_time if row else None
+            avg_score = scores.get(module.id) or 0
+
+            stats.append(ModuleStats(
+                module_id=module.id,
+                title=module.title,
+                started_count=started,
+                completed_count=completed,
+                completion_rate=round((completed / started * 100) if started > 0 else 0, 2),
+                average_score=round(float(avg_score), 2),
+                average_completion_time=str(avg_completion_time) if avg_completion_time else None
+            ))
 
         return stats
 
-    def get_user_activity_stats(self, days: int = 30) -> Dict[str, List[Any]]:
+    def get_user_activity_stats(self, days: int = 30) -> UserActivityStats:
         """Récupère les statistiques d'activité des utilisateurs sur une période donnée."""
         start_date = datetime.utcnow() - timedelta(days=days)
 
-        # Activité de connexion quotidienne
-        daily_logins = self.db.query(
-            func.date(LoginLog.created_at).label('date'),
+        # Activité de connexion quotidienne : le filtre porte sur la colonne de
+        # partition, PostgreSQL ne lit que les partitions des mois concernés
+        daily_logins: Dict[str, int] = {}
+        for login in self.db.query(
+            func.date(LoginLog.login_timestamp).label('date'),
             func.count(LoginLog.id).label('count')
         ).filter(
-            LoginLog.created_at >= start_date
+            LoginLog.login_timestamp >= start_date
         ).group_by(
-            func.date(LoginLog.created_at)
-        ).all()
+            func.date(LoginLog.login_timestamp)
+        ):
+            daily_logins[str(login.date)] = login.count
+
+        # Jours dont les journaux bruts ont été compactés
+        for day, count in self.db.query(LoginDailyStat.day, LoginDailyStat.login_count)\
+                .filter(LoginDailyStat.day >= start_date.date()):
+            daily_logins[str(day)] = daily_logins.get(str(day), 0) + count
 
         # Modules complétés par jour
         daily_completions = self.db.query(
@@ -92,62 +109,61 @@ class StatsService:
             func.count(UserProgress.id).label('count')
         ).filter(
             UserProgress.completed_at >= start_date,
-            UserProgress.is_completed == True
+            UserProgress.status == ModuleStatus.COMPLETED
         ).group_by(
             func.date(UserProgress.completed_at)
         ).all()
 
-        return {
-            "daily_logins": [
-                {"date": str(login.date), "count": login.count}
-                for login in daily_logins
+        return UserActivityStats(
+            daily_logins=[
+                DailyCount(date=day, count=count)
+                for day, count in sorted(daily_logins.items())
             ],
-            "daily_completions": [
-                {"date": str(completion.date), "count": completion.count}
+            daily_completions=[
+                DailyCount(date=str(completion.date), count=completion.count)
                 for completion in daily_completions
             ]
-        }
+        )
 
-    def get_department_stats(self) -> List[Dict[str, Any]]:
+    def get_department_stats(self) -> List[DepartmentStats]:
         """Récupère les statistiques par département."""
-        departments = self.db.query(User.department)\
+        # Une requête agrégée par source plutôt que cinq requêtes par département
+        user_counts = self.db.query(User.department, func.count(User.id))\
             .filter(User.department.isnot(None))\
-            .distinct().all()
+            .group_by(User.department)\
+            .order_by(User.department)\
+            .all()
+        total_modules = self.db.query(func.count(Module.id)).scalar()
+        completed = dict(
+            self.db.query(User.department, func.count(UserProgress.id))
+            .join(User, User.id == UserProgress.user_id)
+            .filter(User.department.isnot(None), UserProgress.status == ModuleStatus.COMPLETED)
+            .group_by(User.department)
+            .all()
+        )
+        scores = attempt_scores()
+        avg_scores = dict(
+            self.db.query(User.department, average_score(scores))
+            .join(User, User.id == scores.c.user_id)
+            .filter(User.department.isnot(None))
+            .group_by(User.department)
+            .all()
+        )
 
         stats = []
-        for (department,) in departments:
-            # Nombre d'utilisateurs dans le département
-            user_count = self.db.query(func.count(User.id))\
-                .filter(User.department == department).scalar()
-
-            # Taux de complétion moyen du département
-            dept_users = self.db.query(User.id)\
-                .filter(User.department == department).all()
-            dept_user_ids = [user.id for user in dept_users]
-
-            total_required = len(dept_user_ids) * self.db.query(func.count(Module.id)).scalar()
-            completed = self.db.query(func.count(UserProgress.id))\
-                .filter(
-                    UserProgress.user_id.in_(dept_user_ids),
-                    UserProgress.is_completed == True
-                ).scalar()
-
-            completion_rate = (completed / total_required * 100) if total_required > 0 else 0
-
-            # Score moyen du département
-            avg_score = self.db.query(func.avg(QuizAttempt.score))\
-                .filter(QuizAttempt.user_id.in_(dept_user_ids)).scalar() or 0
-
-            stats.append({
-                "department": department,
-                "user_count": user_count,
-                "completion_rate": round(completion_rate, 2),
-                "average_score": round(float(avg_score), 2)
-            })
+        for department, user_count in user_counts:
+            total_required = user_count * total_modules
+            completion_rate = (completed.get(department, 0) / total_required * 100) if total_required > 0 else 0
+            stats.append(DepartmentStats(
+                department=department,
+                user_count=user_count,
+                completion_rate=round(completion_rate, 2),
+                average_score=round(float(avg_scores.get(department) or 0), 2)
+            ))
 
         return stats
 
-    def get_risk_assessment(self) -> Dict[str, Any]:
+    def get_risk_assessment(self) -> RiskAssessment:
         """Évalue les risques basés sur les performances des utilisateurs."""
         # Modules critiques non complétés
         critical_modules = self.db.query(Module)\
@@ -161,15 +177,16 @@ class StatsService:
                     self.db.query(UserProgress.user_id)\
                     .filter(
                         UserProgress.module_id.in_(critical_module_ids),
-                        UserProgress.is_completed == True
+                        UserProgress.status == ModuleStatus.COMPLETED
                     )
                 )
             ).scalar()
 
         # Utilisateurs avec des scores faibles
         low_score_threshold = 60.0
-        users_low_scores = self.db.query(func.count(distinct(QuizAttempt.user_id)))\
-            .filter(QuizAttempt.score < low_score_threshold).scalar()
+        scores = attempt_scores()
+        users_low_scores = self.db.query(func.count(distinct(scores.c.user_id)))\
+            .filter(scores.c.min_score < low_score_threshold).scalar()
 
         # Utilisateurs inactifs
         inactive_threshold = datetime.utcnow() - timedelta(days=30)
@@ -179,16 +196,16 @@ class StatsService:
                 User.last_login < inactive_threshold
             ).scalar()
 
-        return {
-            "users_missing_critical_modules": users_missing_critical,
-            "users_with_low_scores": users_low_scores,
-            "inactive_users": inactive_users,
-            "risk_level": self._calculate_risk_level(
+        return RiskAssessment(
+            users_missing_critical_modules=users_missing_critical,
+            users_with_low_scores=users_low_scores,
+            inactive_users=inactive_users,
+            risk_level=self._calculate_risk_level(
                 users_missing_critical,
                 users_low_scores,
                 inactive_users
             )
-        }
+        )
 
     def _calculate_risk_level(self, missing_critical: int, low_scores: int, 
                             inactive: int) -> str:
@@ -0,0 +1,270 @@
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, List, Optional
+import logging
+import time
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import (
+    User, Module, Quiz, UserProgress, Certificate,
+    UserProgressSummary, ModuleStatus
+)
+from app.metrics import traced
+from app.services.retention_service import attempt_scores
+
+logger = logging.getLogger(__name__)
+
+MODULE_CATALOG_TTL_SECONDS = 60
+
+@dataclass
+class ModuleUpdate:
+    """Changement de progression à répercuter dans le résumé d'un utilisateur."""
+    module_id: int
+    status: Optional[ModuleStatus] = None
+    progress: Optional[float] = None
+    score: Optional[float] = None
+
+class ModuleCatalog:
+    """Liste des modules gardée en mémoire quelques secondes (elle change rarement)."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._modules: Optional[List[Dict[str, Any]]] = None
+        self._loaded_at = 0.0
+        self._lock = Lock()
+
+    def get(self, db: Session) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._modules is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                return self._modules
+
+        modules = [
+            {"id": module_id, "title": title}
+            for module_id, title in
+            db.query(Module.id, Module.title).order_by(Module.order, Module.id).all()
+        ]
+        with self._lock:
+            self._modules = modules
+            self._loaded_at = time.monotonic()
+        return modules
+
+    def invalidate(self):
+        with self._lock:
+            self._modules = None
+
+module_catalog = ModuleCatalog(MODULE_CATALOG_TTL_SECONDS)
+
+@traced
+class SummaryService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_dashboard(self, user_id: int) -> Dict[str, Any]:
+        """Construit la réponse du tableau de bord employé à partir du résumé."""
+        summary = self.db.get(UserProgressSummary, user_id)
+        if summary is None:
+            summary = self.rebuild(user_id)
+            self.db.commit()
+
+        modules_state = summary.modules or {}
+        modules = []
+        for module in module_catalog.get(self.db):
+            state = modules_state.get(str(module["id"]), {})
+            modules.append({
+                "id": module["id"],
+                "title": module["title"],
+                "progress": state.get("progress", 0),
+                "status": state.get("status", ModuleStatus.NOT_STARTED.value),
+                "score": state.get("bestScore")
+            })
+
+        return {
+            "completedCount": summary.completed_count,
+            "modules": modules,
+            "certificates": summary.certificates or []
+        }
+
+    def apply_updates(self, updates: Dict[int, List[ModuleUpdate]]):
+        """Répercute des changements de progression dans les résumés, sans valider.
+
+        Les résumés absents sont reconstruits depuis les tables sources, qui
+        contiennent déjà les écritures de la transaction en cours.
+        """
+        if not updates:
+            return
+        self.db.flush()
+
+        summaries = {
+            summary.user_id: summary
+            for summary in self.db.query(UserProgressSummary)
+            .filter(UserProgressSummary.user_id.in_(list(updates)))
+            .with_for_update()
+        }
+
+        for user_id, module_updates in updates.items():
+            summary = summaries.get(user_id)
+            if summary is None:
+                self.rebuild(user_id)
+                continue
+
+            modules = {key: dict(state) for key, state in (summary.modules or {}).items()}
+            for update in module_updates:
+                self._merge_module(modules.setdefault(str(update.module_id), {}), update)
+            self._store_modules(summary, modules)
+
+    def add_certificate(self, user_id: int, certificate_id: Any, title: str,
+                        issued_at: Optional[datetime] = None):
+        """Ajoute un certificat au résumé de l'utilisateur, sans valider."""
+        summary = (
+            self.db.query(UserProgressSummary)
+            .filter(UserProgressSummary.user_id == user_id)
+            .with_for_update()
+            .first()
+        )
+        if summary is None:
+            self.db.flush()
+            self.rebuild(user_id)
+            return
+
+        certificates = [c for c in (summary.certificates or []) if c["id"] != str(certificate_id)]
+        certificates.append({
+            "id": str(certificate_id),
+            "title": title,
+            "dateObtained": (issued_at or datetime.utcnow()).isoformat()
+        })
+        summary.certificates = certificates
+
+    def rebuild(self, user_id: int) -> UserProgressSummary:
+        """Recalcule entièrement le résumé d'un utilisateur depuis les tables sources."""
+        modules: Dict[str, Dict[str, Any]] = {}
+
+        for module_id, status, percentage in self.db.query(
+            UserProgress.module_id, UserProgress.status, UserProgress.progress_percentage
+        ).filter(UserProgress.user_id == user_id):
+            modules[str(module_id)] = {
+                "status": (status or ModuleStatus.NOT_STARTED).value,
+                "progress": percentage or 0
+            }
+
+        attempts = attempt_scores()
+        best_scores = self.db.query(
+            Quiz.module_id, func.max(attempts.c.max_score)
+        ).join(
+            Quiz, Quiz.id == attempts.c.quiz_id
+        ).filter(
+            attempts.c.user_id == user_id,
+            Quiz.module_id.isnot(None)
+        ).group_by(Quiz.module_id)
+        for module_id, best_score in best_scores:
+            modules.setdefault(str(module_id), {
+                "status": ModuleStatus.IN_PROGRESS.value,
+                "progress": 0
+            })["bestScore"] = best_score
+
+        certificates = [
+            {
+                "id": str(certificate_id),
+                "title": title,
+                "dateObtained": issued_date.isoformat() if issued_date else None
+            }
+            for certificate_id, title, issued_date in self.db.query(
+                Certificate.id, Certificate.title, Certificate.issued_date
+            ).filter(Certificate.user_id == user_id).order_by(Certificate.issued_date)
+        ]
+
+        summary = self.db.get(UserProgressSummary, user_id)
+        if summary is None:
+            summary = UserProgressSummary(user_id=user_id)
+            self._store_modules(summary, modules)
+            summary.certificates = certificates
+            try:
+                # Point de sauvegarde : deux premières lectures simultanées insèrent le même résumé
+                with self.db.begin_nested():
+                    self.db.add(summary)
+                return summary
+            except IntegrityError:
+                summary = (
+                    self.db.query(UserProgressSummary)
+                    .filter(UserProgressSummary.user_id == user_id)
+                    .with_for_update()
+                    .one()
+                )
+        self._store_modules(summary, modules)
+        summary.certificates = certificates
+        return summary
+
+    def rebuild_all(self, batch_size: int = 500) -> int:
+        """Reconstruit les résumés de tous les utilisateurs, par lots."""
+        rebuilt = 0
+        last_id = 0
+        while True:
+            user_ids = [
+                user_id for (user_id,) in
+                self.db.query(User.id).filter(User.id > last_id)
+                .order_by(User.id).limit(batch_size).all()
+            ]
+            if not user_ids:
+                break
+            for user_id in user_ids:
+                self.rebuild(user_id)
+            self.db.commit()
+            rebuilt += len(user_ids)
+            last_id = user_ids[-1]
+
+        logger.info(f"{rebuilt} résumés de progression reconstruits")
+        return rebuilt
+
+    def rebuild_missing(self, batch_size: int = 500) -> int:
+        """Construit les résumés absents (comptes antérieurs aux résumés), par lots."""
+        rebuilt = 0
+        while True:
+            user_ids = [
+                user_id for (user_id,) in
+                self.db.query(User.id).outerjoin(
+                    UserProgressSummary, UserProgressSummary.user_id == User.id
+                ).filter(UserProgressSummary.user_id.is_(None))
+                .order_by(User.id).limit(batch_size).all()
+            ]
+            if not user_ids:
+                break
+            for user_id in user_ids:
+                self.rebuild(user_id)
+            self.db.commit()
+            rebuilt += len(user_ids)
+
+        if rebuilt:
+            logger.info(f"{rebuilt} résumés de progression manquants construits")
+        return rebuilt
+
+    def _merge_module(self, state: Dict[str, Any], update: ModuleUpdate):
+        """Applique un changement à l'état d'un module sans revenir sur une complétion."""
+        completed = state.get("status") == ModuleStatus.COMPLETED.value
+
+        if update.status is not None and not completed:
+            state["status"] = update.status.value
+            if update.status == ModuleStatus.COMPLETED:
+                state["progress"] = 100
+                completed = True
+        state.setdefault("status", ModuleStatus.NOT_STARTED.value)
+
+        if update.progress is not None and not completed:
+            state["progress"] = update.progress
+        state.setdefault("progress", 0)
+
+        if update.score is not None:
+            best_score = state.get("bestScore")
+            state["bestScore"] = update.score if best_score is None else max(best_score, update.score)
+
+    def _store_modules(self, summary: UserProgressSummary, modules: Dict[str, Dict[str, Any]]):
+        # Nouvel objet pour que SQLAlchemy détecte la modification de la colonne JSON
+        summary.modules = modules
+        summary.completed_count = sum(
+            1 for state in modules.values()
+            if state.get("status") == ModuleStatus.COMPLETED.value
+        )
+        summary.started_count = sum(
+            1 for state in modules.values()
+            if state.get("status") != ModuleStatus.NOT_STARTED.value
+        )
@@ -0,0 +1,205 @@
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import Module, ContentFile
+from app.config import settings
+from app.metrics import traced
+
+logger = logging.getLogger(__name__)
+
+# Types MIME acceptés pour chaque extension autorisée, et type de module associé
+UPLOAD_TYPES: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    ".pdf": (("application/pdf",), "pdf"),
+    ".mp4": (("video/mp4", "video/x-m4v"), "video"),
+    ".jpg": (("image/jpeg",), "image"),
+    ".png": (("image/png",), "image"),
+}
+
+# Octets nécessaires à la détection du type
+SNIFF_SIZE = 2048
+
+class UploadRejectedError(ValueError):
+    """Fichier refusé : extension ou contenu non autorisé."""
+
+class UploadTooLargeError(ValueError):
+    """Fichier dépassant MAX_UPLOAD_SIZE."""
+
+@dataclass
+class StoredUpload:
+    sha256: str
+    path: str
+    mime_type: str
+    size: int
+    original_name: str
+    deduplicated: bool = False
+
+def sniff_mime_type(head: bytes) -> str:
+    """Détecte le type MIME à partir des premiers octets du fichier."""
+    try:
+        import magic
+    except ImportError:
+        magic = None
+    if magic is not None:
+        return magic.from_buffer(head, mime=True)
+
+    # Signatures des seuls formats autorisés, si libmagic est absent
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head[4:8] == b"ftyp":
+        return "video/mp4"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    return "application/octet-stream"
+
+class _UploadWriter:
+    """Écrit, hache et contrôle un flux dans un fichier temporaire du dossier d'upload."""
+
+    def __init__(self, extension: str, max_size: int):
+        self.extension = extension
+        self.max_size = max_size
+        self.size = 0
+        self.mime_type: Optional[str] = None
+        self._hash = hashlib.sha256()
+        self._head = b""
+        temp_dir = os.path.join(settings.UPLOAD_DIR, ".tmp")
+        os.makedirs(temp_dir, exist_ok=True)
+        # Même système de fichiers que la destination : os.replace reste atomique
+        self._file = tempfile.NamedTemporaryFile(dir=temp_dir, delete=False)
+        self.temp_path = self._file.name
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise UploadTooLargeError(f"Fichier supérieur à {self.max_size} octets")
+        if self.mime_type is None:
+            self._head += chunk[:SNIFF_SIZE - len(self._head)]
+            if len(self._head) >= SNIFF_SIZE:
+                self._check_type()
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def finish(self) -> str:
+        if self.mime_type is None:
+            self._check_type()  # Fichier plus petit que SNIFF_SIZE
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        # NamedTemporaryFile crée le fichier en 0600 ; il doit rester lisible par nginx
+        os.fchmod(self._file.fileno(), 0o644)
+        self._file.close()
+        return self._hash.hexdigest()
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.unlink(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+    def _check_type(self):
+        allowed, _ = UPLOAD_TYPES[self.extension]
+        mime_type = sniff_mime_type(self._head)
+        if mime_type not in allowed:
+            raise UploadRejectedError(f"Contenu {mime_type} incompatible avec l'extension {self.extension}")
+        self.mime_type = mime_type
+
+@traced
+class UploadService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def attach_to_module(self, module_id: int, upload: StoredUpload) -> Optional[Module]:
+        """Enregistre le fichier (une seule ligne par contenu) et l'associe au module."""
+        module = self.db.get(Module, module_id)
+        if module is None:
+            return None
+
+        content_file = self._content_file(upload)
+        module.content_file_id = content_file.id
+        module.content_url = f"/uploads/{upload.path}"
+        module.content_type = UPLOAD_TYPES[os.path.splitext(upload.path)[1]][1]
+        self.db.commit()
+        return module
+
+    def _content_file(self, upload: StoredUpload) -> ContentFile:
+        """Ligne du contenu, créée au besoin ; sûr face aux envois simultanés du même fichier."""
+        content_file = self.db.query(ContentFile).filter(ContentFile.sha256 == upload.sha256).first()
+        if content_file is not None:
+            return content_file
+        try:
+            # Point de sauvegarde : un conflit n'annule que cette insertion
+            with self.db.begin_nested():
+                content_file = ContentFile(
+                    sha256=upload.sha256,
+                    path=upload.path,
+                    mime_type=upload.mime_type,
+                    size=upload.size,
+                    original_name=upload.original_name
+                )
+                self.db.add(content_file)
+            return content_file
+        except IntegrityError:
+            # Insérée entre-temps par un envoi concurrent du même contenu
+            return self.db.query(ContentFile).filter(ContentFile.sha256 == upload.sha256).one()
+
+def _move_into_place(temp_path: str, final_path: str) -> bool:
+    """Renomme le fichier temporaire vers son chemin final ; vrai si le contenu existait déjà."""
+    if os.path.exists(final_path):
+        os.unlink(temp_path)
+        return True
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(temp_path, final_path)
+    return False
+
+async def store_upload(chunks: AsyncIterator[bytes], filename: str,
+                       declared_size: Optional[int] = None) -> StoredUpload:
+    """Enregistre un flux sur disque par morceaux, sans jamais le garder en mémoire.
+
+    Le fichier est écrit dans un fichier temporaire, puis renommé vers un
+    chemin dérivé de son SHA-256 : un contenu déjà présent n'est pas dupliqué
+    et aucun lecteur ne voit de fichier partiellement écrit.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in settings.ALLOWED_UPLOAD_EXTENSIONS or extension not in UPLOAD_TYPES:
+        raise UploadRejectedError(f"Extension {extension or '(aucune)'} non autorisée")
+    if declared_size is not None and declared_size > settings.MAX_UPLOAD_SIZE:
+        raise UploadTooLargeError(f"Fichier supérieur à {settings.MAX_UPLOAD_SIZE} octets")
+
+    # Création du dossier et du fichier temporaire hors de la boucle d'événements
+    writer = await asyncio.to_thread(_UploadWriter, extension, settings.MAX_UPLOAD_SIZE)
+    try:
+        # Les petits morceaux reçus sont regroupés avant chaque écriture sur disque
+        pending = bytearray()
+        async for chunk in chunks:
+            pending += chunk
+            if len(pending) >= settings.UPLOAD_CHUNK_SIZE:
+                await asyncio.to_thread(writer.write, bytes(pending))
+                pending.clear()
+        if pending:
+            await asyncio.to_thread(writer.write, bytes(pending))
+        sha256 = await asyncio.to_thread(writer.finish)
+    except BaseException:
+        # Synchrone : le nettoyage doit aboutir même si la requête est annulée
+        writer.abort()
+        raise
+
+    relative_path = os.path.join(sha256[:2], f"{sha256}{extension}")
+    final_path = os.path.join(settings.UPLOAD_DIR, relative_path)
+    deduplicated = await asyncio.to_thread(_move_into_place, writer.temp_path, final_path)
+
+    logger.info(f"Fichier {filename} enregistré ({writer.size} octets, {sha256[:12]})")
+    return StoredUpload(
+        sha256=sha256,
+        path=relative_path,
+        mime_type=writer.mime_type,
+        size=writer.size,
+        original_name=os.path.basename(filename)[:255],
+        deduplicated=deduplicated
+    )
@@ -0,0 +1,150 @@
+from typing import Any, Dict, List, Optional, Sequence
+import base64
+import binascii
+from sqlalchemy import and_, false, or_
+from sqlalchemy.orm import Session
+from app.models import User, UserRole, UserProgressSummary
+from app.services.summary_service import module_catalog
+from app.metrics import traced
+
+# Champs exposés par l'API et colonnes correspondantes
+USER_FIELDS = {
+    "id": User.id,
+    "email": User.email,
+    "fullName": User.full_name,
+    "firstName": User.first_name,
+    "lastName": User.last_name,
+    "role": User.role,
+    "department": User.department,
+    "isActive": User.is_active,
+    "lastLogin": User.last_login,
+    "createdAt": User.created_at
+}
+
+COMPLETION_STATUSES = ("completed", "in_progress", "not_started")
+
+class InvalidCursorError(ValueError):
+    """Curseur de pagination illisible."""
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise InvalidCursorError(cursor)
+
+@traced
+class UserService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_users(self, limit: int, cursor: Optional[str] = None,
+                   role: Optional[UserRole] = None, is_active: Optional[bool] = None,
+                   department: Optional[str] = None, completion: Optional[str] = None,
+                   fields: Optional[Sequence[str]] = None,
+                   include_progress: bool = True) -> Dict[str, Any]:
+        """Liste les utilisateurs par pagination sur clé (id croissant).
+
+        La progression est jointe depuis le résumé par utilisateur, en une
+        seule requête quel que soit le nombre d'utilisateurs de la page.
+        """
+        selected = [field for field in (fields or USER_FIELDS) if field in USER_FIELDS]
+        if "id" not in selected:
+            selected.insert(0, "id")
+
+        total_modules = len(module_catalog.get(self.db))
+        columns = [USER_FIELDS[field].label(field) for field in selected]
+        join_summary = include_progress or completion is not None
+        if include_progress:
+            columns += [
+                UserProgressSummary.completed_count.label("completed_count"),
+                UserProgressSummary.modules.label("summary_modules"),
+                UserProgressSummary.updated_at.label("summary_updated_at")
+            ]
+
+        query = self.db.query(*columns)
+        if join_summary:
+            query = query.outerjoin(UserProgressSummary, UserProgressSummary.user_id == User.id)
+
+        if cursor:
+            query = query.filter(User.id > decode_cursor(cursor))
+        if role is not None:
+            query = query.filter(User.role == role)
+        if is_active is not None:
+            query = query.filter(User.is_active == is_active)
+        if department is not None:
+            query = query.filter(User.department == department)
+        if completion is not None:
+            query = query.filter(self._completion_filter(completion, total_modules))
+
+        rows = query.order_by(User.id).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        items = []
+        for row in rows:
+            item = {field: self._serialize_value(getattr(row, field)) for field in selected}
+            if include_progress:
+                item["progress"] = self._progress_from_summary(
+                    row.completed_count, row.summary_modules,
+                    row.summary_updated_at, total_modules
+                )
+            items.append(item)
+
+        return {
+            "items": items,
+            "nextCursor": encode_cursor(rows[-1].id) if has_more and rows else None
+        }
+
+    def get_user_progress(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Retourne la progression résumée d'un utilisateur."""
+        row = self.db.query(
+            User.id,
+            UserProgressSummary.completed_count,
+            UserProgressSummary.modules,
+            UserProgressSummary.updated_at
+        ).outerjoin(
+            UserProgressSummary, UserProgressSummary.user_id == User.id
+        ).filter(User.id == user_id).first()
+
+        if row is None:
+            return None
+        return self._progress_from_summary(
+            row.completed_count, row.modules, row.updated_at,
+            len(module_catalog.get(self.db))
+        )
+
+    def _completion_filter(self, completion: str, total_modules: int):
+        completed_count = UserProgressSummary.completed_count
+        started_count = UserProgressSummary.started_count
+        if completion == "completed":
+            if total_modules == 0:
+                return false()  # Aucun module : personne n'a terminé la formation
+            return and_(completed_count.isnot(None), completed_count >= total_modules)
+        if completion == "in_progress":
+            # Au moins un module commencé, même si aucun n'est encore terminé
+            return and_(started_count > 0, completed_count < total_modules)
+        return or_(started_count.is_(None), started_count == 0)
+
+    def _progress_from_summary(self, completed_count: Optional[int],
+                               modules: Optional[Dict[str, Dict[str, Any]]],
+                               updated_at, total_modules: int) -> Dict[str, Any]:
+        scores: List[float] = [
+            state["bestScore"] for state in (modules or {}).values()
+            if state.get("bestScore") is not None
+        ]
+        return {
+            "completedModules": completed_count or 0,
+            "totalModules": total_modules,
+            "averageScore": round(sum(scores) / len(scores), 2) if scores else 0,
+            "lastActivity": updated_at.isoformat() if updated_at else None
+        }
+
+    def _serialize_value(self, value: Any) -> Any:
+        if isinstance(value, UserRole):
+            return value.value
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return value
@@ -0,0 +1,66 @@
+"""Partitionnement mensuel de login_logs et quiz_attempts (PostgreSQL).
+
+Affiche l'état des partitions de chaque table. Avec ``--convert``, convertit
+les tables classiques existantes en tables partitionnées (verrou exclusif
+pendant la copie : à lancer en fenêtre de maintenance). Avec ``--retention``,
+exécute immédiatement la tâche de rétention (partitions à venir, compactage
+des mois expirés) :
+
+    python -m app.utils.partition_tables --convert --retention
+"""
+import argparse
+import sys
+from app.config import settings
+from app.database.session import SessionLocal, engine
+from app.database.partitioning import (
+    PARTITIONED_TABLES, convert_to_partitioned, default_partition_rows, is_partitioned,
+    is_postgres, monthly_partitions, table_exists
+)
+from app.services.retention_service import RetentionService
+
+def print_status():
+    with engine.connect() as conn:
+        for table in PARTITIONED_TABLES:
+            if not table_exists(conn, table.name):
+                print(f"{table.name} : absente")
+            elif not is_partitioned(conn, table):
+                print(f"{table.name} : table classique (non partitionnée)")
+            else:
+                partitions = monthly_partitions(conn, table)
+                span = f"{partitions[0][1]:%Y-%m} → {partitions[-1][1]:%Y-%m}" if partitions else "aucune"
+                print(f"{table.name} : {len(partitions)} partitions mensuelles ({span})")
+                outside = default_partition_rows(conn, table)
+                if outside:
+                    print(f"  {outside} lignes hors des mois créés (partition DEFAULT)")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--convert", action="store_true",
+                        help="convertit les tables classiques en tables partitionnées")
+    parser.add_argument("--retention", action="store_true",
+                        help="exécute la tâche de rétention immédiatement")
+    args = parser.parse_args()
+
+    if not is_postgres(engine):
+        print(f"Partitionnement réservé à PostgreSQL (moteur : {engine.dialect.name})")
+        if not args.retention:
+            return 1
+
+    if args.convert and is_postgres(engine):
+        for table in PARTITIONED_TABLES:
+            with engine.begin() as conn:
+                if table_exists(conn, table.name) and not is_partitioned(conn, table):
+                    copied = convert_to_partitioned(conn, table, settings.PARTITION_PREMAKE_MONTHS)
+                    print(f"{table.name} convertie ({copied} lignes)")
+
+    if args.retention:
+        with SessionLocal() as db:
+            for name, compacted in RetentionService(db).run().items():
+                print(f"{name} : {compacted} lignes compactées")
+
+    if is_postgres(engine):
+        print_status()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Compare les chemins de sérialisation JSON des réponses de statistiques.
+
+    python -m app.utils.serialization_benchmark --rows 10000
+"""
+from datetime import datetime
+from typing import Callable, List, Tuple
+import argparse
+import json
+import sys
+import timeit
+from fastapi.encoders import jsonable_encoder
+from app.responses import dump_json, orjson
+from app.schemas import ModuleStats
+
+def build_payload(rows: int) -> List[ModuleStats]:
+    return [
+        ModuleStats(
+            module_id=index,
+            title=f"Module {index}",
+            started_count=index * 3,
+            completed_count=index * 2,
+            completion_rate=66.67,
+            average_score=72.5,
+            average_completion_time=str(datetime(2024, 1, 1, 0, index % 60))
+        )
+        for index in range(rows)
+    ]
+
+def candidates(models: List[ModuleStats]) -> List[Tuple[str, Callable[[], bytes]]]:
+    paths = [
+        # Chemin FastAPI par défaut : jsonable_encoder puis json.dumps
+        ("jsonable_encoder + json", lambda: json.dumps(
+            jsonable_encoder(models), ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")),
+        ("model_dump + json", lambda: json.dumps(
+            [model.model_dump() for model in models], separators=(",", ":")
+        ).encode("utf-8")),
+        ("TypeAdapter.dump_json (ModelResponse)", lambda: dump_json(models)),
+    ]
+    if orjson is not None:
+        paths.insert(2, ("model_dump + orjson", lambda: orjson.dumps(
+            [model.model_dump() for model in models]
+        )))
+    return paths
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    models = build_payload(args.rows)
+    print(f"{args.rows} lignes ModuleStats, meilleur temps sur {args.repeat} essais")
+
+    baseline = None
+    for name, serialize in candidates(models):
+        best = min(timeit.repeat(serialize, number=1, repeat=args.repeat))
+        baseline = baseline or best
+        print(f"  {best * 1000:8.2f} ms  x{baseline / best:5.1f}  {len(serialize()):>9} octets  {name}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Rapport du temps de démarrage d'un worker.
+
+Importe ``app.main`` dans un interpréteur neuf avec ``-X importtime`` et
+affiche les modules les plus coûteux. Le code de sortie est non nul si le
+budget est dépassé ou si un sous-système lourd est chargé au démarrage,
+ce qui permet de l'utiliser comme garde-fou en intégration continue :
+
+    python -m app.utils.startup_report --budget 1.5
+"""
+from typing import Dict, List, Tuple
+import argparse
+import os
+import subprocess
+import sys
+
+# Sous-systèmes qui doivent être chargés à la première utilisation seulement
+LAZY_MODULES = ("PIL", "qrcode", "fastapi_mail", "ldap", "openpyxl", "magic")
+
+DEFAULT_BUDGET_SECONDS = 2.0
+
+def measure_imports(target: str = "app.main") -> Tuple[float, Dict[str, int]]:
+    """Retourne la durée totale d'import (s) et le temps cumulé par module (µs)."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": backend_dir}
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Import de {target} impossible:\n{completed.stderr[-2000:]}")
+
+    cumulative: Dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        cumulative[name.strip()] = int(cumulative_us)
+
+    return cumulative.get(target, 0) / 1_000_000, cumulative
+
+def top_level_breakdown(cumulative: Dict[str, int], limit: int) -> List[Tuple[str, int]]:
+    """Temps cumulé par paquet de premier niveau, trié par coût décroissant."""
+    packages: Dict[str, int] = {}
+    for name, microseconds in cumulative.items():
+        if "." in name:
+            continue
+        packages[name] = max(packages.get(name, 0), microseconds)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="durée d'import maximale tolérée, en secondes")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--target", default="app.main")
+    args = parser.parse_args()
+
+    total, cumulative = measure_imports(args.target)
+
+    print(f"Import de {args.target} : {total:.3f}s (budget {args.budget:.3f}s)")
+    for name, microseconds in top_level_breakdown(cumulative, args.top):
+        print(f"  {microseconds / 1000:9.1f} ms  {name}")
+
+    eager = [name for name in LAZY_MODULES if name in cumulative]
+    if eager:
+        print(f"Modules chargés au démarrage alors qu'ils devraient être différés : {', '.join(eager)}")
+
+    return 1 if total > args.budget or eager else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
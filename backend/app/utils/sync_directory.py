@@ -0,0 +1,42 @@
+"""Synchronisation de la table users avec l'annuaire LDAP ou un fichier CSV.
+
+Sans option, parcourt l'annuaire LDAP configuré et désactive les comptes
+LDAP absents. ``--csv`` importe un fichier à la place, ``--dry-run``
+affiche le bilan sans rien écrire :
+
+    python -m app.utils.sync_directory --dry-run
+    python -m app.utils.sync_directory --csv utilisateurs.csv --keep-missing
+"""
+import argparse
+import json
+import sys
+from app.config import settings
+from app.database.session import SessionLocal
+from app.services.directory_service import CsvDirectorySource, LdapDirectorySource, UserSyncEngine
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", metavar="FICHIER", help="importe ce fichier CSV au lieu de l'annuaire LDAP")
+    parser.add_argument("--dry-run", action="store_true", help="calcule le bilan sans modifier la base")
+    parser.add_argument("--keep-missing", action="store_true",
+                        help="ne désactive pas les comptes absents de la source")
+    args = parser.parse_args()
+
+    if not args.csv and (not settings.LDAP_HOST or not settings.LDAP_BASE_DN):
+        print("Annuaire LDAP non configuré (LDAP_HOST, LDAP_BASE_DN)")
+        return 1
+
+    with SessionLocal() as db:
+        engine = UserSyncEngine(db)
+        options = {"deactivate_missing": not args.keep_missing, "dry_run": args.dry_run}
+        if args.csv:
+            with open(args.csv, encoding="utf-8-sig", newline="") as stream:
+                report = engine.sync(CsvDirectorySource(stream), **options)
+        else:
+            report = engine.sync(LdapDirectorySource(), **options)
+
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    return 1 if report.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
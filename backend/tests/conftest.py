@@ -0,0 +1,47 @@
+import os
+import tempfile
+
+# Configuration minimale avant tout import de app (settings, moteur partagé)
+os.environ.setdefault("SECRET_KEY", "test-secret-key-for-the-pytest-suite")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'sitewebformation-tests.db')}"
+)
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import Base
+
+@pytest.fixture
+def db():
+    """Session sur une base SQLite en mémoire, vide à chaque test."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+@pytest.fixture
+def app_db():
+    """Session sur la base de l'application (moteur partagé de app.database.session).
+
+    Pour le code qui ouvre ses propres sessions via SessionLocal ; les
+    tables sont recréées à chaque test.
+    """
+    from app.database.session import SessionLocal, engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: nécessite une base PostgreSQL (TEST_POSTGRES_URL)")
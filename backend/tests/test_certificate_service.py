@@ -0,0 +1,71 @@
+import pytest
+from app.models import Certificate, Module, User, UserProgressSummary, UserRole
+from app.services.certificate_service import CertificateService
+from app.services.summary_service import SummaryService
+
+class PngImage:
+    """Image minimale : le rendu PIL est couvert par test_generated_image_is_a_png."""
+
+    def save(self, path, format):
+        with open(path, "wb") as stream:
+            stream.write(b"\x89PNG\r\n\x1a\n")
+
+@pytest.fixture
+def service(db, tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.certificate_service.settings.CERTIFICATES_DIR", str(tmp_path / "certificats"))
+    return CertificateService(db)
+
+@pytest.fixture
+def learner(db):
+    user = User(email="alice@corp.fr", hashed_password="x", role=UserRole.EMPLOYEE,
+                first_name="Alice", last_name="Martin")
+    module = Module(title="Hameçonnage", order=1)
+    db.add_all([user, module])
+    db.commit()
+    SummaryService(db).rebuild(user.id)
+    db.commit()
+    return user, module
+
+def test_generate_certificate_records_it_and_updates_summary(db, service, learner, monkeypatch):
+    user, module = learner
+    monkeypatch.setattr(service, "_create_certificate_image", lambda *args: PngImage())
+
+    path = service.generate_certificate(user, module, 85.0)
+
+    certificate = db.query(Certificate).one()
+    assert path.endswith(f"certificate_{certificate.id}.png")
+    with open(path, "rb") as stream:
+        assert stream.read(4) == b"\x89PNG"
+    assert (certificate.user_id, certificate.module_id, certificate.title) == (user.id, module.id, "Hameçonnage")
+    assert certificate.certificate_url.endswith(f"/certificates/{certificate.id}/download")
+
+    summary = db.get(UserProgressSummary, user.id)
+    assert [entry["id"] for entry in summary.certificates] == [str(certificate.id)]
+
+    verified = service.verify_certificate(certificate.id)
+    assert verified["user_name"] == "Alice Martin"
+    assert verified["module_title"] == "Hameçonnage"
+
+def test_failed_rendering_leaves_no_certificate(db, service, learner, monkeypatch):
+    user, module = learner
+
+    def broken(*args):
+        raise OSError("police introuvable")
+
+    monkeypatch.setattr(service, "_create_certificate_image", broken)
+
+    with pytest.raises(OSError):
+        service.generate_certificate(user, module, 85.0)
+
+    assert db.query(Certificate).count() == 0
+    assert db.get(UserProgressSummary, user.id).certificates == []
+
+def test_generated_image_is_a_png(db, service, learner):
+    pytest.importorskip("PIL")
+    pytest.importorskip("qrcode")
+    user, module = learner
+
+    path = service.generate_certificate(user, module, 92.5)
+
+    with open(path, "rb") as stream:
+        assert stream.read(8) == b"\x89PNG\r\n\x1a\n"
@@ -0,0 +1,163 @@
+import io
+import pytest
+from app.models import User, UserRole
+from app.services.directory_service import (
+    UNUSABLE_PASSWORD, CsvDirectorySource, LdapDirectorySource, UserSyncEngine
+)
+
+def add_user(db, email, auth_source, department=None, is_active=True):
+    db.add(User(
+        email=email, hashed_password=UNUSABLE_PASSWORD, role=UserRole.EMPLOYEE,
+        auth_source=auth_source, department=department, is_active=is_active
+    ))
+    db.commit()
+
+def users_by_email(db):
+    db.expire_all()
+    return {user.email: user for user in db.query(User)}
+
+def csv_source(*lines):
+    header = "email,first_name,last_name,full_name,department,is_active"
+    return CsvDirectorySource(io.StringIO("\n".join((header,) + lines) + "\n"))
+
+# --- Source CSV ---
+
+def test_csv_sync_inserts_updates_and_deactivates(db):
+    add_user(db, "alice@corp.fr", "csv", department="Finance")
+    add_user(db, "bob@corp.fr", "csv", department="RH")
+    add_user(db, "admin@corp.fr", "local")
+
+    report = UserSyncEngine(db, batch_size=2).sync(csv_source(
+        "Alice@Corp.fr,Alice,Martin,,Juridique,true",
+        "dave@corp.fr,Dave,Durand,,IT,oui",
+        "pas-un-email,X,Y,,IT,true",
+        "erin@corp.fr,Erin,Petit,Erin P.,IT,non",
+    ), deactivate_missing=True)
+
+    assert (report.inserted, report.updated, report.deactivated) == (2, 1, 1)
+    assert report.errors == [{"line": 4, "detail": "Adresse email invalide"}]
+
+    users = users_by_email(db)
+    assert users["alice@corp.fr"].department == "Juridique"
+    assert users["alice@corp.fr"].full_name == "Alice Martin"
+    assert users["dave@corp.fr"].auth_source == "csv"
+    assert users["dave@corp.fr"].hashed_password == UNUSABLE_PASSWORD
+    assert users["dave@corp.fr"].is_active is True
+    assert users["erin@corp.fr"].full_name == "Erin P."
+    assert users["erin@corp.fr"].is_active is False
+    # Absent du fichier : désactivé s'il vient du CSV, intact s'il est local
+    assert users["bob@corp.fr"].is_active is False
+    assert users["admin@corp.fr"].is_active is True
+
+def test_csv_sync_second_run_is_unchanged(db):
+    lines = ("carol@corp.fr,Carol,Roux,,IT,true",)
+    UserSyncEngine(db).sync(csv_source(*lines))
+
+    report = UserSyncEngine(db).sync(csv_source(*lines), deactivate_missing=True)
+
+    assert (report.inserted, report.updated, report.deactivated, report.unchanged) == (0, 0, 0, 1)
+
+def test_csv_sync_reports_duplicates(db):
+    report = UserSyncEngine(db).sync(csv_source(
+        "carol@corp.fr,Carol,Roux,,IT,true",
+        "CAROL@corp.fr,Carol,Roux,,RH,true",
+    ))
+
+    assert report.inserted == 1
+    assert report.errors == [{"line": "carol@corp.fr", "detail": "Doublon dans la source"}]
+    assert users_by_email(db)["carol@corp.fr"].department == "IT"
+
+def test_csv_dry_run_writes_nothing(db):
+    add_user(db, "bob@corp.fr", "csv")
+
+    report = UserSyncEngine(db).sync(
+        csv_source("dave@corp.fr,Dave,Durand,,IT,true"), deactivate_missing=True, dry_run=True
+    )
+
+    assert (report.inserted, report.deactivated, report.dry_run) == (1, 1, True)
+    users = users_by_email(db)
+    assert set(users) == {"bob@corp.fr"}
+    assert users["bob@corp.fr"].is_active is True
+
+# --- Source LDAP paginée ---
+
+class StubLdapConnection:
+    """Connexion déjà liée qui renvoie les pages prévues et note les cookies reçus."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.cookies = []
+        self.page_sizes = []
+        self.unbound = False
+
+    def search_ext(self, base, scope, filterstr, attrlist, serverctrls):
+        from ldap.controls import SimplePagedResultsControl
+
+        control = serverctrls[0]
+        assert control.controlType == SimplePagedResultsControl.controlType
+        self.cookies.append(control.cookie)
+        self.page_sizes.append(control.size)
+        return len(self.cookies) - 1
+
+    def result3(self, message_id):
+        from ldap.controls import SimplePagedResultsControl
+
+        last_page = message_id == len(self.pages) - 1
+        cookie = b"" if last_page else f"page-{message_id + 1}".encode()
+        controls = [SimplePagedResultsControl(True, size=0, cookie=cookie)]
+        return 101, self.pages[message_id], message_id, controls
+
+    def unbind_s(self):
+        self.unbound = True
+
+def ldap_entry(uid, department="IT", account_control="512", email=None):
+    return (f"uid={uid},ou=people,dc=corp,dc=fr", {
+        "mail": [(email or f"{uid}@corp.fr").encode()],
+        "givenName": [uid.capitalize().encode()],
+        "sn": [b"Test"],
+        "department": [department.encode()],
+        "userAccountControl": [account_control.encode()],
+    })
+
+def test_ldap_source_follows_page_cookies():
+    pytest.importorskip("ldap")
+    connection = StubLdapConnection([
+        [ldap_entry("u1"), ldap_entry("u2")],
+        [ldap_entry("u3"), (None, ["ldap://autre.corp.fr/dc=corp,dc=fr"])],
+        [ldap_entry("u4", account_control="514"), ldap_entry("sansmail", email="invalide")],
+    ])
+    report_errors = []
+
+    class Report:
+        def add_error(self, line, detail):
+            report_errors.append((line, detail))
+
+    entries = list(LdapDirectorySource(connection, page_size=2).entries(Report()))
+
+    assert connection.cookies == ["", b"page-1", b"page-2"]
+    assert connection.page_sizes == [2, 2, 2]
+    assert [entry.email for entry in entries] == ["u1@corp.fr", "u2@corp.fr", "u3@corp.fr", "u4@corp.fr"]
+    assert [entry.is_active for entry in entries] == [True, True, True, False]
+    assert report_errors == [("uid=sansmail,ou=people,dc=corp,dc=fr", "Adresse email absente ou invalide")]
+    # Connexion fournie par l'appelant : elle reste ouverte
+    assert connection.unbound is False
+
+def test_ldap_sync_inserts_updates_and_deactivates(db):
+    pytest.importorskip("ldap")
+    add_user(db, "u1@corp.fr", "ldap", department="Finance")
+    add_user(db, "parti@corp.fr", "ldap")
+    add_user(db, "import@corp.fr", "csv")
+    connection = StubLdapConnection([
+        [ldap_entry("u1", department="Juridique")],
+        [ldap_entry("u2", account_control="514")],
+    ])
+
+    report = UserSyncEngine(db).sync(LdapDirectorySource(connection, page_size=1), deactivate_missing=True)
+
+    assert (report.inserted, report.updated, report.deactivated) == (1, 1, 1)
+    users = users_by_email(db)
+    assert users["u1@corp.fr"].department == "Juridique"
+    assert users["u2@corp.fr"].auth_source == "ldap"
+    assert users["u2@corp.fr"].is_active is False
+    assert users["parti@corp.fr"].is_active is False
+    assert users["import@corp.fr"].is_active is True
@@ -0,0 +1,34 @@
+from app.models import User, UserRole
+from app.services.game_service import PlayerCache
+
+def add_user(db, email, is_active=True):
+    user = User(email=email, hashed_password="x", role=UserRole.EMPLOYEE, department="IT", is_active=is_active)
+    db.add(user)
+    db.commit()
+    return user
+
+def test_unknown_player_is_rechecked_after_negative_ttl(app_db):
+    cache = PlayerCache(ttl=300, negative_ttl=0)
+    assert cache.resolve("nouveau@corp.fr") is None
+
+    add_user(app_db, "nouveau@corp.fr")
+
+    assert cache.resolve("nouveau@corp.fr").department == "IT"
+
+def test_negative_result_is_cached_within_negative_ttl(app_db):
+    cache = PlayerCache(ttl=300, negative_ttl=60)
+    assert cache.resolve("nouveau@corp.fr") is None
+
+    add_user(app_db, "nouveau@corp.fr")
+
+    assert cache.resolve("nouveau@corp.fr") is None
+
+def test_known_player_is_kept_for_full_ttl(app_db):
+    user = add_user(app_db, "alice@corp.fr")
+    cache = PlayerCache(ttl=300, negative_ttl=0)
+    assert cache.resolve("alice@corp.fr").user_id == user.id
+
+    user.is_active = False
+    app_db.commit()
+
+    assert cache.resolve("alice@corp.fr").user_id == user.id
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from app.models import Answer, Question, Quiz, QuizAttempt, User, UserRole
+from app.services.grading_service import GradingService
+from app.services.quiz_service import quiz_cache
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    quiz_cache.clear()
+    yield
+    quiz_cache.clear()
+
+@pytest.fixture
+def quiz(db):
+    """Quiz à une question : la réponse « Signaler » est correcte."""
+    quiz = Quiz(title="Hameçonnage", passing_score=50)
+    db.add(quiz)
+    db.flush()
+    question = Question(quiz_id=quiz.id, question_text="Lien suspect ?", question_type="multiple_choice")
+    db.add(question)
+    db.flush()
+    wrong = Answer(question_id=question.id, answer_text="Cliquer", is_correct=False)
+    right = Answer(question_id=question.id, answer_text="Signaler", is_correct=True)
+    db.add_all([wrong, right])
+    db.commit()
+    return {"id": quiz.id, "question": question.id, "wrong": wrong.id, "right": right.id}
+
+@pytest.fixture
+def user(db):
+    user = User(email="alice@corp.fr", hashed_password="x", role=UserRole.EMPLOYEE)
+    db.add(user)
+    db.commit()
+    return user
+
+def swap_correct_answer_elsewhere(db, quiz):
+    """Inverse la bonne réponse comme le ferait un autre worker, sans invalider le cache local."""
+    stale = quiz_cache.get(quiz["id"])
+    db.execute(update(Answer).where(Answer.id == quiz["right"]).values(is_correct=False))
+    db.execute(update(Answer).where(Answer.id == quiz["wrong"]).values(is_correct=True))
+    db.execute(update(Quiz).where(Quiz.id == quiz["id"]).values(
+        updated_at=datetime.utcnow() + timedelta(seconds=1)
+    ))
+    db.commit()
+    quiz_cache.put(stale)
+
+def test_submit_grades_with_the_cached_key(db, quiz, user):
+    result = GradingService(db).submit(user, quiz["id"], {str(quiz["question"]): [str(quiz["right"])]})
+
+    assert (result.score, result.passed) == (100.0, True)
+    assert db.query(QuizAttempt).count() == 1
+
+def test_submit_rebuilds_key_after_edit_from_another_worker(db, quiz, user):
+    service = GradingService(db)
+    service.submit(user, quiz["id"], {quiz["question"]: [quiz["right"]]})
+    swap_correct_answer_elsewhere(db, quiz)
+
+    result = service.submit(user, quiz["id"], {quiz["question"]: [quiz["right"]]})
+
+    assert (result.score, result.passed) == (0.0, False)
+    assert quiz_cache.get(quiz["id"]).answer_key[quiz["question"]].correct_mask != 0
+
+def test_batch_rebuilds_key_after_edit_from_another_worker(db, quiz, user):
+    service = GradingService(db)
+    service.submit(user, quiz["id"], {quiz["question"]: [quiz["right"]]})
+    swap_correct_answer_elsewhere(db, quiz)
+
+    results, rejected = service.grade_batch([
+        {"user_id": user.id, "quiz_id": quiz["id"], "answers": {quiz["question"]: [quiz["wrong"]]}},
+        {"user_id": user.id, "quiz_id": quiz["id"], "answers": {quiz["question"]: [quiz["right"]]}},
+    ])
+
+    assert rejected == []
+    assert [result.passed for result in results] == [True, False]
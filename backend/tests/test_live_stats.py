@@ -0,0 +1,41 @@
+import asyncio
+import itertools
+from app.database.session import SessionLocal
+from app.models import QuizAttempt, User, UserRole
+from app.services.live_stats_service import StatsBroadcaster, stats_fingerprint
+
+def test_fingerprint_changes_on_commit_from_another_session(app_db):
+    app_db.add(User(email="alice@corp.fr", hashed_password="x", role=UserRole.EMPLOYEE))
+    app_db.commit()
+    before = stats_fingerprint()
+
+    with SessionLocal() as other:
+        other.add(QuizAttempt(user_id=1, quiz_id=None, score=80.0, passed=True))
+        other.commit()
+
+    assert stats_fingerprint() != before
+
+def test_broadcaster_refreshes_when_probe_sees_external_change():
+    fingerprints = itertools.chain([("v1",), ("v1",)], itertools.repeat(("v2",)))
+    broadcaster = StatsBroadcaster(
+        window=0.01, refresh_interval=3600, heartbeat=60, probe_interval=0.01,
+        compute=lambda: {"global": {"computed": broadcaster.computations}},
+        probe=lambda: next(fingerprints)
+    )
+
+    async def scenario():
+        stream = broadcaster.subscribe()
+        await stream.__anext__()  # Instantané initial
+        delta = await asyncio.wait_for(stream.__anext__(), timeout=2)
+        await stream.aclose()
+        return delta
+
+    delta = asyncio.run(scenario())
+
+    assert delta.startswith(b"event: delta")
+    assert broadcaster.computations == 2
+
+def test_probe_can_be_disabled():
+    broadcaster = StatsBroadcaster(probe_interval=0, compute=dict, probe=lambda: 1 / 0)
+
+    assert asyncio.run(broadcaster._changed_elsewhere()) is False
@@ -0,0 +1,68 @@
+from datetime import timedelta
+import os
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.auth import create_scoped_token, media_scope
+from app.config import settings
+from app.models import Module, User, UserRole
+from app.routers import modules
+
+@pytest.fixture
+def client(app_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    app = FastAPI()
+    app.include_router(modules.router)
+    app_db.add(User(email="lea@corp.fr", hashed_password="!", role=UserRole.EMPLOYEE))
+    app_db.commit()
+    return TestClient(app)
+
+def add_media(db, tmp_path, name, content: bytes) -> int:
+    (tmp_path / name).write_bytes(content)
+    module = Module(title=name, order=1, content_type="video", content_url=f"/uploads/{name}")
+    db.add(module)
+    db.commit()
+    return module.id
+
+def content_url(module_id: int) -> str:
+    token = create_scoped_token("lea@corp.fr", media_scope(module_id), timedelta(minutes=5))
+    return f"/api/modules/{module_id}/content?token={token}"
+
+def test_range_request_returns_partial_content(client, app_db, tmp_path):
+    module_id = add_media(app_db, tmp_path, "clip.mp4", b"0123456789")
+
+    response = client.get(content_url(module_id), headers={"Range": "bytes=2-5"})
+
+    assert response.status_code == 206
+    assert response.content == b"2345"
+    assert response.headers["content-range"] == "bytes 2-5/10"
+
+def test_empty_file(client, app_db, tmp_path):
+    module_id = add_media(app_db, tmp_path, "vide.mp4", b"")
+
+    full = client.get(content_url(module_id))
+    ranged = client.get(content_url(module_id), headers={"Range": "bytes=-10"})
+
+    assert (full.status_code, full.content) == (200, b"")
+    assert ranged.status_code == 416
+    assert ranged.headers["content-range"] == "bytes */0"
+
+def test_accel_redirect_only_behind_nginx(client, app_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "MEDIA_ACCEL_REDIRECT", True)
+    module_id = add_media(app_db, tmp_path, "clip.mp4", b"0123456789")
+
+    proxied = client.get(content_url(module_id), headers={"X-Accel-Available": "1"})
+    direct = client.get(content_url(module_id))
+
+    assert proxied.headers["x-accel-redirect"] == "/uploads/clip.mp4"
+    assert proxied.content == b""
+    assert "x-accel-redirect" not in direct.headers
+    assert direct.content == b"0123456789"
+
+def test_signed_url_is_limited_to_its_module(client, app_db, tmp_path):
+    first = add_media(app_db, tmp_path, "a.mp4", b"a")
+    second = add_media(app_db, tmp_path, "b.mp4", b"b")
+
+    response = client.get(content_url(first).replace(f"/{first}/", f"/{second}/"))
+
+    assert response.status_code == 401
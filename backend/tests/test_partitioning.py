@@ -0,0 +1,129 @@
+import os
+from datetime import date, datetime
+import pytest
+from sqlalchemy import create_engine, text
+from app.database.partitioning import (
+    QUIZ_ATTEMPTS, create_partitioned_table, drop_partitions_before, ensure_partitions,
+    monthly_partitions
+)
+
+class RecordedResult:
+    def __init__(self, value=None, rows=()):
+        self.value = value
+        self.rows = list(rows)
+        self.rowcount = 0
+
+    def scalar(self):
+        return self.value
+
+    def scalars(self):
+        return iter(self.rows)
+
+class RecordingConnection:
+    """Connexion factice : note le SQL émis et répond aux requêtes de catalogue."""
+
+    def __init__(self, partitions=(), default_exists=True, default_has_rows=False):
+        self.partitions = list(partitions)
+        self.default_exists = default_exists
+        self.default_has_rows = default_has_rows
+        self.statements = []
+
+    def execute(self, statement, parameters=None):
+        sql = " ".join(str(statement).split())
+        self.statements.append(sql)
+        if "pg_inherits" in sql:
+            return RecordedResult(rows=self.partitions)
+        if sql.startswith("SELECT to_regclass"):
+            return RecordedResult(self.default_exists)
+        if sql.startswith("SELECT EXISTS (SELECT 1 FROM"):
+            return RecordedResult(self.default_has_rows)
+        return RecordedResult()
+
+    def ddl(self):
+        return [sql for sql in self.statements if not sql.startswith("SELECT")]
+
+def test_create_partitioned_table_renders_ddl():
+    conn = RecordingConnection()
+
+    create_partitioned_table(conn, QUIZ_ATTEMPTS)
+
+    statements = conn.ddl()
+    assert statements[0] == "CREATE SEQUENCE IF NOT EXISTS quiz_attempts_id_seq"
+    assert statements[1].startswith("CREATE TABLE IF NOT EXISTS quiz_attempts ( "
+                                    "id INTEGER NOT NULL DEFAULT nextval('quiz_attempts_id_seq'),")
+    assert "completed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL" in statements[1]
+    assert statements[1].endswith("PRIMARY KEY (id, completed_at) ) PARTITION BY RANGE (completed_at)")
+    assert "ALTER SEQUENCE quiz_attempts_id_seq OWNED BY quiz_attempts.id" in statements
+    assert "CREATE INDEX IF NOT EXISTS ix_quiz_attempts_user_id ON quiz_attempts (user_id)" in statements
+    assert statements[-1] == "CREATE TABLE IF NOT EXISTS quiz_attempts_default PARTITION OF quiz_attempts DEFAULT"
+
+def test_ensure_partitions_creates_missing_months_only():
+    conn = RecordingConnection(partitions=["quiz_attempts_y2026m01", "quiz_attempts_default"])
+
+    created = ensure_partitions(conn, QUIZ_ATTEMPTS, date(2025, 12, 1), date(2026, 2, 1))
+
+    assert created == ["quiz_attempts_y2025m12", "quiz_attempts_y2026m02"]
+    assert conn.ddl() == [
+        "CREATE TABLE IF NOT EXISTS quiz_attempts_y2025m12 PARTITION OF quiz_attempts "
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')",
+        "CREATE TABLE IF NOT EXISTS quiz_attempts_y2026m02 PARTITION OF quiz_attempts "
+        "FOR VALUES FROM ('2026-02-01') TO ('2026-03-01')",
+    ]
+
+def test_ensure_partitions_moves_rows_out_of_default():
+    conn = RecordingConnection(default_has_rows=True)
+
+    ensure_partitions(conn, QUIZ_ATTEMPTS, date(2026, 3, 1), date(2026, 3, 1))
+
+    assert conn.ddl() == [
+        "CREATE TABLE quiz_attempts_y2026m03 (LIKE quiz_attempts INCLUDING DEFAULTS)",
+        "WITH moved AS (DELETE FROM quiz_attempts_default WHERE completed_at >= '2026-03-01' "
+        "AND completed_at < '2026-04-01' RETURNING *) INSERT INTO quiz_attempts_y2026m03 SELECT * FROM moved",
+        "ALTER TABLE quiz_attempts ATTACH PARTITION quiz_attempts_y2026m03 "
+        "FOR VALUES FROM ('2026-03-01') TO ('2026-04-01')",
+    ]
+
+def test_drop_partitions_before_keeps_cutoff_month():
+    conn = RecordingConnection(partitions=[
+        "quiz_attempts_y2024m02", "quiz_attempts_default", "quiz_attempts_y2024m01", "quiz_attempts_y2024m03"
+    ])
+
+    dropped = drop_partitions_before(conn, QUIZ_ATTEMPTS, date(2024, 3, 1))
+
+    assert dropped == ["quiz_attempts_y2024m01", "quiz_attempts_y2024m02"]
+    assert conn.ddl() == ["DROP TABLE quiz_attempts_y2024m01", "DROP TABLE quiz_attempts_y2024m02"]
+
+@pytest.fixture
+def postgres():
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL non défini")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS quiz_attempts CASCADE"))
+        conn.execute(text("DROP SEQUENCE IF EXISTS quiz_attempts_id_seq"))
+        conn.execute(text("CREATE TABLE IF NOT EXISTS users (id SERIAL PRIMARY KEY)"))
+        conn.execute(text("CREATE TABLE IF NOT EXISTS quizzes (id SERIAL PRIMARY KEY)"))
+    yield engine
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS quiz_attempts CASCADE"))
+    engine.dispose()
+
+@pytest.mark.postgres
+def test_partitions_on_postgres(postgres):
+    with postgres.begin() as conn:
+        create_partitioned_table(conn, QUIZ_ATTEMPTS)
+        conn.execute(text("INSERT INTO quiz_attempts (score, completed_at) VALUES (80, '2026-02-10')"))
+        ensure_partitions(conn, QUIZ_ATTEMPTS, date(2026, 1, 1), date(2026, 3, 1))
+
+        assert [month for _, month in monthly_partitions(conn, QUIZ_ATTEMPTS)] == [
+            date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1)
+        ]
+        # La ligne rangée dans DEFAULT a rejoint sa partition mensuelle
+        assert conn.execute(text("SELECT count(*) FROM quiz_attempts_y2026m02")).scalar() == 1
+        assert conn.execute(text("SELECT count(*) FROM quiz_attempts_default")).scalar() == 0
+
+        assert drop_partitions_before(conn, QUIZ_ATTEMPTS, date(2026, 3, 1)) == [
+            "quiz_attempts_y2026m01", "quiz_attempts_y2026m02"
+        ]
+        assert conn.execute(text("SELECT count(*) FROM quiz_attempts")).scalar() == 0
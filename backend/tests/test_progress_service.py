@@ -0,0 +1,103 @@
+from datetime import datetime
+import pytest
+from app.models import Module, ModuleStatus, User, UserProgress, UserProgressSummary, UserRole
+from app.services.progress_service import ProgressBuffer, ProgressService, progress_buffer
+
+@pytest.fixture(autouse=True)
+def empty_buffer():
+    progress_buffer.drain()
+    yield
+    progress_buffer.drain()
+
+@pytest.fixture
+def learner(db):
+    user = User(email="alice@corp.fr", hashed_password="x", role=UserRole.EMPLOYEE)
+    modules = [Module(title=f"Module {order}", order=order) for order in (1, 2)]
+    db.add_all([user] + modules)
+    db.commit()
+    return user.id, [module.id for module in modules]
+
+def progress_of(db, user_id, module_id) -> UserProgress:
+    db.expire_all()
+    return db.query(UserProgress).filter_by(user_id=user_id, module_id=module_id).one()
+
+# --- Tampon ---
+
+def test_buffer_keeps_only_latest_value_per_user_and_module():
+    buffer = ProgressBuffer()
+    buffer.record(1, 10, 20)
+    buffer.record(1, 10, 35)
+    buffer.record(1, 11, 5)
+    buffer.record(1, 10, 50)
+
+    pending = buffer.drain()
+
+    assert len(buffer) == 0
+    assert {key: percentage for key, (percentage, _) in pending.items()} == {(1, 10): 50, (1, 11): 5}
+
+def test_restore_does_not_overwrite_newer_values():
+    buffer = ProgressBuffer()
+    buffer.record(1, 10, 30)
+    failed = buffer.drain()
+    buffer.record(1, 10, 60)
+
+    buffer.restore(failed)
+
+    assert buffer.drain()[(1, 10)][0] == 60
+
+# --- Écriture ---
+
+def test_flush_writes_coalesced_progress_and_summary(db, learner):
+    user_id, (module_id, _) = learner
+    for percentage in (10, 25, 40):
+        progress_buffer.record(user_id, module_id, percentage)
+    progress_buffer.record(user_id, 9999, 50)  # Module inconnu : ignoré
+
+    assert ProgressService(db).flush(progress_buffer.drain()) == 1
+
+    progress = progress_of(db, user_id, module_id)
+    assert (progress.status, progress.progress_percentage) == (ModuleStatus.IN_PROGRESS, 40)
+    summary = db.get(UserProgressSummary, user_id)
+    assert summary.modules[str(module_id)] == {"status": "in_progress", "progress": 40}
+
+def test_flush_never_downgrades_completed_module(db, learner):
+    user_id, (module_id, _) = learner
+    service = ProgressService(db)
+    service.complete_module(user_id, module_id)
+    completed_at = progress_of(db, user_id, module_id).completed_at
+
+    service.flush({(user_id, module_id): (30, datetime.utcnow())})
+
+    progress = progress_of(db, user_id, module_id)
+    assert (progress.status, progress.progress_percentage) == (ModuleStatus.COMPLETED, 100)
+    assert progress.completed_at == completed_at
+    summary = db.get(UserProgressSummary, user_id)
+    assert (summary.completed_count, summary.modules[str(module_id)]["status"]) == (1, "completed")
+
+def test_merge_fallback_never_downgrades_completed_module(db, learner):
+    user_id, (module_id, other_module_id) = learner
+    service = ProgressService(db)
+    service.complete_module(user_id, module_id)
+    now = datetime.utcnow()
+
+    service._merge([
+        {"user_id": user_id, "module_id": module_id, "status": ModuleStatus.IN_PROGRESS,
+         "progress_percentage": 30, "started_at": now, "completed_at": None, "last_accessed": now},
+        {"user_id": user_id, "module_id": other_module_id, "status": ModuleStatus.IN_PROGRESS,
+         "progress_percentage": 30, "started_at": now, "completed_at": None, "last_accessed": now},
+    ])
+    db.commit()
+
+    completed = progress_of(db, user_id, module_id)
+    assert (completed.status, completed.progress_percentage, completed.last_accessed) == (
+        ModuleStatus.COMPLETED, 100, now
+    )
+    assert progress_of(db, user_id, other_module_id).status == ModuleStatus.IN_PROGRESS
+
+def test_completion_discards_buffered_progress(db, learner):
+    user_id, (module_id, _) = learner
+    progress_buffer.record(user_id, module_id, 80)
+
+    ProgressService(db).complete_module(user_id, module_id)
+
+    assert len(progress_buffer) == 0
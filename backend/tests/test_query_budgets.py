@@ -0,0 +1,116 @@
+"""Budgets de requêtes SQL des routes de liste et de statistiques."""
+from datetime import datetime, timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.auth import create_access_token
+from app.database.session import engine
+from app.models import (
+    Answer, ModuleStatus, Module, Question, Quiz, QuizAttempt, User, UserProgress, UserRole
+)
+from app.query_guard import QueryBudgetExceeded, QueryGuardMiddleware, assert_query_budget, capture_queries, install_query_guard
+from app.routers import admin, quiz, stats
+from app.services.quiz_service import quiz_cache
+from app.services.stats_service import StatsService
+
+DEPARTMENTS = ("Finance", "IT", "Juridique", "RH", "Ventes", "Achats")
+
+@pytest.fixture
+def seeded(app_db):
+    """Six départements, trois modules avec quiz, progression et tentatives."""
+    app_db.add(User(email="admin@corp.fr", hashed_password="!", role=UserRole.ADMIN))
+    modules = [Module(title=f"Module {i}", order=i) for i in range(3)]
+    app_db.add_all(modules)
+    app_db.flush()
+    quizzes = [Quiz(module_id=module.id, title=f"Quiz {module.id}", passing_score=50) for module in modules]
+    app_db.add_all(quizzes)
+    app_db.flush()
+    for quiz_row in quizzes:
+        for q in range(3):
+            question = Question(quiz_id=quiz_row.id, question_text=f"Q{q}", question_type="multiple_choice")
+            app_db.add(question)
+            app_db.flush()
+            app_db.add_all([
+                Answer(question_id=question.id, answer_text="oui", is_correct=True),
+                Answer(question_id=question.id, answer_text="non", is_correct=False),
+            ])
+
+    now = datetime.utcnow()
+    for index in range(24):
+        user = User(
+            email=f"user{index}@corp.fr", hashed_password="!",
+            department=DEPARTMENTS[index % len(DEPARTMENTS)]
+        )
+        app_db.add(user)
+        app_db.flush()
+        for module, quiz_row in zip(modules[:index % 3 + 1], quizzes):
+            completed = (index + module.id) % 2 == 0
+            app_db.add(UserProgress(
+                user_id=user.id, module_id=module.id,
+                status=ModuleStatus.COMPLETED if completed else ModuleStatus.IN_PROGRESS,
+                progress_percentage=100 if completed else 40,
+                started_at=now - timedelta(days=3),
+                completed_at=now if completed else None
+            ))
+            app_db.add(QuizAttempt(
+                user_id=user.id, quiz_id=quiz_row.id, score=float(40 + index), passed=completed,
+                completed_at=now
+            ))
+    app_db.commit()
+    quiz_cache.clear()
+    return quizzes
+
+@pytest.fixture
+def client(seeded):
+    install_query_guard(engine)
+    app = FastAPI()
+    app.add_middleware(QueryGuardMiddleware)
+    for router in (admin.router, quiz.router, stats.router):
+        app.include_router(router)
+    client = TestClient(app)
+    client.headers["Authorization"] = "Bearer " + create_access_token({"sub": "admin@corp.fr"})
+    return client
+
+@pytest.mark.parametrize("path", [
+    "/api/admin/stats/modules",
+    "/api/admin/stats/departments",
+    "/api/admin/users?limit=50",
+])
+def test_route_within_declared_budget(client, path):
+    response = client.get(path)
+
+    assert response.status_code == 200
+    assert "x-query-budget" in response.headers
+    assert_query_budget(response)
+
+def test_quiz_within_budget_cold_and_cached(client, seeded):
+    cold = client.get(f"/api/quiz/{seeded[0].id}")
+    warm = client.get(f"/api/quiz/{seeded[0].id}")
+
+    assert cold.status_code == warm.status_code == 200
+    assert_query_budget(cold)
+    assert_query_budget(warm)
+
+def test_budget_overrun_is_reported(client):
+    response = client.get("/api/admin/stats/departments")
+
+    with pytest.raises(QueryBudgetExceeded):
+        assert_query_budget(response, max_queries=1)
+
+def test_department_stats_query_count_is_constant(seeded, app_db):
+    with capture_queries() as log:
+        departments = StatsService(app_db).get_department_stats()
+
+    assert [stat.department for stat in departments] == sorted(DEPARTMENTS)
+    assert log.count == 4, log.report()
+    assert not log.n_plus_one(), log.report()
+
+def test_department_stats_values(seeded, app_db):
+    stats = {stat.department: stat for stat in StatsService(app_db).get_department_stats()}
+
+    # Finance : user0, user6, user12, user18, un module chacun, aucun complété
+    assert (stats["Finance"].user_count, stats["Finance"].completion_rate) == (4, 0)
+    assert stats["Finance"].average_score == (40 + 46 + 52 + 58) / 4
+    # IT : user1, user7, user13, user19, deux modules chacun dont le premier complété
+    assert (stats["IT"].user_count, stats["IT"].completion_rate) == (4, round(4 / (4 * 3) * 100, 2))
+    assert stats["IT"].average_score == (41 + 47 + 53 + 59) / 4
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+import json
+import pytest
+from sqlalchemy import update
+from app.models import Answer, Question, Quiz
+from app.services.quiz_service import QuizService, quiz_cache
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    quiz_cache.clear()
+    yield
+    quiz_cache.clear()
+
+def add_quiz(db) -> Quiz:
+    quiz = Quiz(title="Hameçonnage", passing_score=50)
+    db.add(quiz)
+    db.flush()
+    question = Question(quiz_id=quiz.id, question_text="Lien suspect ?", question_type="multiple_choice")
+    db.add(question)
+    db.flush()
+    db.add_all([
+        Answer(question_id=question.id, answer_text="Cliquer", is_correct=False),
+        Answer(question_id=question.id, answer_text="Signaler", is_correct=True),
+    ])
+    db.commit()
+    return quiz
+
+def test_cached_entry_is_reused_while_version_matches(db):
+    quiz = add_quiz(db)
+    service = QuizService(db)
+
+    assert service.get_quiz_payload(quiz.id) is service.get_quiz_payload(quiz.id)
+
+def test_edit_from_another_worker_is_served_immediately(db):
+    quiz = add_quiz(db)
+    service = QuizService(db)
+    first = service.get_quiz_payload(quiz.id)
+
+    db.execute(update(Quiz).where(Quiz.id == quiz.id).values(
+        title="Hameçonnage (v2)", updated_at=datetime.utcnow() + timedelta(seconds=1)
+    ))
+    db.commit()
+    quiz_cache.put(first)  # Entrée toujours présente, comme dans un autre worker
+
+    second = service.get_quiz_payload(quiz.id)
+
+    assert second is not first
+    assert json.loads(second.body)["title"] == "Hameçonnage (v2)"
+    assert second.etag != first.etag
+
+def test_entries_older_than_ttl_are_rebuilt(db, monkeypatch):
+    quiz = add_quiz(db)
+    service = QuizService(db)
+    first = service.get_quiz_payload(quiz.id)
+
+    monkeypatch.setattr(quiz_cache, "ttl_seconds", 0)
+
+    assert service.get_quiz_payload(quiz.id) is not first
+
+def test_deleted_quiz_is_evicted(db):
+    quiz_id = add_quiz(db).id
+    service = QuizService(db)
+    service.get_quiz_payload(quiz_id)
+
+    db.execute(Answer.__table__.delete())
+    db.execute(Question.__table__.delete())
+    db.execute(Quiz.__table__.delete())
+    db.commit()
+
+    assert service.get_quiz_payload(quiz_id) is None
+    assert quiz_cache.get(quiz_id) is None
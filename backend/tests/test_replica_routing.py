@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import session as db_session
+from app.database.session import ReplicaMonitor, get_reporting_db, reporting_session
+from app.models import Base, User, UserRole
+
+def sqlite_engine(path):
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+def seed(engine, email):
+    """Crée le schéma et un utilisateur propre à la base, pour savoir laquelle a répondu."""
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(User(email=email, hashed_password="x", role=UserRole.EMPLOYEE))
+        db.commit()
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    """Primaire et réplique sur deux fichiers SQLite distincts, branchés dans app.database.session."""
+    primary = sqlite_engine(tmp_path / "primary.db")
+    replica = sqlite_engine(tmp_path / "replica.db")
+    seed(primary, "primaire@corp.fr")
+    seed(replica, "replique@corp.fr")
+
+    monitor = ReplicaMonitor(replica, max_staleness=30, check_interval=0)
+    monkeypatch.setattr(db_session, "SessionLocal", sessionmaker(autoflush=False, bind=primary))
+    monkeypatch.setattr(db_session, "ReplicaSessionLocal", sessionmaker(autoflush=False, bind=replica))
+    monkeypatch.setattr(db_session, "replica_monitor", monitor)
+    yield monitor
+    primary.dispose()
+    replica.dispose()
+
+def served_by(db) -> str:
+    return db.query(User.email).scalar()
+
+def test_reporting_reads_go_to_the_replica(databases):
+    with reporting_session() as db:
+        assert served_by(db) == "replique@corp.fr"
+
+    dependency = get_reporting_db()
+    db = next(dependency)
+    assert served_by(db) == "replique@corp.fr"
+    dependency.close()
+
+    assert databases.status()["usable"] is True
+
+def test_lagging_replica_falls_back_to_primary(databases, monkeypatch):
+    monkeypatch.setattr(databases, "measure_lag", lambda: 120.0)
+
+    with reporting_session() as db:
+        assert served_by(db) == "primaire@corp.fr"
+    assert databases.status()["lag_seconds"] == 120.0
+    assert databases.status()["usable"] is False
+
+def test_unreachable_replica_falls_back_to_primary(databases, monkeypatch, tmp_path):
+    monkeypatch.setattr(databases, "engine", sqlite_engine(tmp_path / "absent" / "replica.db"))
+
+    with reporting_session() as db:
+        assert served_by(db) == "primaire@corp.fr"
+    assert databases.status()["error"]
+
+def test_replica_is_used_again_once_caught_up(databases, monkeypatch):
+    monkeypatch.setattr(databases, "measure_lag", lambda: 120.0)
+    with reporting_session() as db:
+        assert served_by(db) == "primaire@corp.fr"
+
+    monkeypatch.setattr(databases, "measure_lag", lambda: 2.0)
+    with reporting_session() as db:
+        assert served_by(db) == "replique@corp.fr"
+
+def test_decision_is_reused_within_check_interval(databases, monkeypatch):
+    databases.check_interval = 60
+    assert databases.usable() is True
+
+    monkeypatch.setattr(databases, "measure_lag", lambda: 120.0)
+    assert databases.usable() is True
+
+@pytest.mark.parametrize("replica_usable", [True, False])
+def test_reporting_session_rejects_writes(databases, monkeypatch, replica_usable):
+    if not replica_usable:
+        monkeypatch.setattr(databases, "measure_lag", lambda: 120.0)
+
+    with reporting_session() as db:
+        db.add(User(email="intrus@corp.fr", hashed_password="x", role=UserRole.EMPLOYEE))
+        with pytest.raises(RuntimeError):
+            db.flush()
+        db.rollback()
+
+    with db_session.SessionLocal() as db:
+        assert db.query(User).filter(User.email == "intrus@corp.fr").count() == 0
@@ -0,0 +1,27 @@
+import asyncio
+from datetime import date, datetime
+from app.models import QuizAttempt, QuizAttemptMonthlyStat
+from app.services.retention_service import RetentionService, run_retention_job
+
+def test_compaction_aggregates_expired_months_once(db):
+    db.add_all([
+        QuizAttempt(user_id=1, quiz_id=1, score=60.0, passed=False, completed_at=datetime(2024, 1, 5)),
+        QuizAttempt(user_id=1, quiz_id=1, score=90.0, passed=True, completed_at=datetime(2024, 1, 20)),
+        QuizAttempt(user_id=1, quiz_id=1, score=70.0, passed=True, completed_at=datetime(2024, 3, 2)),
+    ])
+    db.commit()
+    service = RetentionService(db)
+
+    assert service.compact_quiz_attempts(date(2024, 3, 1)) == 2
+    db.commit()
+    assert service.compact_quiz_attempts(date(2024, 3, 1)) == 0
+    db.commit()
+
+    stat = db.query(QuizAttemptMonthlyStat).one()
+    assert (stat.month, stat.attempt_count, stat.score_sum, stat.passed_count) == (date(2024, 1, 1), 2, 150.0, 1)
+    assert (stat.min_score, stat.max_score) == (60.0, 90.0)
+    assert [attempt.score for attempt in db.query(QuizAttempt)] == [70.0]
+
+def test_background_job_does_not_run_without_postgres():
+    # Base de test SQLite : la tâche rend la main au lieu de boucler
+    asyncio.run(asyncio.wait_for(run_retention_job(), timeout=5))
@@ -0,0 +1,40 @@
+"""Démarrage à froid d'un worker : budget d'import et sous-systèmes différés."""
+import json
+import os
+import subprocess
+import sys
+import pytest
+from app.utils.startup_report import DEFAULT_BUDGET_SECONDS, LAZY_MODULES, measure_imports
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget surchargeable sur une machine d'intégration plus lente
+BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", DEFAULT_BUDGET_SECONDS))
+
+@pytest.fixture(scope="module")
+def import_times():
+    try:
+        return measure_imports("app.main")
+    except RuntimeError as e:
+        if "ModuleNotFoundError" in str(e):
+            pytest.skip(f"Dépendance de app.main absente de cet environnement : {str(e).splitlines()[-1]}")
+        raise
+
+def test_cold_import_within_budget(import_times):
+    total, _ = import_times
+    assert total <= BUDGET_SECONDS, f"Import de app.main en {total:.3f}s (budget {BUDGET_SECONDS:.3f}s)"
+
+def test_heavy_subsystems_are_not_imported_at_startup(import_times):
+    code = (
+        "import json, sys, app.main; "
+        f"print(json.dumps([name for name in {list(LAZY_MODULES)!r} if name in sys.modules]))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": BACKEND_DIR},
+        check=True
+    )
+    assert json.loads(completed.stdout.splitlines()[-1]) == []
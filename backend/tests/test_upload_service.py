@@ -0,0 +1,58 @@
+import asyncio
+import os
+import threading
+import pytest
+from app.services import upload_service
+from app.services.upload_service import UploadRejectedError, store_upload
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 4000
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_service.settings, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(upload_service.settings, "UPLOAD_CHUNK_SIZE", 1024)
+    return tmp_path
+
+async def chunks(data: bytes, size: int = 500):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+def store(data: bytes, filename: str):
+    return asyncio.run(store_upload(chunks(data), filename))
+
+def test_store_upload_deduplicates_by_content(upload_dir):
+    first = store(PNG, "schema.png")
+    second = store(PNG, "copie.png")
+
+    assert (first.mime_type, first.size, first.deduplicated) == ("image/png", len(PNG), False)
+    assert second.path == first.path and second.deduplicated is True
+    with open(upload_dir / first.path, "rb") as stream:
+        assert stream.read() == PNG
+    assert os.listdir(upload_dir / ".tmp") == []
+
+def test_rejected_content_leaves_no_temporary_file(upload_dir):
+    with pytest.raises(UploadRejectedError):
+        store(b"%PDF-1.7" + b"\x00" * 4000, "faux.png")
+
+    assert os.listdir(upload_dir / ".tmp") == []
+
+def test_file_system_calls_run_off_the_event_loop(upload_dir, monkeypatch):
+    threads = {}
+    writer_init = upload_service._UploadWriter.__init__
+    move_into_place = upload_service._move_into_place
+
+    def recording_init(self, *args):
+        threads["create"] = threading.current_thread()
+        writer_init(self, *args)
+
+    def recording_move(*args):
+        threads["move"] = threading.current_thread()
+        return move_into_place(*args)
+
+    monkeypatch.setattr(upload_service._UploadWriter, "__init__", recording_init)
+    monkeypatch.setattr(upload_service, "_move_into_place", recording_move)
+
+    store(PNG, "schema.png")
+
+    assert threading.main_thread() not in threads.values()
+    assert set(threads) == {"create", "move"}
@@ -0,0 +1,59 @@
+import pytest
+from app.models import Module, ModuleStatus, User, UserProgress, UserProgressSummary, UserRole
+from app.services.summary_service import ModuleUpdate, SummaryService, module_catalog
+from app.services.user_service import UserService
+
+@pytest.fixture(autouse=True)
+def fresh_catalog():
+    module_catalog.invalidate()
+    yield
+    module_catalog.invalidate()
+
+@pytest.fixture
+def modules(db):
+    modules = [Module(title=f"Module {order}", order=order) for order in (1, 2)]
+    db.add_all(modules)
+    db.commit()
+    return [module.id for module in modules]
+
+def add_user(db, email) -> int:
+    user = User(email=email, hashed_password="x", role=UserRole.EMPLOYEE)
+    db.add(user)
+    db.commit()
+    return user.id
+
+def record(db, user_id, module_id, status):
+    SummaryService(db).apply_updates({user_id: [ModuleUpdate(module_id=module_id, status=status)]})
+    db.commit()
+
+def emails(db, completion):
+    page = UserService(db).list_users(limit=50, completion=completion, fields=["email"], include_progress=False)
+    return [item["email"] for item in page["items"]]
+
+def test_completion_filter_uses_started_modules(db, modules):
+    for email in ("nouveau@corp.fr", "debut@corp.fr", "milieu@corp.fr", "fini@corp.fr"):
+        add_user(db, email)
+    SummaryService(db).rebuild_missing()
+    users = {user.email: user.id for user in db.query(User)}
+    record(db, users["debut@corp.fr"], modules[0], ModuleStatus.IN_PROGRESS)
+    record(db, users["milieu@corp.fr"], modules[0], ModuleStatus.COMPLETED)
+    record(db, users["fini@corp.fr"], modules[0], ModuleStatus.COMPLETED)
+    record(db, users["fini@corp.fr"], modules[1], ModuleStatus.COMPLETED)
+
+    assert emails(db, "not_started") == ["nouveau@corp.fr"]
+    assert emails(db, "in_progress") == ["debut@corp.fr", "milieu@corp.fr"]
+    assert emails(db, "completed") == ["fini@corp.fr"]
+
+def test_rebuild_missing_backfills_users_without_summary(db, modules):
+    user_id = add_user(db, "ancien@corp.fr")
+    db.add(UserProgress(user_id=user_id, module_id=modules[0], status=ModuleStatus.IN_PROGRESS,
+                        progress_percentage=40))
+    db.commit()
+    assert emails(db, "in_progress") == []
+
+    assert SummaryService(db).rebuild_missing(batch_size=1) == 1
+    assert SummaryService(db).rebuild_missing() == 0
+
+    summary = db.get(UserProgressSummary, user_id)
+    assert (summary.started_count, summary.completed_count) == (1, 0)
+    assert emails(db, "in_progress") == ["ancien@corp.fr"]
@@ -67,10 +67,6 @@ const ModuleManager: React.FC = () => {
       formDataToSend.append(key, value.toString());
     });
 
-    if (file) {
-      formDataToSend.append('file', file);
-    }
-
     try {
       const url = isEditing && selectedModule
         ? `http://localhost:8000/api/admin/modules/${selectedModule.id}`
@@ -88,6 +84,24 @@ const ModuleManager: React.FC = () => {
 
       if (!response.ok) throw new Error('Erreur lors de la sauvegarde du module');
 
+      if (file) {
+        // Le fichier est envoyé brut, lu en flux par le serveur
+        const moduleId = isEditing && selectedModule ? selectedModule.id : (await response.json()).id;
+        const uploadResponse = await fetch(
+          `http://localhost:8000/api/admin/modules/${moduleId}/content?filename=${encodeURIComponent(file.name)}`,
+          {
+            method: 'PUT',
+            headers: {
+              'Authorization': `Bearer ${localStorage.getItem('token')}`,
+              'Content-Type': file.type || 'application/octet-stream'
+            },
+            body: file
+          }
+        );
+
+        if (!uploadResponse.ok) throw new Error('Erreur lors de l\'envoi du fichier');
+      }
+
       showNotification({
         type: 'success',
         message: `Module ${isEditing ? 'modifié' : 'créé'} avec succès`
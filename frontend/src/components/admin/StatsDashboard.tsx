@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import { Line, Bar, Doughnut } from 'react-chartjs-2';
 import {
   Chart as ChartJS,
@@ -13,6 +13,7 @@ import {
   Legend
 } from 'chart.js';
 import { useNotification } from '../common/Notification';
+import { useStatsStream } from '../../hooks/useStatsStream';
 
 ChartJS.register(
   CategoryScale,
@@ -58,6 +59,13 @@ interface RiskAssessment {
   risk_level: string;
 }
 
+interface StatsSections {
+  global: GlobalStats;
+  modules: ModuleStats[];
+  departments: DepartmentStats[];
+  risk_assessment: RiskAssessment;
+}
+
 const StatsDashboard: React.FC = () => {
   const [globalStats, setGlobalStats] = useState<GlobalStats | null>(null);
   const [moduleStats, setModuleStats] = useState<ModuleStats[]>([]);
@@ -66,48 +74,22 @@ const StatsDashboard: React.FC = () => {
   const [isLoading, setIsLoading] = useState(true);
   const { showNotification } = useNotification();
 
-  useEffect(() => {
-    fetchStats();
-  }, []);
-
-  const fetchStats = async () => {
-    try {
-      const [globalRes, moduleRes, deptRes, riskRes] = await Promise.all([
-        fetch('http://localhost:8000/api/admin/stats/global', {
-          headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
-        }),
-        fetch('http://localhost:8000/api/admin/stats/modules', {
-          headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
-        }),
-        fetch('http://localhost:8000/api/admin/stats/departments', {
-          headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
-        }),
-        fetch('http://localhost:8000/api/admin/stats/risk-assessment', {
-          headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
-        })
-      ]);
-
-      const [globalData, moduleData, deptData, riskData] = await Promise.all([
-        globalRes.json(),
-        moduleRes.json(),
-        deptRes.json(),
-        riskRes.json()
-      ]);
-
-      setGlobalStats(globalData);
-      setModuleStats(moduleData);
-      setDepartmentStats(deptData);
-      setRiskAssessment(riskData);
+  useStatsStream(
+    (sections: Partial<StatsSections>) => {
+      if (sections.global) setGlobalStats(sections.global);
+      if (sections.modules) setModuleStats(sections.modules);
+      if (sections.departments) setDepartmentStats(sections.departments);
+      if (sections.risk_assessment) setRiskAssessment(sections.risk_assessment);
       setIsLoading(false);
-
-    } catch (error) {
-      console.error('Erreur lors de la récupération des statistiques:', error);
+    },
+    () => {
+      console.error('Erreur lors de la récupération des statistiques');
       showNotification({
         type: 'error',
         message: 'Erreur lors du chargement des statistiques'
       });
     }
-  };
+  );
 
   if (isLoading) {
     return (
@@ -11,6 +11,7 @@ interface User {
   lastLogin: string;
   createdAt: string;
   department?: string;
+  progress?: UserProgress;
 }
 
 interface UserProgress {
@@ -27,6 +28,7 @@ const UserManager: React.FC = () => {
   const [isEditing, setIsEditing] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const { showNotification } = useNotification();
 
   const initialFormState = {
@@ -44,9 +46,12 @@ const UserManager: React.FC = () => {
     fetchUsers();
   }, []);
 
-  const fetchUsers = async () => {
+  const fetchUsers = async (cursor: string | null = null) => {
     try {
-      const response = await fetch('http://localhost:8000/api/admin/users', {
+      const params = new URLSearchParams({ limit: '100' });
+      if (cursor) params.set('cursor', cursor);
+
+      const response = await fetch(`http://localhost:8000/api/admin/users?${params}`, {
         headers: {
           'Authorization': `Bearer ${localStorage.getItem('token')}`
         }
@@ -55,24 +60,16 @@ const UserManager: React.FC = () => {
       if (!response.ok) throw new Error('Erreur lors de la récupération des utilisateurs');
 
       const data = await response.json();
-      setUsers(data);
-      
-      // Récupération des progrès pour chaque utilisateur
-      const progressPromises = data.map((user: User) =>
-        fetch(`http://localhost:8000/api/admin/users/${user.id}/progress`, {
-          headers: {
-            'Authorization': `Bearer ${localStorage.getItem('token')}`
-          }
-        }).then(res => res.json())
-      );
-
-      const progressResults = await Promise.all(progressPromises);
+      setUsers(prev => cursor ? [...prev, ...data.items] : data.items);
+      setNextCursor(data.nextCursor);
+
+      // La progression est incluse dans chaque page
       const progressMap: Record<string, UserProgress> = {};
-      data.forEach((user: User, index: number) => {
-        progressMap[user.id] = progressResults[index];
+      data.items.forEach((user: User) => {
+        if (user.progress) progressMap[user.id] = user.progress;
       });
 
-      setUserProgress(progressMap);
+      setUserProgress(prev => cursor ? { ...prev, ...progressMap } : progressMap);
       setIsLoading(false);
     } catch (error) {
       console.error('Erreur:', error);
@@ -390,6 +387,17 @@ const UserManager: React.FC = () => {
             </tbody>
           </table>
         </div>
+
+        {nextCursor && (
+          <div className="flex justify-center mt-4">
+            <button
+              onClick={() => fetchUsers(nextCursor)}
+              className="px-4 py-2 text-sm text-blue-600 hover:text-blue-900"
+            >
+              Charger plus
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Chart as ChartJS, CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend } from 'chart.js';
 import { Bar } from 'react-chartjs-2';
+import { useStatsStream } from '../../hooks/useStatsStream';
 
 ChartJS.register(CategoryScale, LinearScale, BarElement, Title, Tooltip, Legend);
 
@@ -9,7 +10,7 @@ interface User {
   email: string;
   name: string;
   role: string;
-  lastLogin: string;
+  lastLogin: string | null;
   progress: number;
 }
 
@@ -25,37 +26,55 @@ const AdminDashboard: React.FC = () => {
   const [moduleStats, setModuleStats] = useState<ModuleStats[]>([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
-  useEffect(() => {
-    const fetchData = async () => {
-      try {
-        const token = localStorage.getItem('token');
-        const [usersResponse, statsResponse] = await Promise.all([
-          fetch('http://localhost:8000/api/admin/users', {
-            headers: { 'Authorization': `Bearer ${token}` }
-          }),
-          fetch('http://localhost:8000/api/admin/stats', {
-            headers: { 'Authorization': `Bearer ${token}` }
-          })
-        ]);
-
-        const [usersData, statsData] = await Promise.all([
-          usersResponse.json(),
-          statsResponse.json()
-        ]);
-
-        setUsers(usersData);
-        setModuleStats(statsData.moduleStats);
-        setLoading(false);
-      } catch (error) {
-        console.error('Erreur lors du chargement des données:', error);
-        setLoading(false);
-      }
-    };
+  // Liste paginée par curseur : chaque page est ajoutée aux précédentes
+  const fetchUsers = async (cursor: string | null = null) => {
+    try {
+      const params = new URLSearchParams({ limit: '100', fields: 'id,email,fullName,role,lastLogin' });
+      if (cursor) params.set('cursor', cursor);
+
+      const usersResponse = await fetch(`http://localhost:8000/api/admin/users?${params}`, {
+        headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
+      });
+      if (!usersResponse.ok) throw new Error('Erreur lors de la récupération des utilisateurs');
+
+      const usersData = await usersResponse.json();
+      const page: User[] = usersData.items.map((item: any) => ({
+        id: String(item.id),
+        email: item.email,
+        name: item.fullName || item.email,
+        role: item.role,
+        lastLogin: item.lastLogin,
+        progress: item.progress && item.progress.totalModules
+          ? Math.round(item.progress.completedModules * 100 / item.progress.totalModules)
+          : 0
+      }));
+      setUsers(prev => cursor ? [...prev, ...page] : page);
+      setNextCursor(usersData.nextCursor);
+    } catch (error) {
+      console.error('Erreur lors du chargement des données:', error);
+    } finally {
+      setLoading(false);
+    }
+  };
 
-    fetchData();
+  useEffect(() => {
+    fetchUsers();
   }, []);
 
+  // Statistiques des modules poussées par le serveur à chaque changement
+  useStatsStream((sections) => {
+    if (sections.modules) {
+      setModuleStats(sections.modules.map((stat: any) => ({
+        moduleId: String(stat.module_id),
+        title: stat.title,
+        completionRate: stat.completion_rate,
+        averageScore: stat.average_score
+      })));
+    }
+  });
+
   const chartData = {
     labels: moduleStats.map(stat => stat.title),
     datasets: [
@@ -200,7 +219,7 @@ const AdminDashboard: React.FC = () => {
                     </div>
                   </td>
                   <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500">
-                    {new Date(user.lastLogin).toLocaleDateString()}
+                    {user.lastLogin ? new Date(user.lastLogin).toLocaleDateString() : '-'}
                   </td>
                   <td className="px-6 py-4 whitespace-nowrap text-right text-sm font-medium">
                     <button
@@ -221,6 +240,17 @@ const AdminDashboard: React.FC = () => {
             </tbody>
           </table>
         </div>
+
+        {nextCursor && (
+          <div className="flex justify-center py-4">
+            <button
+              onClick={() => fetchUsers(nextCursor)}
+              className="px-4 py-2 text-sm text-blue-600 hover:text-blue-900"
+            >
+              Charger plus
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -20,6 +20,7 @@ const ModuleViewer: React.FC<ModuleViewerProps> = ({ moduleId, onComplete }) =>
   const [loading, setLoading] = useState(true);
   const [progress, setProgress] = useState(0);
   const [error, setError] = useState<string | null>(null);
+  const [mediaUrl, setMediaUrl] = useState<string | null>(null);
   const navigate = useNavigate();
 
   useEffect(() => {
@@ -35,6 +36,19 @@ const ModuleViewer: React.FC<ModuleViewerProps> = ({ moduleId, onComplete }) =>
         
         const data = await response.json();
         setModule(data);
+
+        // Les balises <video> et <iframe> n'envoient pas d'en-tête Authorization :
+        // URL signée, limitée à ce module et de durée limitée
+        const urlResponse = await fetch(`http://localhost:8000/api/modules/${moduleId}/content-url`, {
+          headers: {
+            'Authorization': `Bearer ${localStorage.getItem('token')}`
+          }
+        });
+        if (urlResponse.ok) {
+          // URL relative : servie par nginx, sur la même origine que l'application
+          const { url } = await urlResponse.json();
+          setMediaUrl(url);
+        }
       } catch (error) {
         setError(error instanceof Error ? error.message : 'Une erreur est survenue');
       } finally {
@@ -66,6 +80,8 @@ const ModuleViewer: React.FC<ModuleViewerProps> = ({ moduleId, onComplete }) =>
 
   const renderContent = () => {
     if (!module) return null;
+    if ((module.contentType === 'video' || module.contentType === 'pdf') && !mediaUrl) return null;
+
 
     switch (module.contentType) {
       case 'video':
@@ -81,7 +97,7 @@ const ModuleViewer: React.FC<ModuleViewerProps> = ({ moduleId, onComplete }) =>
               }}
               onEnded={() => handleProgress(100)}
             >
-              <source src={module.contentUrl} type="video/mp4" />
+              <source src={mediaUrl ?? undefined} type="video/mp4" />
               Votre navigateur ne supporte pas la lecture de vidéos.
             </video>
           </div>
@@ -91,7 +107,7 @@ const ModuleViewer: React.FC<ModuleViewerProps> = ({ moduleId, onComplete }) =>
         return (
           <div className="h-screen">
             <iframe
-              src={`${module.contentUrl}#toolbar=0`}
+              src={`${mediaUrl}#toolbar=0`}
               className="w-full h-full rounded-lg shadow-lg"
               title={module.title}
               onLoad={() => {
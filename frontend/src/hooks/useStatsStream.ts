@@ -0,0 +1,69 @@
+import { useEffect, useRef } from 'react';
+
+const API_URL = 'http://localhost:8000/api/admin/stats';
+const RETRY_DELAY_MS = 5000;
+
+/**
+ * Flux SSE des statistiques administrateur : instantané à la connexion,
+ * puis sections modifiées. L'URL du flux porte un jeton éphémère obtenu
+ * par POST /stream-token, jamais le jeton d'accès ; chaque reconnexion
+ * en demande un nouveau.
+ */
+export const useStatsStream = <T = Record<string, any>>(
+  onSections: (sections: T) => void,
+  onError?: () => void
+) => {
+  const handlers = useRef({ onSections, onError });
+  handlers.current = { onSections, onError };
+
+  useEffect(() => {
+    let source: EventSource | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
+    let connectedOnce = false;
+
+    const applySections = (event: MessageEvent) => {
+      const { sections } = JSON.parse(event.data);
+      connectedOnce = true;
+      handlers.current.onSections(sections);
+    };
+
+    const retry = () => {
+      if (!closed) retryTimer = setTimeout(connect, RETRY_DELAY_MS);
+    };
+
+    const connect = async () => {
+      try {
+        const response = await fetch(`${API_URL}/stream-token`, {
+          method: 'POST',
+          headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
+        });
+        if (!response.ok) throw new Error('Jeton de flux refusé');
+        const { token } = await response.json();
+        if (closed) return;
+
+        source = new EventSource(`${API_URL}/stream?token=${encodeURIComponent(token)}`);
+        source.addEventListener('snapshot', applySections as EventListener);
+        source.addEventListener('delta', applySections as EventListener);
+        source.onerror = () => {
+          // Flux fermé (jeton expiré, redémarrage) : nouvelle connexion avec un nouveau jeton
+          if (source && source.readyState === EventSource.CLOSED) {
+            source.close();
+            retry();
+          }
+        };
+      } catch (error) {
+        if (!connectedOnce) handlers.current.onError?.();
+        retry();
+      }
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      source?.close();
+    };
+  }, []);
+};